@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse, Response
 from fastapi.concurrency import run_in_threadpool
-from typing import List, Dict, Any, Optional, Iterator, AsyncIterator # Iterator 추가
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Literal # Iterator 추가
 import boto3
 import json
-from app.schemas.recipe import ChatRequest, ChatResponse, HotRecipe, TopIngredient
+from app.schemas.recipe import ChatRequest, ChatResponse, HotRecipe, HotRecipeSummary, TopIngredient, StructuredRecipe, IngredientMatch, RecipeSearchResult
 from app.services import bedrock_service, db_service
 from langchain_aws import AmazonKnowledgeBasesRetriever
 from langchain_core.messages import HumanMessage, AIMessage # LangChain 메시지 타입 추가
@@ -28,6 +28,16 @@ async def handle_chat_stream(
     is_first_message = not chat_history
 
     context_str = ""
+
+    # --- 0. 저장된 레시피 즉시 응답 (옵션, 첫 질문일 때만) ---
+    if is_first_message and payload.use_stored_recipe and ingredients:
+        stored_recipe = await db_service.find_stored_recipe_for_chat(ingredients, language)
+        if stored_recipe:
+            return StreamingResponse(
+                iter([stored_recipe]),
+                media_type="text/plain",
+                headers={"X-Recipe-Source": "stored"}
+            )
     
     # 🔴 [Retriever 생성] 요청 시마다 새로운 Retriever 객체 사용
     retriever = bedrock_service.get_fresh_retriever()
@@ -78,37 +88,90 @@ async def handle_chat_stream(
         media_type="text/plain"
     )        
 
-@router.get("/hot-recipes", response_model=List[Dict[str, Any]], tags=["Hot Recipes"])
+# 읽기 API는 db_service가 데이터 버전별로 한 번 직렬화해 캐시한 JSON(bytes)을 그대로 반환
+# (response_model은 OpenAPI 문서용, 요청마다 dict 생성/검증을 반복하지 않음)
+def _json_response(content: bytes) -> Response:
+    return Response(content=content, media_type="application/json")
+
+@router.get("/hot-recipes", response_model=List[HotRecipeSummary], tags=["Hot Recipes"])
 async def get_hot_recipes():
     """
     (기능 2) Hot K-Food 추천 API
     DB(SQLite)에 저장된 Top 15 메뉴 중 랜덤 4개를 조회
     """
-    recipes = await db_service.get_hot_recipes_from_db(limit=15)
-    return recipes
+    recipes = await db_service.get_hot_recipes_json(limit=15)
+    return _json_response(recipes)
 
-@router.get("/hot-recipes/all", response_model=List[Dict[str, Any]], tags=["Hot Recipes"])
+@router.get("/hot-recipes/all", response_model=List[HotRecipe], tags=["Hot Recipes"])
 async def get_hot_recipes_all():
     """
     secret API: DB에 저장된 모든 메뉴를 조회
     """
-    recipes = await db_service.get_all_recipes_from_db()
+    recipes = await db_service.get_all_recipes_json()
+    return _json_response(recipes)
+
+@router.get("/hot-recipes/search", response_model=List[RecipeSearchResult], tags=["Hot Recipes"])
+async def search_hot_recipes(
+    q: str = Query(..., min_length=1, description="검색어 (메뉴명, 설명, 레시피 본문 / 영어·한국어)"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    (기능 2) Hot K-Food 검색 API
+    FTS5 전문 검색 색인에서 키워드로 메뉴를 검색 (관련도순, 하이라이트 스니펫 포함)
+    """
+    recipes = await db_service.search_recipes_from_db(q, limit=limit)
     return recipes
 
-@router.get("/hot-recipes/detail", response_model=Dict[str, Any], tags=["Hot Recipes"])
+@router.get("/hot-recipes/detail", response_model=HotRecipe, tags=["Hot Recipes"])
 async def get_hot_recipes_detail(ranking: int):
     """
     (기능 2) Hot K-Food 추천 API
-    DB(SQLite)에 저장된 메뉴의 디테일을 ranking을 통해 조회
+    DB(SQLite)에 저장된 메뉴의 디테일을 ranking을 통해 조회 (없으면 404)
+    """
+    recipe = await db_service.get_hot_recipes_detail_json(ranking=ranking)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail=f"ranking {ranking} 메뉴를 찾을 수 없습니다.")
+    return _json_response(recipe)
+
+@router.get("/hot-recipes/detail/structured", response_model=StructuredRecipe, tags=["Hot Recipes"])
+async def get_hot_recipes_detail_structured(ranking: int, language: Literal["eng", "kor"] = "eng"):
     """
-    recipe = await db_service.get_hot_recipes_detail_from_db(ranking=ranking)
+    (기능 2) Hot K-Food 추천 API
+    XML 파싱 없이 정규화 테이블에서 재료/단계/음료/팁을 구조화된 JSON으로 조회 (없으면 404)
+    language: 'eng' 또는 'kor'
+    """
+    recipe = await db_service.get_structured_recipe_from_db(ranking=ranking, language=language)
+    if recipe is None:
+        raise HTTPException(status_code=404, detail=f"ranking {ranking} 메뉴의 {language} 레시피를 찾을 수 없습니다.")
     return recipe
 
+@router.get("/hot-recipes/by-ingredients", response_model=List[IngredientMatch], tags=["Hot Recipes"])
+async def get_hot_recipes_by_ingredients(
+    ingredients: List[str] = Query(..., description="가지고 있는 재료 (여러 번 지정 가능)"),
+    limit: int = Query(5, ge=1, le=50),
+):
+    """
+    (기능 2) "이 재료로 뭐 만들지?" API
+    LLM 호출 없이 재료 -> 레시피 역색인에서 재료가 겹치는 저장된 레시피를 점수순으로 조회
+    """
+    recipes = await db_service.find_recipes_by_ingredients_from_db(ingredients, limit=limit)
+    return recipes
+
 @router.get("/top-ingredients", response_model=List[TopIngredient], tags=["Top Ingredients"])
-async def get_top_ingredients():
+async def get_top_ingredients(
+    country: Optional[str] = Query(None, description="국가명 (예: Canada)"),
+    city: Optional[str] = Query(None, description="도시명 (지정 시 country보다 우선)"),
+    city_id: Optional[int] = Query(None, description="도시 ID (같은 이름의 도시가 여러 개일 때, 지정 시 city보다 우선)"),
+    window: Literal["7d", "30d", "90d", "all"] = Query("all", description="최근 판매 기간"),
+    limit: int = Query(10, ge=1, le=50),
+):
     """
     (기능 3) Grocery 추천 API
-    DB(SQLite)에 저장된 Top 10 재료를 조회
+    DB(SQLite)에 미리 계산된 지역/기간별 Top N 재료를 조회 (지역 미지정 시 전체)
     """
-    ingredients = await db_service.get_top_ingredients_from_db(limit=10)
-    return ingredients
\ No newline at end of file
+    ingredients = await db_service.get_top_ingredients_json(
+        limit=limit, country=country, city=city, window=window, city_id=city_id
+    )
+    if ingredients is None:
+        raise HTTPException(status_code=400, detail="여러 도시가 같은 이름입니다. city_id를 지정하세요.")
+    return _json_response(ingredients)
@@ -16,6 +16,12 @@ class Settings(BaseSettings):
     # DB 파일 경로
     DB_PATH: str = "kfood_recipes.db"
 
+    # 랭킹 데이터 자동 갱신 (0이면 사용 안 함), 갱신 프로세스 nice 값, 실행할 파이프라인 단계
+    # (enrich_recipes: 새로 랭킹에 들어온 요리의 레시피만 Bedrock으로 채움, 이미 있는 레시피는 유지)
+    REFRESH_INTERVAL_MINUTES: float = 0
+    REFRESH_NICE: int = 10
+    REFRESH_STAGES: str = "reddit_ingest extract_menus enrich_recipes grocery"
+
     class Config:
         env_file = ".env" # .env 파일을 읽도록 설정
 
@@ -1,11 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from app.api import router # API 라우터 import
+from app.services import refresh_scheduler
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 설정(REFRESH_INTERVAL_MINUTES)이 켜져 있으면 랭킹 데이터 백그라운드 갱신 시작
+    refresh_task = refresh_scheduler.start()
+    yield
+    await refresh_scheduler.stop(refresh_task)
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="K-Food Recipe Backend",
     description="Bedrock 챗봇과 DB(SQLite) 추천 기능을 제공하는 API",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse, # 기본 JSON 응답을 orjson으로 직렬화
+    lifespan=lifespan
 )
 
 # app/api/router.py에 정의된 엔드포인트들을 앱에 포함
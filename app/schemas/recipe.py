@@ -19,6 +19,10 @@ class ChatRequest(BaseModel):
         default=[],
         description="이전 대화 기록 (role, content 포함)"
     )
+    use_stored_recipe: bool = Field(
+        default=False,
+        description="첫 질문에서 재료를 모두 사용하는 저장된 hot_recipes 레시피가 있으면 Bedrock 대신 즉시 반환"
+    )
 
 class ChatPreviewInfo(BaseModel):
     total_time: str
@@ -44,6 +48,60 @@ class HotRecipe(BaseModel):
         orm_mode = True
 
 
+class HotRecipeSummary(BaseModel):
+    """/hot-recipes (랜덤 4개) 목록용 (레시피 본문 제외)"""
+    ranking: int
+    recipe_name: str
+    image_url: Optional[str] = None
+    cook_time: Optional[int] = None
+    description: Optional[str] = None
+
+
+# --- 2-1. /hot-recipes/detail/structured (정규화된 레시피)용 모델 ---
+class RecipeIngredient(BaseModel):
+    name: str
+    quantity: Optional[str] = None
+
+class RecipeStep(BaseModel):
+    step_no: int
+    name: str
+    minutes: Optional[int] = None
+    description: List[str] = []
+
+class StructuredRecipe(BaseModel):
+    ranking: int
+    recipe_name: str
+    language: str
+    title: Optional[str] = None
+    message: Optional[str] = None
+    total_time: Optional[int] = None
+    ingredients: List[RecipeIngredient] = []
+    steps: List[RecipeStep] = []
+    drinks: List[str] = []
+    tips: List[str] = []
+
+
+# --- 2-2. /hot-recipes/by-ingredients (재료 역색인 조회)용 모델 ---
+class IngredientMatch(BaseModel):
+    ranking: int
+    recipe_name: str
+    image_url: Optional[str] = None
+    cook_time: Optional[int] = None
+    description: Optional[str] = None
+    match_score: float
+    matched_ingredients: List[str] = []
+
+
+# --- 2-3. /hot-recipes/search (전문 검색)용 모델 ---
+class RecipeSearchResult(BaseModel):
+    ranking: int
+    recipe_name: str
+    image_url: Optional[str] = None
+    cook_time: Optional[int] = None
+    description: Optional[str] = None
+    snippet: Optional[str] = None  # <b>검색어</b> 하이라이트 포함
+
+
 # --- 3. /top-ingredients (마트 판매 랭킹)용 모델 ---
 class TopIngredient(BaseModel):
     ranking: int
@@ -1,6 +1,9 @@
 import sqlite3
-from typing import List, Dict, Any
+import random
+import orjson
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from app.core.config import settings
+from app.services.recipe_parser import normalize_ingredient
 
 DB_PATH = settings.DB_PATH
 
@@ -11,112 +14,398 @@ def get_db_connection():
     conn.row_factory = sqlite3.Row 
     return conn
 
-async def get_hot_recipes_from_db(limit: int = 15) -> List[Dict[str, Any]]:
+
+# --- 읽기 경로 캐시 ---
+# 랭킹 데이터는 수집 스크립트가 게시할 때만 바뀌므로, 응답 JSON을 데이터 버전별로 한 번만 만들어 둠
+# key -> (데이터 버전, 직렬화된 값)
+_read_cache: Dict[str, Tuple[int, Any]] = {}
+
+def get_data_version(conn: sqlite3.Connection) -> int:
+    """수집 스크립트가 기록한 data_versions의 최신 버전 (테이블이 없으면 0)"""
+    try:
+        row = conn.execute("SELECT COALESCE(MAX(version), 0) FROM data_versions").fetchone()
+        return row[0]
+    except sqlite3.OperationalError:
+        return 0
+
+def invalidate_read_cache():
+    """프로세스 내 읽기 캐시 전체 삭제 (새 버전 게시 시 호출)"""
+    _read_cache.clear()
+
+def _cached(key: str, loader: Callable[[sqlite3.Connection], Any]) -> Any:
     """
-    (Reddit 랭킹) 'hot_recipes' 테이블에서 랜덤으로 4개 메뉴를 조회
+    데이터 버전이 같으면 캐시된 값을, 바뀌었으면 loader(conn)로 다시 만들어 반환
+    (버전 확인은 작은 테이블 조회 1번)
     """
-    print(f"DB: 'hot_recipes' 테이블에서 랜덤 4개 조회 중...")
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # ranking, name, score, ko, en, image_url 모두 조회 (랜덤 4개)
-        cursor.execute(
+        version = get_data_version(conn)
+        cached = _read_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        value = loader(conn)
+        _read_cache[key] = (version, value)
+        return value
+    finally:
+        conn.close()
+
+def _serialize_rows(rows) -> List[bytes]:
+    """
+    각 행을 orjson으로 바로 직렬화한 JSON 조각 리스트 반환
+    (SELECT 컬럼 이름/순서를 응답 모델 필드와 맞춰 두므로 모델 검증/변환을 거치지 않음)
+    """
+    if not rows:
+        return []
+    keys = rows[0].keys()
+    return [orjson.dumps(dict(zip(keys, row))) for row in rows]
+
+def _json_array(fragments: List[bytes]) -> bytes:
+    return b"[" + b",".join(fragments) + b"]"
+
+async def get_hot_recipes_json(limit: int = 15) -> bytes:
+    """
+    (Reddit 랭킹) 'hot_recipes' 테이블에서 랜덤으로 4개 메뉴를 조회
+    행별 JSON 조각을 캐시해 두고, 요청마다 4개를 뽑아 이어 붙이기만 함
+    """
+    def load(conn):
+        print(f"DB: 'hot_recipes' 테이블 조회 중 (캐시 갱신)...")
+        rows = conn.execute(
             """
             SELECT ranking, recipe_name, image_url, cook_time, description
             FROM hot_recipes 
-            ORDER BY RANDOM() 
-            LIMIT 4
-            """,
-        )
-        recipes = cursor.fetchall()
-        conn.close()
-        
-        # sqlite3.Row 객체를 Pydantic이 읽을 수 있는 dict 리스트로 반환
-        return [dict(row) for row in recipes]
-        
+            ORDER BY ranking
+            """
+        ).fetchall()
+        return _serialize_rows(rows)
+
+    try:
+        fragments = _cached("hot_recipes", load)
     except sqlite3.OperationalError as e:
         print(f"DB 오류: {e}. 'scripts/extract_hot_menus.py'를 실행했는지 확인하세요.")
-        return [] # DB나 테이블이 없으면 빈 리스트 반환
+        return b"[]" # DB나 테이블이 없으면 빈 리스트 반환
+
+    return _json_array(random.sample(fragments, min(4, len(fragments))))
 
-async def get_all_recipes_from_db() -> List[Dict[str, Any]]:
+def _load_all_recipes(conn) -> Tuple[Dict[int, bytes], bytes]:
+    """hot_recipes 전체를 ranking별 JSON 조각과 전체 배열 JSON으로 직렬화"""
+    print(f"DB: 'hot_recipes' 테이블에서 모든 메뉴 조회 중 (캐시 갱신)...")
+    rows = conn.execute(
+        """
+        SELECT ranking, recipe_name, score, recipe_detail_ko, recipe_detail_en, image_url, cook_time, description
+        FROM hot_recipes
+        ORDER BY ranking
+        """
+    ).fetchall()
+    fragments = _serialize_rows(rows)
+    details = dict(zip((row["ranking"] for row in rows), fragments))
+    return details, _json_array(fragments)
+
+async def get_all_recipes_json() -> bytes:
     """
-    secret API: DB에 저장된 모든 메뉴를 조회
+    secret API: DB에 저장된 모든 메뉴를 조회 (직렬화된 응답 전체를 캐시)
     """
-    print(f"DB: 'hot_recipes' 테이블에서 모든 메뉴 조회 중...")
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            SELECT ranking, recipe_name, image_url, cook_time, description, recipe_detail_ko, recipe_detail_en
-            FROM hot_recipes
-            """
-        )
-        recipes = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in recipes]
+        _, all_json = _cached("hot_recipes_all", _load_all_recipes)
+        return all_json
     except sqlite3.OperationalError as e:
         print(f"DB 오류: {e}. 'scripts/get_menus_recipes.py'를 실행했는지 확인하세요.")
-        return []
+        return b"[]"
 
-async def get_hot_recipes_detail_from_db(ranking: int) -> Dict[str, Any]:
+async def get_hot_recipes_detail_json(ranking: int) -> Optional[bytes]:
     """
     (기능 2) Hot K-Food 추천 API
-    DB(SQLite)에 저장된 메뉴의 디테일을 ranking을 통해 조회
+    DB(SQLite)에 저장된 메뉴의 디테일을 ranking을 통해 조회 (없으면 None)
+    """
+    try:
+        details, _ = _cached("hot_recipes_all", _load_all_recipes)
+    except sqlite3.OperationalError as e:
+        print(f"DB 오류: {e}. 'scripts/get_menus_recipes.py'를 실행했는지 확인하세요.")
+        return None
+    return details.get(ranking)
+
+async def get_structured_recipe_from_db(ranking: int, language: str = "eng") -> Optional[Dict[str, Any]]:
+    """
+    정규화 테이블(recipe_summaries/ingredients/steps/extras)에서
+    ranking의 레시피를 XML 파싱 없이 구조화된 dict로 조회
     """
-    print(f"DB: 'hot_recipes' 테이블에서 ranking {ranking} 메뉴 조회 중...")
+    print(f"DB: 정규화 레시피 테이블에서 ranking {ranking} ({language}) 조회 중...")
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
 
         cursor.execute(
             """
-            SELECT ranking, recipe_name, image_url, cook_time, description, recipe_detail_ko, recipe_detail_en
-            FROM hot_recipes 
-            WHERE ranking = ?
+            SELECT h.ranking, h.recipe_name, s.language, s.title, s.message, s.total_time
+            FROM hot_recipes h
+            JOIN recipe_summaries s ON s.ranking = h.ranking AND s.language = ?
+            WHERE h.ranking = ?
             """,
-            (ranking,)
+            (language, ranking)
         )
-        recipe = cursor.fetchone()  
+        summary = cursor.fetchone()
+        if summary is None:
+            conn.close()
+            return None
+        recipe = dict(summary)
+
+        cursor.execute(
+            "SELECT name, quantity FROM recipe_ingredients WHERE ranking = ? AND language = ? ORDER BY position",
+            (ranking, language)
+        )
+        recipe["ingredients"] = [dict(row) for row in cursor.fetchall()]
+
+        cursor.execute(
+            "SELECT step_no, name, minutes, description FROM recipe_steps WHERE ranking = ? AND language = ? ORDER BY step_no",
+            (ranking, language)
+        )
+        recipe["steps"] = [
+            {
+                "step_no": row["step_no"],
+                "name": row["name"],
+                "minutes": row["minutes"],
+                "description": row["description"].split("\n") if row["description"] else []
+            }
+            for row in cursor.fetchall()
+        ]
+
+        cursor.execute(
+            "SELECT kind, text FROM recipe_extras WHERE ranking = ? AND language = ? ORDER BY kind, position",
+            (ranking, language)
+        )
+        extras = cursor.fetchall()
+        recipe["drinks"] = [row["text"] for row in extras if row["kind"] == "drink"]
+        recipe["tips"] = [row["text"] for row in extras if row["kind"] == "tip"]
+
         conn.close()
-        return dict(recipe)
+        return recipe
 
     except sqlite3.OperationalError as e:
-        print(f"DB 오류: {e}. 'scripts/get_menus_recipes.py'를 실행했는지 확인하세요.")
-        return {}
+        print(f"DB 오류: {e}. 'python -m scripts.get_menus_recipes --reparse'를 실행했는지 확인하세요.")
+        return None
+
+def _find_recipes_by_ingredients(ingredients: List[str], limit: int) -> List[Dict[str, Any]]:
+    """
+    ingredient_index 역색인으로 재료가 겹치는 레시피를 점수순으로 조회
+    match_score: 요청 재료별 최고 가중치(재료명 일치 1.0, 단어 일치 0.5)의 평균 (0~1)
+    """
+    terms = list(dict.fromkeys(term for term in (normalize_ingredient(i) for i in ingredients) if term))
+    if not terms:
+        return []
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    placeholders = ", ".join("?" for _ in terms)
+    cursor.execute(
+        f"""
+        WITH matches AS (
+            SELECT ranking, term, MAX(weight) AS weight
+            FROM ingredient_index
+            WHERE term IN ({placeholders})
+            GROUP BY ranking, term
+        )
+        SELECT h.ranking, h.recipe_name, h.image_url, h.cook_time, h.description,
+               h.recipe_detail_ko, h.recipe_detail_en,
+               SUM(m.weight) / ? AS match_score,
+               GROUP_CONCAT(m.term, '|') AS matched_terms
+        FROM matches m
+        JOIN hot_recipes h ON h.ranking = m.ranking
+        GROUP BY h.ranking
+        ORDER BY match_score DESC, h.ranking ASC
+        LIMIT ?
+        """,
+        (*terms, len(terms), limit)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+async def find_recipes_by_ingredients_from_db(ingredients: List[str], limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    ("냉장고 재료로 뭐 만들지?") 재료 -> 레시피 역색인에서 재료가 많이 겹치는 hot_recipes 조회
+    """
+    print(f"DB: 'ingredient_index'에서 재료 {ingredients} 로 레시피 조회 중...")
+    try:
+        recipes = _find_recipes_by_ingredients(ingredients, limit)
+        return [
+            {
+                "ranking": recipe["ranking"],
+                "recipe_name": recipe["recipe_name"],
+                "image_url": recipe["image_url"],
+                "cook_time": recipe["cook_time"],
+                "description": recipe["description"],
+                "match_score": round(recipe["match_score"], 3),
+                "matched_ingredients": recipe["matched_terms"].split("|") if recipe["matched_terms"] else []
+            }
+            for recipe in recipes
+        ]
+    except sqlite3.OperationalError as e:
+        print(f"DB 오류: {e}. 'python -m scripts.get_menus_recipes --reparse'를 실행했는지 확인하세요.")
+        return []
 
-async def get_top_ingredients_from_db(limit: int = 10) -> List[Dict[str, Any]]:
+async def find_stored_recipe_for_chat(ingredients: List[str], language: str) -> Optional[str]:
     """
-    (마트 랭킹) 'grocery_sales' 테이블에서 상위 10개 재료를 조회
+    /chat/stream 첫 질문용: 요청 재료를 모두 사용하는 저장된 레시피가 있으면 해당 언어의 XML 반환
+    (없으면 None -> Bedrock 호출로 넘어감)
     """
-    print(f"DB: 'grocery_sales' 테이블에서 Top {limit} 조회 중...")
+    try:
+        recipes = _find_recipes_by_ingredients(ingredients, limit=5)
+    except sqlite3.OperationalError as e:
+        print(f"DB 오류: {e}. 저장된 레시피 없이 Bedrock으로 진행합니다.")
+        return None
+
+    column = "recipe_detail_en" if language.lower() == "eng" else "recipe_detail_ko"
+    for recipe in recipes:
+        if recipe["match_score"] >= 1.0 and recipe[column]:
+            print(f"DB: 저장된 레시피 '{recipe['recipe_name']}' (ranking {recipe['ranking']})로 즉시 응답")
+            return recipe[column]
+    return None
+
+# trigram 토크나이저는 3글자 이상만 색인 검색 가능 (짧은 검색어는 LIKE로 처리)
+FTS_MIN_TERM_LENGTH = 3
+SEARCH_COLUMNS = ["recipe_name", "description", "recipe_en", "recipe_ko"]
+
+def _like_snippet(text: str, term: str, width: int = 30) -> Optional[str]:
+    """LIKE 검색 결과용 간단한 하이라이트 스니펫 (FTS snippet()과 같은 형식)"""
+    index = text.lower().find(term.lower())
+    if index < 0:
+        return None
+    start, end = max(0, index - width), min(len(text), index + len(term) + width)
+    return (
+        ("…" if start > 0 else "") + text[start:index]
+        + "<b>" + text[index:index + len(term)] + "</b>"
+        + text[index + len(term):end] + ("…" if end < len(text) else "")
+    )
+
+async def search_recipes_from_db(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    (Reddit 랭킹) 'hot_recipes_fts' 전문 검색 색인에서 메뉴명/설명/레시피 본문(영/한)을 검색
+    bm25 점수순(메뉴명 > 설명 > 본문 가중치)으로 정렬하고 <b>...</b> 하이라이트 스니펫을 함께 반환
+    """
+    terms = [term for term in query.split() if term]
+    if not terms:
+        return []
+    print(f"DB: 'hot_recipes_fts'에서 '{query}' 검색 중...")
+
+    fts_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LENGTH]
+    short_terms = [term for term in terms if len(term) < FTS_MIN_TERM_LENGTH]
+
+    conditions, params = [], []
+    if fts_terms:
+        # 각 검색어를 FTS5 구문(phrase)으로 감싸 특수문자를 무력화 (모든 검색어 AND)
+        conditions.append("hot_recipes_fts MATCH ?")
+        params.append(" ".join('"' + term.replace('"', '""') + '"' for term in fts_terms))
+    for term in short_terms:
+        conditions.append("(" + " OR ".join(f"f.{column} LIKE ?" for column in SEARCH_COLUMNS) + ")")
+        params.extend([f"%{term}%"] * len(SEARCH_COLUMNS))
+
+    if fts_terms:
+        select_rank = "snippet(hot_recipes_fts, -1, '<b>', '</b>', '…', 16) AS snippet, bm25(hot_recipes_fts, 10.0, 5.0, 1.0, 1.0) AS rank"
+        order_by = "rank ASC, h.ranking ASC"
+    else:
+        select_rank = "NULL AS snippet, 0 AS rank"
+        order_by = "h.ranking ASC"
+
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        # Rank, Name, Quantity 조회
         cursor.execute(
-            """
-            SELECT IngredientRank, IngredientName, TotalQuantity 
-            FROM grocery_sales 
-            ORDER BY IngredientRank ASC 
-            LIMIT 10
+            f"""
+            SELECT h.ranking, h.recipe_name, h.image_url, h.cook_time, h.description,
+                   {", ".join(f"f.{column} AS fts_{column}" for column in SEARCH_COLUMNS)},
+                   {select_rank}
+            FROM hot_recipes_fts f
+            JOIN hot_recipes h ON h.ranking = f.rowid
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {order_by}
+            LIMIT ?
             """,
+            (*params, limit)
         )
-        ingredients = cursor.fetchall()
+        rows = cursor.fetchall()
         conn.close()
-        
-        # Pydantic 모델 ('TopIngredient')에 맞게 키 이름 변경
-        return [
-            {
-                "ranking": row["IngredientRank"],
-                "ingredient_name": row["IngredientName"],
-                "total_quantity": row["TotalQuantity"]
-            } 
-            for row in ingredients
-        ]
-        
     except sqlite3.OperationalError as e:
-        print(f"DB 오류: {e}. 'scripts/analyze_grocery_data.py'를 실행했는지 확인하세요.")
-        return []
\ No newline at end of file
+        print(f"DB 오류: {e}. 'python -m scripts.get_menus_recipes --reparse'를 실행했는지 확인하세요.")
+        return []
+
+    results = []
+    for row in rows:
+        snippet = row["snippet"]
+        if snippet is None:
+            texts = (row[f"fts_{column}"] or "" for column in SEARCH_COLUMNS)
+            snippet = next((s for s in (_like_snippet(text, short_terms[0]) for text in texts) if s), None)
+        results.append({
+            "ranking": row["ranking"],
+            "recipe_name": row["recipe_name"],
+            "image_url": row["image_url"],
+            "cook_time": row["cook_time"],
+            "description": row["description"],
+            "snippet": snippet
+        })
+    return results
+
+def _resolve_city_region(conn, city: str) -> Optional[str]:
+    """
+    도시명 -> grocery_rankings의 도시 region(CityID)
+    같은 이름의 도시가 여러 개면 None (호출 측에서 city_id 지정을 요구), 없으면 ""
+    """
+    regions = conn.execute(
+        "SELECT DISTINCT region FROM grocery_rankings WHERE scope = 'city' AND region_name = ? LIMIT 2",
+        (city,)
+    ).fetchall()
+    if len(regions) > 1:
+        return None
+    return regions[0][0] if regions else ""
+
+
+async def get_top_ingredients_json(limit: int = 10, country: Optional[str] = None, city: Optional[str] = None, window: str = "all", city_id: Optional[int] = None) -> Optional[bytes]:
+    """
+    (마트 랭킹) 지역(도시 > 국가 > 전체) x 기간별 상위 재료를 조회
+    grocery_rankings의 PK (scope, region, time_window, IngredientRank) 구간 한 번만 읽음
+    도시는 city_id(CityID)로 정확히 지정하거나 도시명으로 조회 (이름이 같은 도시가 여러 개면 None)
+    """
+    if city_id is not None:
+        scope, region = "city", str(city_id)
+    elif city:
+        scope, region = "city", city
+    elif country:
+        scope, region = "country", country
+    else:
+        scope, region = "global", "all"
+
+    conn = get_db_connection()
+    try:
+        if city_id is None and city:
+            region = _resolve_city_region(conn, city)
+            if region is None:
+                return None
+        rows = conn.execute(
+            """
+            SELECT IngredientRank AS ranking, IngredientName AS ingredient_name, TotalQuantity AS total_quantity
+            FROM grocery_rankings
+            WHERE scope = ? AND region = ? AND time_window = ? AND IngredientRank <= ?
+            ORDER BY IngredientRank ASC
+            """,
+            (scope, region, window, limit)
+        ).fetchall()
+    except sqlite3.OperationalError as e:
+        if scope != "global" or window != "all":
+            print(f"DB 오류: {e}. 'scripts/analyze_grocery_data.py'를 다시 실행했는지 확인하세요.")
+            return b"[]"
+        # 지역별 순위 테이블이 생기기 전 DB: 전체 기간 순위(grocery_sales)로 대체
+        try:
+            rows = conn.execute(
+                """
+                SELECT IngredientRank AS ranking, IngredientName AS ingredient_name, TotalQuantity AS total_quantity
+                FROM grocery_sales 
+                ORDER BY IngredientRank ASC 
+                LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"DB 오류: {e}. 'scripts/analyze_grocery_data.py'를 실행했는지 확인하세요.")
+            return b"[]"
+    finally:
+        conn.close()
+
+    return _json_array(_serialize_rows(rows))
@@ -0,0 +1,195 @@
+# app/services/recipe_parser.py
+import re
+import xml.etree.ElementTree as ET
+from typing import Optional, List, Dict, Any
+
+# 조리 시간 패턴 (영어/한국어 템플릿 및 번역 표현 차이 모두 지원)
+TOTAL_TIME_PATTERN = re.compile(r'(?:Total estimated time|Total Time|총 (?:예상|소요) 시간)\s*:\s*(\d+)', re.IGNORECASE)
+STEP_TIME_PATTERN = re.compile(r'(?:Estimated time|(?:예상|소요) 시간)\s*:\s*(\d+)', re.IGNORECASE)
+STEP_TIME_SUFFIX_PATTERN = re.compile(r'\s*\((?:Estimated time|(?:예상|소요) 시간)\s*:[^)]*\)\s*$', re.IGNORECASE)
+STEP_NUMBER_PREFIX_PATTERN = re.compile(r'^\s*\d+\)\s*')
+
+# "재료명, 수량" 또는 "재료명 (수량)" 형식 (쉼표 형식을 먼저 확인)
+INGREDIENT_PAREN_PATTERN = re.compile(r'^(.*?)\s*\(([^()]*)\)\s*$')
+INGREDIENT_COMMA_PATTERN = re.compile(r'^(.*?),\s*(\d.*)$')
+
+# XML 엔티티가 아닌 '&' (예: "Salt & pepper") 이스케이프용
+BARE_AMPERSAND_PATTERN = re.compile(r'&(?!amp;|lt;|gt;|quot;|apos;|#\d+;|#x[0-9a-fA-F]+;)')
+
+
+def extract_recipe_xml(text: str) -> str:
+    """응답 텍스트에서 <recipe> 태그만 깔끔하게 추출"""
+    if '<recipe>' in text:
+        text = "<recipe>" + text.split('<recipe>', 1)[1]
+    if '</recipe>' in text:
+        text = text.split('</recipe>', 1)[0] + "</recipe>"
+    return text
+
+
+XML_TAG_PATTERN = re.compile(r'<[^>]+>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def recipe_xml_to_text(recipe_xml: Optional[str]) -> str:
+    """전문 검색 색인용으로 XML 태그를 제거한 레시피 본문 텍스트 반환"""
+    if not recipe_xml or recipe_xml.startswith("<error>"):
+        return ""
+    return WHITESPACE_PATTERN.sub(' ', XML_TAG_PATTERN.sub(' ', recipe_xml)).strip()
+
+
+def _clean_text(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    text = text.strip()
+    return text or None
+
+
+def _bullet_lines(text: Optional[str]) -> List[str]:
+    """'- 항목' 형식의 여러 줄 텍스트를 항목 리스트로 변환"""
+    if not text:
+        return []
+    lines = []
+    for line in text.strip().split('\n'):
+        line = line.strip()
+        if line.startswith('- '):
+            line = line[2:].strip()
+        elif line.startswith('-'):
+            line = line[1:].strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def split_ingredient(line: str) -> Dict[str, Optional[str]]:
+    """
+    재료 한 줄을 이름/수량으로 분리
+    (예: "Sesame oil (1 tablespoon)" -> name="Sesame oil", quantity="1 tablespoon")
+    """
+    match = INGREDIENT_COMMA_PATTERN.match(line) or INGREDIENT_PAREN_PATTERN.match(line)
+    if match and match.group(1).strip():
+        return {"name": match.group(1).strip().rstrip(','), "quantity": match.group(2).strip() or None}
+    return {"name": line.strip(), "quantity": None}
+
+
+def parse_recipe_xml(recipe_xml: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    <recipe> XML을 한 번만 파싱하여 정규화된 dict로 반환
+    (재료/단계/음료/팁을 섹션 태그 기준으로 찾으므로 영어/한국어 템플릿 모두 지원)
+    파싱에 실패하면 None 반환
+    """
+    if not recipe_xml or recipe_xml.startswith("<error>"):
+        return None
+
+    try:
+        xml_string = BARE_AMPERSAND_PATTERN.sub('&amp;', extract_recipe_xml(recipe_xml))
+        root = ET.fromstring(xml_string)
+    except ET.ParseError as e:
+        print(f"  [XML 파싱 오류] {e}")
+        return None
+
+    parsed = {
+        "title": _clean_text(root.findtext("title")),
+        "message": _clean_text(root.findtext("message")),
+        "total_time": None,
+        "ingredients": [],
+        "steps": [],
+        "drinks": [],
+        "tips": [],
+    }
+
+    for section in root.findall("section"):
+        section_title = section.findtext("title") or ""
+
+        ingredients_tag = section.find("ingredients")
+        if ingredients_tag is not None:
+            for position, line in enumerate(_bullet_lines(ingredients_tag.text), 1):
+                parsed["ingredients"].append({"position": position, "raw": line, **split_ingredient(line)})
+
+        steps_tag = section.find("steps")
+        if steps_tag is not None:
+            match = TOTAL_TIME_PATTERN.search(section_title)
+            if match:
+                parsed["total_time"] = int(match.group(1))
+
+            for step_no, step in enumerate(steps_tag.findall("step"), 1):
+                step_name = step.findtext("name") or ""
+                minutes_match = STEP_TIME_PATTERN.search(step_name)
+                name = STEP_TIME_SUFFIX_PATTERN.sub('', STEP_NUMBER_PREFIX_PATTERN.sub('', step_name)).strip()
+                parsed["steps"].append({
+                    "step_no": step_no,
+                    "name": name,
+                    "minutes": int(minutes_match.group(1)) if minutes_match else None,
+                    "description": _bullet_lines(step.findtext("description")),
+                })
+
+        recommendation_tag = section.find("recommendation")
+        if recommendation_tag is not None:
+            parsed["drinks"].extend(_bullet_lines(recommendation_tag.text))
+
+    tip_tag = root.find("tip")
+    if tip_tag is not None:
+        parsed["tips"] = _bullet_lines(tip_tag.findtext("content"))
+
+    # 단계별 시간은 있는데 총 시간이 없으면 합계로 대체
+    if parsed["total_time"] is None and any(step["minutes"] for step in parsed["steps"]):
+        parsed["total_time"] = sum(step["minutes"] or 0 for step in parsed["steps"])
+
+    return parsed
+
+
+# --- 재료명 정규화 (재료 → 레시피 역색인용) ---
+
+# 재료명에서 의미 없는 수식어 (정규화 시 제거)
+INGREDIENT_STOPWORDS = {
+    'fresh', 'large', 'small', 'medium', 'chopped', 'sliced', 'minced', 'diced', 'grated',
+    'dried', 'whole', 'optional', 'to', 'taste', 'of', 'and', 'or', 'for', 'a', 'an', 'the',
+    'finely', 'thinly', 'cooked', 'peeled', 'ground', 'cup', 'cups', 'piece', 'pieces',
+}
+INGREDIENT_PAREN_CONTENT_PATTERN = re.compile(r'\([^()]*\)')
+INGREDIENT_NON_WORD_PATTERN = re.compile(r'[^\w\s]')
+
+# 단어 단위 매칭은 재료명 전체 매칭보다 낮은 가중치
+PHRASE_WEIGHT = 1.0
+WORD_WEIGHT = 0.5
+
+
+def _singularize(word: str) -> str:
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 4 and word.endswith(('oes', 'ches', 'shes')):
+        return word[:-2]
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(name: Optional[str]) -> str:
+    """
+    재료명을 색인/검색용으로 정규화
+    (예: "Green onions, chopped (2 stalks)" -> "green onion")
+    """
+    if not name:
+        return ""
+    name = INGREDIENT_PAREN_CONTENT_PATTERN.sub(' ', name.lower())
+    name = name.split(',', 1)[0]
+    name = INGREDIENT_NON_WORD_PATTERN.sub(' ', name)
+    words = [_singularize(word) for word in name.split() if not word.isdigit()]
+    # 수식어(예: "large", "chopped")를 뺀 나머지가 있으면 그것만 사용
+    core_words = [word for word in words if word not in INGREDIENT_STOPWORDS]
+    return " ".join(core_words or words)
+
+
+def ingredient_terms(name: Optional[str]) -> Dict[str, float]:
+    """
+    재료명 하나를 역색인 term -> 가중치로 변환
+    정규화된 재료명 전체(1.0)와 개별 단어(0.5)를 색인
+    """
+    phrase = normalize_ingredient(name)
+    if not phrase:
+        return {}
+    terms = {}
+    for word in phrase.split():
+        if len(word) >= 2:
+            terms[word] = WORD_WEIGHT
+    terms[phrase] = PHRASE_WEIGHT
+    return terms
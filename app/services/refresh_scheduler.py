@@ -0,0 +1,88 @@
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
+from typing import Optional
+
+from app.core.config import settings
+from app.services import db_service
+
+# --- 랭킹 데이터 주기적 갱신 (앱 lifespan에서 시작) ---
+# - REFRESH_INTERVAL_MINUTES마다 scripts.pipeline(REFRESH_STAGES 단계)을 별도 프로세스로 실행
+#   (nice 명령으로 우선순위를 낮춰 API 요청/채팅 스트리밍보다 CPU를 덜 씀, 이벤트 루프는 종료만 기다림)
+#   preexec_fn은 스레드가 있는 프로세스(to_thread 풀)에서 fork 후 실행되어 안전하지 않으므로 쓰지 않음
+# - 실행 전후 data_versions가 바뀌었으면 프로세스 내 읽기 캐시를 비움
+# - 한 번에 하나만 실행 (이전 갱신이 끝난 뒤 다음 주기를 기다림)
+# - uvicorn 워커가 여러 개면 워커마다 스케줄러가 생기므로, 그때는 한 워커에서만 켜거나 cron 사용
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _read_data_version() -> int:
+    conn = db_service.get_db_connection()
+    try:
+        return db_service.get_data_version(conn)
+    finally:
+        conn.close()
+
+
+async def run_refresh_once(stages: list, nice: int) -> int:
+    """파이프라인을 낮은 우선순위 프로세스로 한 번 실행하고, 새 버전이 게시되었으면 읽기 캐시를 비움"""
+    version_before = await asyncio.to_thread(_read_data_version)
+    print(f"🔄 랭킹 데이터 갱신 시작 (단계: {', '.join(stages)}, nice {nice})")
+
+    command = [sys.executable, "-m", "scripts.pipeline", "--only", *stages]
+    if nice and shutil.which("nice"):
+        command = ["nice", "-n", str(nice), *command]  # 파이프라인이 띄우는 단계 프로세스도 같은 nice 값을 물려받음
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,  # 단계별 출력은 data/.pipeline/logs에 기록됨
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        returncode = await process.wait()
+    except asyncio.CancelledError:
+        # 앱 종료 시 실행 중인 갱신도 정리
+        process.terminate()
+        await process.wait()
+        raise
+
+    version_after = await asyncio.to_thread(_read_data_version)
+    if version_after != version_before:
+        db_service.invalidate_read_cache()
+        print(f"✅ 새 데이터 버전 {version_after} 게시 -> 읽기 캐시를 비웠습니다.")
+    if returncode != 0:
+        print(f"⚠️ 랭킹 데이터 갱신 실패 (종료 코드 {returncode}, data/.pipeline/logs 확인)")
+    return returncode
+
+
+async def refresh_loop(interval_minutes: float, stages: list, nice: int):
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            await run_refresh_once(stages, nice)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"🔴 랭킹 데이터 갱신 중 오류: {e}")
+
+
+def start() -> Optional[asyncio.Task]:
+    """설정에서 갱신 주기가 0보다 크면 백그라운드 갱신 작업을 시작 (0이면 사용 안 함)"""
+    if settings.REFRESH_INTERVAL_MINUTES <= 0:
+        return None
+    stages = settings.REFRESH_STAGES.split()
+    print(f"--- 랭킹 데이터 자동 갱신: {settings.REFRESH_INTERVAL_MINUTES}분마다 ({', '.join(stages)}) ---")
+    return asyncio.create_task(refresh_loop(settings.REFRESH_INTERVAL_MINUTES, stages, settings.REFRESH_NICE))
+
+
+async def stop(task: Optional[asyncio.Task]):
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
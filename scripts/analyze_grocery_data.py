@@ -1,6 +1,35 @@
 import pandas as pd
-import sqlite3
 import os
+import sys
+import argparse
+import re
+import resource
+from datetime import datetime, timedelta
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# 원자적 게시(db_publish)를 위해 scripts 모듈을 사용하므로,
+# 'python -m scripts.analyze_grocery_data'로 실행해야 함
+try:
+    from scripts.db_publish import (
+        connect_for_ingest, drop_stale_staging_tables, new_staging_token, staging_table_name, publish_tables
+    )
+    from scripts.grocery_cache import (
+        PARQUET_AVAILABLE, fact_cache_path, iter_cached_chunks, FactCacheWriter
+    )
+    from scripts.grocery_incremental import (
+        LEGACY_STATE_TABLES, default_state_path, load_state, save_state, rules_fingerprint, resume_offset,
+        csv_end_offset, tail_fingerprint
+    )
+    from scripts.csv_ranges import read_header, line_aligned_ranges, iter_csv_range, count_lines
+    from scripts.grocery_duckdb import DUCKDB_AVAILABLE, query_sales_cube
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.analyze_grocery_data\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
 
 # --- 1. 설정: 파일 경로 ---
 
@@ -12,113 +41,586 @@ DATA_DIR = os.path.join(BASE_DIR, "data", "grocery_data")
 # 데이터를 저장할 DB 파일 (루트 폴더의 kfood_recipes.db)
 DB_FILE = os.path.join(BASE_DIR, "kfood_recipes.db")
 TABLE_NAME = "grocery_sales" # '상품별 판매량'을 저장할 테이블
+RANKINGS_TABLE = "grocery_rankings" # 지역 x 기간별 재료 Top N을 저장할 테이블
+
+# 분석에 필요한 파일/컬럼만 작은 dtype으로 로드 (employees는 사용하지 않음)
+CSV_SPECS = {
+    "products": {
+        "file": "products.csv",
+        "usecols": ["ProductID", "ProductName", "CategoryID"],
+        "dtype": {"ProductID": "int32", "ProductName": "object", "CategoryID": "int16"},
+    },
+    "categories": {
+        "file": "categories.csv",
+        "usecols": ["CategoryID", "CategoryName"],
+        "dtype": {"CategoryID": "int16", "CategoryName": "category"},
+    },
+    "customers": {
+        "file": "customers.csv",
+        "usecols": ["CustomerID", "CityID"],
+        "dtype": {"CustomerID": "int32", "CityID": "int16"},
+    },
+    "cities": {
+        "file": "cities.csv",
+        "usecols": ["CityID", "CityName", "CountryID"],
+        "dtype": {"CityID": "int16", "CityName": "object", "CountryID": "int16"},
+    },
+    "countries": {
+        "file": "countries.csv",
+        "usecols": ["CountryID", "CountryName"],
+        "dtype": {"CountryID": "int16", "CountryName": "object"},
+    },
+    "sales": {
+        "file": "sales.csv",
+        "usecols": ["SalesID", "CustomerID", "ProductID", "Quantity", "TotalPrice", "SalesDate"],
+        "dtype": {
+            "SalesID": "int32", "CustomerID": "int32", "ProductID": "int32",
+            "Quantity": "int32", "TotalPrice": "float32", "SalesDate": "object",
+        },
+    },
+}
+
+# sales.csv는 한 번에 읽지 않고 이 행 수만큼씩 읽어 누적 집계 (최대 메모리 = 청크 크기)
+SALES_CHUNK_SIZE = 500_000
+
+# 병렬 모드에서 워커당 파티션 수 (파티션별 처리 시간 편차를 분산)
+PARTITIONS_PER_WORKER = 4
+
+# 집계에 필요한 팩트 테이블 컬럼 (Parquet 캐시에서는 이 컬럼만 읽음)
+AGGREGATE_COLUMNS = ["SalesID", "CustomerID", "ProductID", "Quantity", "TotalPrice", "SalesDate"]
+
+# 부분 집계 단위: 상품 x 도시 x 판매일 (지역/기간별 순위를 원본 판매 행 없이 다시 계산할 수 있는 최소 단위)
+# 고객의 도시를 모르면 CityID 0, 판매일이 없으면 SalesDay ''로 집계 (전체 기간/전체 지역 순위에만 포함)
+PARTIAL_KEYS = ['ProductID', 'CityID', 'SalesDay']
+CITY_KEYS = ['ProductID', 'CityID']
+UNKNOWN_CITY_ID = 0
+
+# 청크별 부분 집계를 이 개수만큼 모았다가 한 번에 병합 (매 청크마다 누적값 전체를 다시 그룹화하지 않도록)
+PARTIAL_MERGE_BATCH = 8
+
+# 미리 계산할 기간(데이터의 마지막 판매일 기준 최근 N일, None = 전체 기간)과 지역/기간별 저장 순위 수
+RANKING_WINDOWS = {"7d": 7, "30d": 30, "90d": 90, "all": None}
+RANKING_TOP_N = 50
+
+# 증분 상태에 일별 집계를 남겨 둘 기간 (가장 긴 순위 기간, 그 이전은 도시별 누적값에만 반영)
+RECENT_DAYS = max(days for days in RANKING_WINDOWS.values() if days)
 
-def load_dataframes():
-    """CSV 파일 7개를 로드"""
-    print("--- 7개 CSV 파일 로드를 시작합니다... ---")
+# 지역(scope, region) x 기간(time_window) x 순위 PK -> API는 PK 구간 한 번만 읽음
+RANKINGS_DDL = """
+CREATE TABLE {table} (
+    scope TEXT NOT NULL,
+    region TEXT NOT NULL COLLATE NOCASE,
+    region_name TEXT NOT NULL COLLATE NOCASE,
+    time_window TEXT NOT NULL,
+    IngredientRank INTEGER NOT NULL,
+    IngredientName TEXT NOT NULL,
+    TotalQuantity INTEGER NOT NULL,
+    TotalRevenue REAL NOT NULL,
+    SalesCount INTEGER NOT NULL,
+    PRIMARY KEY (scope, region, time_window, IngredientRank)
+) WITHOUT ROWID
+"""
+
+# 음식이 아닌 카테고리 키워드 목록
+NON_FOOD_CATEGORIES = [
+    'towels', 'towel', 'cleaning', 'household', 'bath', 'kitchenware',
+    'appliance', 'electronics', 'furniture', 'clothing', 'textile'
+]
+
+# 음식이 아닌 제품명 키워드 목록
+NON_FOOD_KEYWORDS = [
+    'towel', 'towels', 'cleaning', 'detergent', 'soap', 'shampoo',
+    'toothpaste', 'brush', 'sponge', 'tissue', 'napkin', 'paper', 'table'
+]
+
+# 키워드 매칭용 정규식은 한 번만 컴파일
+NON_FOOD_CATEGORY_PATTERN = re.compile('|'.join(map(re.escape, NON_FOOD_CATEGORIES)), re.IGNORECASE)
+NON_FOOD_KEYWORD_PATTERN = re.compile('|'.join(map(re.escape, NON_FOOD_KEYWORDS)), re.IGNORECASE)
+
+# 집계 대상(음식 상품)을 결정하는 규칙 (캐시 키 / 증분 상태 무효화에 사용)
+FOOD_FILTER_RULES = {"non_food_categories": NON_FOOD_CATEGORIES, "non_food_keywords": NON_FOOD_KEYWORDS}
+
+def peak_rss_mb():
+    """현재 프로세스의 최대 RSS (MB, Linux는 KB 단위 / macOS는 byte 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def read_csv_spec(name, data_dir=DATA_DIR, **kwargs):
+    spec = CSV_SPECS[name]
+    return pd.read_csv(
+        os.path.join(data_dir, spec["file"]),
+        usecols=spec["usecols"],
+        dtype=spec["dtype"],
+        **kwargs
+    )
+
+def load_dataframes(data_dir=DATA_DIR):
+    """작은 차원 테이블(products, categories, customers, cities, countries)만 로드 (sales는 청크 단위로 처리)"""
+    print("--- CSV 파일 로드를 시작합니다... ---")
     try:
-        file_paths = {
-            "products": "products.csv",
-            "sales": "sales.csv",
-            "cities": "cities.csv",
-            "categories": "categories.csv",
-            "customers": "customers.csv",
-            "employees": "employees.csv",
-            "countries": "countries.csv"
-        }
-        
         dataframes = {}
-        for name, file in file_paths.items():
-            path = os.path.join(DATA_DIR, file)
-            dataframes[name] = pd.read_csv(path)
-            print(f"✅ '{file}' 로드 성공.")
+        for name in ("products", "categories", "customers", "cities", "countries"):
+            dataframes[name] = read_csv_spec(name, data_dir)
+            print(f"✅ '{CSV_SPECS[name]['file']}' 로드 성공. ({len(dataframes[name])}행)")
             
-        print("--- 7개 CSV 파일 로드 완료 ---")
+        print("--- CSV 파일 로드 완료 ---")
         return dataframes
 
     except FileNotFoundError as e:
         print(f"❌ 오류: {e.filename} 파일을 찾을 수 없습니다.")
-        print(f"'{DATA_DIR}' 폴더에 파일이 모두 있는지 확인하세요.")
+        print(f"'{data_dir}' 폴더에 파일이 모두 있는지 확인하세요.")
         return None
     except Exception as e:
         print(f"❌ 파일 로드 중 오류 발생: {e}")
         return None
 
-def analyze_sales(data):
-    """데이터를 병합하고 분석 (Cell 2, 3, 4)"""
-    
-    print("\n--- 분석 시작... ---")
-    
-    # --- Cell 2: Sales + Products 병합 ---
-    merged_df = pd.merge(
-        data['sales'], 
-        data['products'], 
-        on='ProductID', 
-        how='left'
+def aggregate_chunk(chunk, customer_cities):
+    """
+    sales 청크 하나를 (ProductID, CityID, SalesDay)별 부분 집계로 축약 (청크 간 누적은 int64로)
+    매출은 정수 센트(RevenueCents)로 합산하므로 청크/파티션을 어떻게 나눠도 합계가 동일
+    """
+    revenue_cents = (chunk['TotalPrice'].fillna(0).astype('float64') * 100).round().astype('int64')
+    city_ids = chunk['CustomerID'].map(customer_cities).fillna(UNKNOWN_CITY_ID).astype('int16')
+    sales_days = chunk['SalesDate'].str.slice(0, 10).fillna('')
+    return chunk.assign(RevenueCents=revenue_cents, CityID=city_ids, SalesDay=sales_days).groupby(PARTIAL_KEYS).agg(
+        TotalQuantity=('Quantity', 'sum'),
+        RevenueCents=('RevenueCents', 'sum'),
+        SalesCount=('SalesID', 'count')
+    ).astype({'TotalQuantity': 'int64', 'RevenueCents': 'int64', 'SalesCount': 'int64'})
+
+def merge_partials(partials, keys=PARTIAL_KEYS):
+    """keys((ProductID, CityID, SalesDay) 또는 (ProductID, CityID))별 부분 집계들을 합산"""
+    partials = [partial for partial in partials if partial is not None and len(partial)]
+    if not partials:
+        key_dtypes = {'ProductID': 'int32', 'CityID': 'int16', 'SalesDay': 'object'}
+        return pd.DataFrame(
+            {'TotalQuantity': pd.Series(dtype='int64'), 'RevenueCents': pd.Series(dtype='int64'), 'SalesCount': pd.Series(dtype='int64')},
+            index=pd.MultiIndex.from_arrays([pd.Series(dtype=key_dtypes[key]) for key in keys], names=keys)
+        )
+    return pd.concat(partials).groupby(level=keys).sum()
+
+def totals_by_product(sales_cube):
+    """부분 집계를 ProductID별 전체 기간/전체 지역 합계로 축약"""
+    return sales_cube.groupby(level='ProductID').sum()
+
+def city_totals(sales_cube):
+    """(상품, 도시, 판매일) 부분 집계를 (상품, 도시)별 전체 기간 합계로 축약"""
+    return merge_partials([sales_cube.groupby(level=CITY_KEYS).sum()], CITY_KEYS)
+
+def recent_window_start(daily):
+    """일별 집계를 남겨 둘 첫 날짜 (마지막 판매일 기준 최근 RECENT_DAYS일, 판매일이 없으면 None)"""
+    days = daily.index.get_level_values('SalesDay')
+    days = days[days != '']
+    if len(days) == 0:
+        return None
+    return (datetime.strptime(days.max(), '%Y-%m-%d') - timedelta(days=RECENT_DAYS - 1)).strftime('%Y-%m-%d')
+
+def recent_daily(sales_cube, keep_from_day):
+    """keep_from_day 이후(판매일이 있는) 일별 집계만 남김"""
+    days = sales_cube.index.get_level_values('SalesDay')
+    if keep_from_day is None:
+        return sales_cube.iloc[0:0]
+    return sales_cube[days >= keep_from_day]
+
+def clean_food_sales_chunks(chunks, food_products):
+    """
+    sales 청크에서 음식 상품 판매 행만 남기고
+    IngredientName/CategoryName을 붙인 정제된 팩트 청크를 반환
+    """
+    ingredient_names = pd.CategoricalDtype(sorted(food_products['IngredientName'].dropna().unique()))
+    category_names = pd.CategoricalDtype(sorted(food_products['CategoryName'].dropna().astype('object').unique()))
+    product_dims = food_products[['ProductID', 'IngredientName', 'CategoryName']].astype(
+        {'IngredientName': ingredient_names, 'CategoryName': category_names}
     )
-    print("✅ (1/3) 'Sales'와 'Products' 병합 완료.")
+    for chunk in chunks:
+        chunk = chunk[chunk['ProductID'].isin(product_dims['ProductID'])]
+        yield chunk.merge(product_dims, on='ProductID', how='left')
 
-    # --- 카테고리 정보 병합 (음식 필터링용) ---
-    merged_df_with_category = pd.merge(
-        merged_df,
-        data['categories'],
-        on='CategoryID',
-        how='left'
+def iter_food_sales_chunks(food_products, data_dir=DATA_DIR, chunksize=SALES_CHUNK_SIZE, end_offset=None):
+    """
+    sales.csv의 처음 ~ end_offset(완성된 마지막 줄 끝) 구간을 청크 단위로 읽어 정제된 팩트 청크를 반환
+    (워터마크로 저장하는 end_offset 이후 행은 읽지 않음 -> 다음 증분 실행에서 한 번만 반영)
+    """
+    path = os.path.join(data_dir, CSV_SPECS["sales"]["file"])
+    if end_offset is None:
+        end_offset = csv_end_offset(path)
+    names, data_start = read_header(path)
+    spec = CSV_SPECS["sales"]
+    chunks = iter_csv_range(path, data_start, end_offset, spec["usecols"], spec["dtype"], chunksize, names)
+    yield from clean_food_sales_chunks(chunks, food_products)
+
+def iter_sales_delta_chunks(food_products, data_dir, chunksize, offset, end_offset):
+    """
+    워터마크 이후 sales.csv에 새로 추가된 구간(offset ~ end_offset)만 읽어 정제된 팩트 청크를 반환
+    (이미 반영한 행은 바이트 오프셋 워터마크 앞에 있으므로 SalesID로 거르지 않음 -> SalesID 순서와 무관)
+    """
+    spec = CSV_SPECS["sales"]
+    chunks = iter_csv_range(
+        os.path.join(data_dir, spec["file"]), offset, end_offset, spec["usecols"], spec["dtype"], chunksize
     )
+    yield from clean_food_sales_chunks(chunks, food_products)
+
+def sales_fact_cache_path(data_dir, cache_dir, end_offset):
+    """
+    입력 CSV 해시 + 음식 필터 규칙 + 읽을 끝 위치(end_offset)로 결정되는 Parquet 캐시 경로 (캐시 미사용 시 None)
+    (캐시에는 sales.csv의 end_offset까지만 들어 있으므로 끝 위치도 키에 포함)
+    """
+    if cache_dir is None or not PARQUET_AVAILABLE:
+        return None
+    input_paths = [os.path.join(data_dir, CSV_SPECS[name]["file"]) for name in ("sales", "products", "categories")]
+    return fact_cache_path(cache_dir, input_paths, {**FOOD_FILTER_RULES, "sales_end_offset": end_offset})
+
+def iter_sales_fact_chunks(food_products, data_dir=DATA_DIR, chunksize=SALES_CHUNK_SIZE, cache_dir=None, end_offset=None):
+    """
+    sales.csv의 end_offset까지의 정제된 판매 팩트 청크를 반환
+    - cache_dir가 있고 입력 CSV 해시가 같은 Parquet 캐시가 있으면: CSV를 건너뛰고 집계 컬럼만 memory-map으로 읽음
+    - 캐시가 없으면: CSV에서 정제하면서 동시에 Parquet 캐시를 작성
+    """
+    if cache_dir is None or not PARQUET_AVAILABLE:
+        if cache_dir is not None:
+            print("⚠️ pyarrow가 설치되어 있지 않아 Parquet 캐시를 사용하지 않습니다.")
+        yield from iter_food_sales_chunks(food_products, data_dir, chunksize, end_offset)
+        return
+
+    if end_offset is None:
+        end_offset = csv_end_offset(os.path.join(data_dir, CSV_SPECS["sales"]["file"]))
+    cache_path = sales_fact_cache_path(data_dir, cache_dir, end_offset)
+
+    if os.path.exists(cache_path):
+        print(f"✅ 캐시 적중: '{cache_path}' (CSV 파싱/병합 생략)")
+        yield from iter_cached_chunks(cache_path, columns=AGGREGATE_COLUMNS, batch_size=chunksize)
+        return
+
+    print(f"캐시 없음: CSV에서 정제하며 '{cache_path}' 작성")
+    writer = FactCacheWriter(cache_path)
+    try:
+        for chunk in iter_food_sales_chunks(food_products, data_dir, chunksize, end_offset):
+            writer.write(chunk)
+            yield chunk
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+def fold_sales_chunks(chunks, customer_cities):
+    """팩트 청크들을 부분 집계로 누적 ((부분 집계, 반영한 마지막 SalesID/SalesDate, 처리 통계) 반환)"""
+    product_sales, pending = None, []
+    progress = {'last_sales_id': None, 'last_sales_date': None}
+    stats = {'rows': 0, 'full_frame_bytes': 0, 'max_chunk_bytes': 0}
+    for chunk in chunks:
+        if len(chunk):
+            progress = merge_progress(progress, {
+                'last_sales_id': int(chunk['SalesID'].max()),
+                'last_sales_date': chunk['SalesDate'].dropna().max() if chunk['SalesDate'].notna().any() else None,
+            })
+        chunk_bytes = chunk.memory_usage(deep=True).sum()
+        stats['rows'] += len(chunk)
+        stats['full_frame_bytes'] += chunk_bytes
+        stats['max_chunk_bytes'] = max(stats['max_chunk_bytes'], chunk_bytes)
+        pending.append(aggregate_chunk(chunk, customer_cities))
+        if len(pending) >= PARTIAL_MERGE_BATCH:
+            product_sales, pending = merge_partials([product_sales, *pending]), []
+    return merge_partials([product_sales, *pending]), progress, stats
+
+def aggregate_sales_cube(chunks, customer_cities):
+    """
+    정제된 판매 팩트 청크들을 스트리밍하며 (상품, 도시, 판매일)별 (판매량, 매출액, 판매 횟수)를 누적 집계
+    누적 결과는 판매 행이 아닌 집계 단위 수만큼만 유지하므로 최대 메모리는 파일 크기가 아닌 청크 크기에 비례
+    (상품별 집계, 반영한 마지막 SalesID/SalesDate) 튜플을 반환
+    """
+    print(f"\n--- 판매 데이터 청크 집계 시작 ---")
+    product_sales, progress, stats = fold_sales_chunks(chunks, customer_cities)
+    full_frame_bytes, max_chunk_bytes = stats['full_frame_bytes'], stats['max_chunk_bytes']
+    print(f"✅ 음식 판매 {stats['rows']:,}행 집계 완료 (상품 x 도시 x 판매일 {len(product_sales):,}개).")
+    print(
+        f"   메모리: 전체 로드 시 판매 프레임 약 {full_frame_bytes / 1024**2:,.1f}MB "
+        f"-> 청크 최대 {max_chunk_bytes / 1024**2:,.1f}MB "
+        f"(절감 {(full_frame_bytes - max_chunk_bytes) / 1024**2:,.1f}MB), 프로세스 최대 RSS {peak_rss_mb():,.1f}MB"
+    )
+    return product_sales, progress
+
+# 병렬 모드 워커 프로세스에서 사용할 음식 ProductID와 고객 -> 도시 매핑 (initializer로 한 번만 전달)
+_worker_product_ids = None
+_worker_customer_cities = None
+
+def _init_partition_worker(product_ids, customer_cities):
+    global _worker_product_ids, _worker_customer_cities
+    _worker_product_ids = product_ids
+    _worker_customer_cities = customer_cities
+
+def aggregate_sales_partition(task):
+    """(워커 프로세스) sales.csv의 바이트 구간 하나를 ProductID별 부분 집계로 축약"""
+    path, start, end, names, chunksize = task
+    spec = CSV_SPECS["sales"]
+    chunks = iter_csv_range(path, start, end, spec["usecols"], spec["dtype"], chunksize, names)
+    food_chunks = (chunk[chunk['ProductID'].isin(_worker_product_ids)] for chunk in chunks)
+    product_sales, progress, stats = fold_sales_chunks(food_chunks, _worker_customer_cities)
+    return product_sales, progress, stats['rows']
+
+def aggregate_sales_parallel(food_products, customer_cities, data_dir, chunksize, start, end, workers):
+    """
+    sales.csv의 [start, end) 구간을 줄 경계에 맞춘 파티션으로 나누어
+    프로세스 풀에서 파티션별 부분 집계 후 병합 (단일 프로세스 경로와 결과 동일)
+    """
+    path = os.path.join(data_dir, CSV_SPECS["sales"]["file"])
+    names, data_start = read_header(path)
+    ranges = line_aligned_ranges(path, max(start, data_start), end, workers * PARTITIONS_PER_WORKER)
+    print(f"\n--- 판매 데이터 병렬 집계 시작 (워커 {workers}개, 파티션 {len(ranges)}개) ---")
+
+    tasks = [(path, range_start, range_end, names, chunksize) for range_start, range_end in ranges]
+    product_ids = food_products['ProductID'].to_numpy()
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_partition_worker, initargs=(product_ids, customer_cities)) as pool:
+        results = list(pool.map(aggregate_sales_partition, tasks))
+
+    product_sales = merge_partials([partial for partial, _, _ in results])
+    progress = merge_progress(*[partition_progress for _, partition_progress, _ in results])
+    rows = sum(partition_rows for _, _, partition_rows in results)
+    print(
+        f"✅ 음식 판매 {rows:,}행 병렬 집계 완료 (상품 x 도시 x 판매일 {len(product_sales):,}개, "
+        f"{time.perf_counter() - started:,.1f}s, 메인 프로세스 최대 RSS {peak_rss_mb():,.1f}MB)."
+    )
+    return product_sales, progress
+
+def merge_progress(*progresses):
+    """워터마크 후보들 중 가장 최근 SalesID/SalesDate를 선택"""
+    merged = {}
+    for key in ('last_sales_id', 'last_sales_date'):
+        values = [progress[key] for progress in progresses if progress and progress.get(key) is not None]
+        merged[key] = max(values) if values else None
+    return merged
+
+def aggregate_sales_duckdb(food_products, data_dir, cache_dir=None, threads=None, end_offset=None):
+    """
+    DuckDB 엔진: sales.csv의 end_offset까지(또는 같은 구간의 Parquet 캐시)를 SQL 한 번으로 (상품, 도시, 판매일)별 집계
+    pandas 엔진과 같은 (부분 집계, 반영한 마지막 SalesID/SalesDate) 튜플을 반환
+    """
+    csv_path = os.path.join(data_dir, CSV_SPECS["sales"]["file"])
+    if end_offset is None:
+        end_offset = csv_end_offset(csv_path)
+    cache_path = sales_fact_cache_path(data_dir, cache_dir, end_offset)
+    parquet = cache_path is not None and os.path.exists(cache_path)
+    sales_path = cache_path if parquet else csv_path
+    print(f"\n--- DuckDB 집계 시작 ('{sales_path}') ---")
+
+    started = time.perf_counter()
+    # CSV는 헤더 다음부터 end_offset까지의 행 수만 읽음 (Parquet 캐시는 이미 그 구간만 담고 있음)
+    row_limit = None if parquet else count_lines(csv_path, read_header(csv_path)[1], end_offset)
+    result = query_sales_cube(
+        sales_path,
+        os.path.join(data_dir, CSV_SPECS["customers"]["file"]),
+        food_products['ProductID'].to_numpy(),
+        parquet=parquet,
+        threads=threads,
+        row_limit=row_limit
+    )
+    progress = {
+        'last_sales_id': int(result['LastSalesID'].max()) if len(result) else None,
+        'last_sales_date': result['LastSalesDate'].dropna().max() if result['LastSalesDate'].notna().any() else None,
+    }
+    sales_cube = result.drop(columns=['LastSalesID', 'LastSalesDate']).astype({
+        'ProductID': 'int32', 'CityID': 'int16', 'SalesDay': 'object',
+        'TotalQuantity': 'int64', 'RevenueCents': 'int64', 'SalesCount': 'int64',
+    }).set_index(PARTIAL_KEYS).sort_index()
+    print(
+        f"✅ 음식 판매 {int(sales_cube['SalesCount'].sum()):,}행 DuckDB 집계 완료 (상품 x 도시 x 판매일 {len(sales_cube):,}개, "
+        f"{time.perf_counter() - started:,.1f}s, 프로세스 최대 RSS {peak_rss_mb():,.1f}MB)."
+    )
+    return sales_cube, progress
+
+def aggregate_full_history(food_products, customer_cities, data_dir, chunksize, cache_dir=None, workers=1, engine="pandas", end_offset=None):
+    """
+    sales의 처음 ~ end_offset 구간을 선택한 엔진(pandas 단일/병렬, duckdb)으로 집계
+    (모든 엔진이 같은 구간만 읽음 -> 워터마크로 저장하는 end_offset과 실제로 반영한 행이 일치)
+    """
+    if end_offset is None:
+        end_offset = csv_end_offset(os.path.join(data_dir, CSV_SPECS["sales"]["file"]))
+    if engine == "duckdb":
+        if DUCKDB_AVAILABLE:
+            return aggregate_sales_duckdb(
+                food_products, data_dir, cache_dir, threads=workers if workers > 1 else None, end_offset=end_offset
+            )
+        print("⚠️ duckdb가 설치되어 있지 않아 pandas 엔진으로 집계합니다.")
+    if workers > 1:
+        return aggregate_sales_parallel(food_products, customer_cities, data_dir, chunksize, 0, end_offset, workers)
+    return aggregate_sales_cube(
+        iter_sales_fact_chunks(food_products, data_dir, chunksize, cache_dir, end_offset), customer_cities
+    )
+
+def compute_sales_cube(food_products, customer_cities, data_dir, state_path, chunksize, cache_dir=None, full_rebuild=False, workers=1, engine="pandas"):
+    """
+    (상품, 도시)별 전체 기간 누적 집계와 최근 RECENT_DAYS일의 (상품, 도시, 판매일)별 집계를 계산
+    - 저장된 워터마크가 있고 sales.csv가 그 뒤로 append만 되었다면: 새 행만 읽어 상태(고정 크기)에 더함
+    - 첫 실행 / --full-rebuild / 입력 규칙 변경 시: 전체 재집계
+    - workers > 1이면 읽을 구간을 파티션으로 나누어 프로세스 풀에서 집계 (Parquet 캐시는 사용하지 않음)
+    - engine="duckdb"면 전체 재집계를 DuckDB SQL로 수행 (증분 구간은 작으므로 pandas로 처리)
+    상태는 서빙 DB가 아닌 state_path에 저장
+    (도시별 누적, 최근 일별, 게시 성공 후 증분 상태를 저장할 함수) 튜플을 반환
+    """
+    sales_path = os.path.join(data_dir, CSV_SPECS["sales"]["file"])
+    dimension_paths = [os.path.join(data_dir, CSV_SPECS[name]["file"]) for name in ("products", "categories", "customers")]
+    rules_key = rules_fingerprint(dimension_paths, FOOD_FILTER_RULES)
+    end_offset = csv_end_offset(sales_path)
+
+    state = None if full_rebuild else load_state(state_path)
+    offset = resume_offset(sales_path, state[0], rules_key) if state else None
+
+    if offset is None:
+        print("--- 전체 재집계 모드 ---")
+        delta, progress = aggregate_full_history(
+            food_products, customer_cities, data_dir, chunksize, cache_dir, workers, engine, end_offset
+        )
+        totals, daily = city_totals(delta), delta
+    else:
+        watermark, saved_totals, saved_daily = state
+        print(
+            f"--- 증분 모드: 워터마크(SalesID {watermark['last_sales_id']}, {watermark['last_sales_date']}) 이후 "
+            f"{(end_offset - offset) / 1024**2:,.1f}MB만 반영 "
+            f"(상태: 도시별 누적 {len(saved_totals):,}행, 최근 일별 {len(saved_daily):,}행) ---"
+        )
+        if workers > 1:
+            delta, delta_progress = aggregate_sales_parallel(
+                food_products, customer_cities, data_dir, chunksize, offset, end_offset, workers
+            )
+        else:
+            delta, delta_progress = aggregate_sales_cube(
+                iter_sales_delta_chunks(food_products, data_dir, chunksize, offset, end_offset),
+                customer_cities
+            )
+        totals = merge_partials([saved_totals, city_totals(delta)], CITY_KEYS)
+        daily = merge_partials([saved_daily, delta])
+        progress = merge_progress(watermark, delta_progress)
+
+    # 가장 긴 순위 기간보다 오래된 날짜는 일별 상태에서 제외 (도시별 누적값에는 이미 반영됨)
+    keep_from_day = recent_window_start(daily)
+    daily = recent_daily(daily, keep_from_day)
+
+    tail_sha256 = tail_fingerprint(sales_path, end_offset)
+    # 전체 재집계면 상태를 통째로 교체, 증분이면 새로 바뀐 집계 단위만 누적 (저장 비용도 증가분에 비례)
+    replace = offset is None
+    def save_incremental_state():
+        save_state(
+            state_path, city_totals(delta), recent_daily(delta, keep_from_day), progress, end_offset, tail_sha256,
+            rules_key, replace, keep_from_day
+        )
+    return totals, daily, save_incremental_state
+
+def prepare_products(products, categories):
+    """
+    작은 products 테이블에서 상품별로 한 번만 정제
+    - 카테고리명 병합 후 음식이 아닌 카테고리/제품명 제외 (미리 컴파일한 정규식, 벡터 연산)
+    - ProductName의 " - " 이전 부분을 IngredientName으로 추출 (예: "Bread - Calabrese Baguette" -> "Bread")
+    반환된 상품의 ProductID만 sales 집계 대상이 됨
+    """
+    food_products = pd.merge(products, categories, on='CategoryID', how='left')
     
-    # 음식이 아닌 카테고리/제품명 필터링
-    # 음식이 아닌 카테고리 키워드 목록
-    NON_FOOD_CATEGORIES = [
-        'towels', 'towel', 'cleaning', 'household', 'bath', 'kitchenware',
-        'appliance', 'electronics', 'furniture', 'clothing', 'textile'
-    ]
-    
-    # 음식이 아닌 제품명 키워드 목록
-    NON_FOOD_KEYWORDS = [
-        'towel', 'towels', 'cleaning', 'detergent', 'soap', 'shampoo',
-        'toothpaste', 'brush', 'sponge', 'tissue', 'napkin', 'paper', 'table'
-    ]
+    # 카테고리명 / 제품명이 음식이 아닌 경우 필터링
+    non_food = (
+        food_products['CategoryName'].astype('object').str.contains(NON_FOOD_CATEGORY_PATTERN, na=False)
+        | food_products['ProductName'].str.contains(NON_FOOD_KEYWORD_PATTERN, na=False)
+    )
+    food_products = food_products[~non_food].copy()
     
-    # 카테고리명이 음식이 아닌 경우 필터링
-    if 'CategoryName' in merged_df_with_category.columns:
-        merged_df_with_category = merged_df_with_category[
-            ~merged_df_with_category['CategoryName'].str.lower().str.contains(
-                '|'.join(NON_FOOD_CATEGORIES), na=False, case=False
-            )
-        ]
+    food_products['IngredientName'] = food_products['ProductName'].str.split(' - ', n=1).str[0].str.strip()
     
-    # 제품명이 음식이 아닌 경우 필터링
-    if 'ProductName' in merged_df_with_category.columns:
-        merged_df_with_category = merged_df_with_category[
-            ~merged_df_with_category['ProductName'].str.lower().str.contains(
-                '|'.join(NON_FOOD_KEYWORDS), na=False, case=False
+    print(f"✅ 음식이 아닌 상품 제외 및 IngredientName 추출 완료. (음식 상품 {len(food_products)}/{len(products)}개)")
+    return food_products
+
+def prepare_geo(customers, cities, countries):
+    """
+    고객 -> 도시 매핑(CustomerID 인덱스 Series)과 도시별 도시명/국가명 테이블을 만듦
+    (sales에는 CustomerID만 있으므로 청크 집계 시 이 매핑으로 CityID를 붙임)
+    """
+    customer_cities = customers.set_index('CustomerID')['CityID']
+    geo = pd.merge(cities, countries, on='CountryID', how='left')[['CityID', 'CityName', 'CountryName']]
+    print(f"✅ 지역 정보 준비 완료. (고객 {len(customer_cities):,}명, 도시 {len(geo)}개, 국가 {geo['CountryName'].nunique()}개)")
+    return customer_cities, geo
+
+def build_regional_rankings(totals, daily, food_products, geo, top_n=RANKING_TOP_N):
+    """
+    도시별 누적(totals)과 최근 일별 집계(daily)로 지역(전체/국가/도시) x 기간(최근 7/30/90일, 전체)별 재료 Top N을 계산
+    - 전체 기간은 totals, 최근 N일은 daily에서 계산 (기간은 데이터의 마지막 판매일 기준, 'YYYY-MM-DD' 문자열 비교)
+    - 도시 순위는 CityID로 묶음 (region = CityID, region_name = 도시명 -> 이름이 같은 다른 도시를 합치지 않음)
+    """
+    print("\n--- 지역/기간별 재료 순위 계산 시작 ---")
+    geo = geo.assign(CityKey=geo['CityID'].astype(str))
+
+    def by_ingredient_city(frame, keys):
+        # 재료 x 도시(x 판매일)로 먼저 축약 (같은 재료의 여러 상품을 합침)
+        return frame.reset_index().merge(
+            food_products[['ProductID', 'IngredientName']], on='ProductID', how='inner'
+        ).groupby(['IngredientName', 'CityID'] + keys).agg(
+            TotalQuantity=('TotalQuantity', 'sum'),
+            RevenueCents=('RevenueCents', 'sum'),
+            SalesCount=('SalesCount', 'sum')
+        ).reset_index().merge(geo, on='CityID', how='left')
+
+    all_time = by_ingredient_city(totals, [])
+    recent = by_ingredient_city(daily, ['SalesDay'])
+
+    dated = recent.loc[recent['SalesDay'] != '', 'SalesDay']
+    as_of = datetime.strptime(dated.max(), '%Y-%m-%d') if len(dated) else None
+    print(f"기준일(마지막 판매일): {as_of.strftime('%Y-%m-%d') if as_of else '없음'}")
+
+    frames = []
+    for time_window, days in RANKING_WINDOWS.items():
+        if days is None:
+            in_window = all_time
+        elif as_of is None:
+            continue
+        else:
+            start_day = (as_of - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+            in_window = recent[recent['SalesDay'] >= start_day]
+
+        for scope, region_column, name_column in (
+            ("global", None, None), ("country", "CountryName", "CountryName"), ("city", "CityKey", "CityName")
+        ):
+            if region_column is None:
+                scoped = in_window.assign(region='all', region_name='all')
+            else:
+                scoped = in_window.dropna(subset=[region_column, name_column]).assign(
+                    region=lambda df: df[region_column], region_name=lambda df: df[name_column]
+                )
+            summary = scoped.groupby(['region', 'region_name', 'IngredientName']).agg(
+                TotalQuantity=('TotalQuantity', 'sum'),
+                RevenueCents=('RevenueCents', 'sum'),
+                SalesCount=('SalesCount', 'sum')
+            ).reset_index().sort_values(
+                ['region', 'TotalQuantity', 'IngredientName'], ascending=[True, False, True]
             )
-        ]
+            summary['IngredientRank'] = summary.groupby('region').cumcount() + 1
+            frames.append(summary[summary['IngredientRank'] <= top_n].assign(scope=scope, time_window=time_window))
+
+    rankings = pd.concat(frames, ignore_index=True)
+    rankings['TotalRevenue'] = rankings['RevenueCents'] / 100
+    rankings = rankings[[
+        'scope', 'region', 'region_name', 'time_window', 'IngredientRank', 'IngredientName',
+        'TotalQuantity', 'TotalRevenue', 'SalesCount'
+    ]]
+    print(f"✅ 지역/기간별 순위 {len(rankings):,}행 계산 완료.")
+    return rankings
+
+def analyze_sales(data):
+    """음식 상품별 부분 집계에 정제된 상품 정보를 붙여 분석 (Cell 2, 3, 4)"""
     
-    print(f"✅ 음식이 아닌 항목 필터링 완료. (남은 행 수: {len(merged_df_with_category)})")
-
-    # --- ProductName 정제: "-" 이전 부분만 추출 ---
-    def extract_ingredient_name(product_name):
-        """ProductName에서 재료명만 추출 (예: "Bread - Calabrese Baguette" -> "Bread")"""
-        if pd.isna(product_name):
-            return product_name
-        product_name_str = str(product_name)
-        if ' - ' in product_name_str:
-            return product_name_str.split(' - ')[0].strip()
-        return product_name_str.strip()
+    print("\n--- 분석 시작... ---")
     
-    merged_df_with_category['IngredientName'] = merged_df_with_category['ProductName'].apply(
-        extract_ingredient_name
+    # --- Cell 2: (음식 상품만 상품별로 집계된) Sales + 정제된 Products 병합 ---
+    merged_df_with_category = pd.merge(
+        totals_by_product(data['sales_totals']).reset_index(), 
+        data['food_products'], 
+        on='ProductID', 
+        how='inner'
     )
-    
-    print("✅ ProductName 정제 완료 (IngredientName 컬럼 생성).")
+    merged_df_with_category['TotalRevenue'] = merged_df_with_category['RevenueCents'] / 100
+    print(f"✅ (1/3) 'Sales'와 'Products' 병합 완료. (상품 수: {len(merged_df_with_category)})")
 
     # --- Cell 3: 상품별 총 판매량 집계 (IngredientName 기준으로 그룹화) ---
     # IngredientName으로 그룹화하여 동일한 재료명을 가진 제품들을 합침
     product_summary = merged_df_with_category.groupby(['IngredientName']).agg(
-        TotalQuantity=('Quantity', 'sum'),  # 총 판매량
-        TotalRevenue=('TotalPrice', 'sum'),   # 총 매출액
-        SalesCount=('SalesID', 'count'),     # 총 판매 횟수
+        TotalQuantity=('TotalQuantity', 'sum'),  # 총 판매량
+        TotalRevenue=('TotalRevenue', 'sum'),   # 총 매출액
+        SalesCount=('SalesCount', 'sum'),     # 총 판매 횟수
         ProductName=('ProductName', 'first')  # 첫 번째 ProductName 유지 (참고용)
     )
     
@@ -136,9 +638,9 @@ def analyze_sales(data):
     print(product_summary_sorted.head(10))
 
     # --- Cell 4: 카테고리별 판매 현황 ---
-    category_summary = merged_df_with_category.groupby('CategoryName').agg(
-        TotalQuantity=('Quantity', 'sum'),
-        TotalRevenue=('TotalPrice', 'sum')
+    category_summary = merged_df_with_category.groupby('CategoryName', observed=True).agg(
+        TotalQuantity=('TotalQuantity', 'sum'),
+        TotalRevenue=('TotalRevenue', 'sum')
     )
     
     category_summary_sorted = category_summary.sort_values(
@@ -153,19 +655,47 @@ def analyze_sales(data):
     # DB에 저장할 최종 데이터 반환
     return product_summary_sorted
 
-def save_to_db(dataframe, db_path, table_name):
-    """분석 결과를 SQLite DB에 저장"""
+def drop_legacy_state_tables(cursor):
+    """이전 버전이 서빙 DB에 남긴 증분 상태 테이블 삭제 (상태는 이제 별도 파일에 저장)"""
+    for table in LEGACY_STATE_TABLES:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+def save_to_db(dataframe, db_path, table_name, rankings=None):
+    """
+    분석 결과를 SQLite DB에 저장하고 성공 여부를 반환
+    rankings: 지역/기간별 순위 (같은 버전으로 grocery_rankings 테이블과 함께 교체)
+    """
     
     print(f"\n--- DB 저장 시작 ('{db_path}')... ---")
     try:
-        conn = sqlite3.connect(db_path)
+        # WAL 모드 연결: 저장 중에도 API는 이전 버전의 테이블을 계속 조회
+        conn = connect_for_ingest(db_path)
+        drop_stale_staging_tables(conn, table_name)
+        drop_stale_staging_tables(conn, RANKINGS_TABLE)
         
         # 'ProductID'와 'ProductName'이 groupby 인덱스로 되어있으므로,
         # .reset_index()를 사용해 컬럼으로 풀어줌
         df_to_save = dataframe.reset_index()
         
-        # 'GROCERY_SALES' 테이블에 저장. 이미 존재하면 덮어쓰기 (if_exists='replace')
-        df_to_save.to_sql(table_name, conn, if_exists='replace', index=False)
+        # 버전이 붙은 staging 테이블에 먼저 저장한 뒤 live 테이블과 원자적으로 교체
+        staging_token = new_staging_token()
+        staging_table = staging_table_name(table_name, staging_token)
+        df_to_save.to_sql(staging_table, conn, if_exists='replace', index=False)
+        swaps = {table_name: staging_table}
+        if rankings is not None:
+            rankings_staging = staging_table_name(RANKINGS_TABLE, staging_token)
+            conn.execute(RANKINGS_DDL.format(table=rankings_staging))
+            rankings.to_sql(rankings_staging, conn, if_exists='append', index=False)
+            swaps[RANKINGS_TABLE] = rankings_staging
+        publish_tables(
+            conn,
+            swaps,
+            indexes=[
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_rank ON {table_name} (IngredientRank)",
+                f"CREATE INDEX IF NOT EXISTS idx_{RANKINGS_TABLE}_name ON {RANKINGS_TABLE} (scope, region_name)",
+            ],
+            after_swap=drop_legacy_state_tables
+        )
         
         print(f"✅ DB 저장 완료! '{table_name}' 테이블이 생성/대체되었습니다.")
         
@@ -175,18 +705,56 @@ def save_to_db(dataframe, db_path, table_name):
         print(test_df)
         
         conn.close()
+        return True
 
     except Exception as e:
         print(f"❌ DB 저장 중 오류 발생: {e}")
+        return False
 
 # --- 스크립트 실행 ---
 if __name__ == "__main__":
-    # 1. 데이터 로드
-    all_data = load_dataframes()
+    parser = argparse.ArgumentParser(description="Grocery 판매 데이터 분석 -> grocery_sales 테이블 저장")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="grocery CSV 폴더")
+    parser.add_argument("--db", default=DB_FILE, help="결과를 저장할 SQLite DB 파일")
+    parser.add_argument("--chunksize", type=int, default=SALES_CHUNK_SIZE, help="sales.csv 청크 행 수")
+    parser.add_argument("--cache-dir", default=None, help="정제된 판매 팩트 Parquet 캐시 폴더 (기본: <data-dir>/.cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Parquet 캐시를 사용하지 않고 항상 CSV에서 읽기")
+    parser.add_argument("--workers", type=int, default=1, help="병렬 집계 프로세스 수 (1: 단일 프로세스, 0: CPU 코어 수)")
+    parser.add_argument("--engine", choices=["pandas", "duckdb"], default="pandas", help="전체 재집계 엔진 (duckdb: CSV/Parquet을 SQL로 직접 집계)")
+    parser.add_argument("--full-rebuild", action="store_true", help="워터마크를 무시하고 전체 판매 이력으로 다시 집계 (데이터 정정 시)")
+    parser.add_argument("--state-db", default=None, help="증분 집계 상태 SQLite 파일 (기본: <data-dir>/.state/grocery_state.db)")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    # 1. 데이터 로드 (products, categories)
+    all_data = load_dataframes(args.data_dir)
     
     if all_data:
-        # 2. 데이터 분석
+        # 2. 상품 테이블에서 음식 상품만 정제 (상품별 1회) + 고객 -> 도시/국가 매핑 준비
+        all_data['food_products'] = prepare_products(all_data['products'], all_data['categories'])
+        customer_cities, geo = prepare_geo(all_data['customers'], all_data['cities'], all_data['countries'])
+
+        # 3. 음식 판매 행만 (상품, 도시, 판매일)별로 청크 스트리밍 집계
+        #    (워터마크 이후 새 행만 반영, 전체 재집계 시 Parquet 캐시 사용)
+        cache_dir = None if args.no_cache else (args.cache_dir or os.path.join(args.data_dir, ".cache"))
+        state_path = args.state_db or default_state_path(args.data_dir)
+        try:
+            all_data['sales_totals'], recent_sales, save_incremental_state = compute_sales_cube(
+                all_data['food_products'], customer_cities, args.data_dir, state_path, args.chunksize, cache_dir, args.full_rebuild, workers, args.engine
+            )
+        except FileNotFoundError as e:
+            print(f"❌ 오류: {e.filename} 파일을 찾을 수 없습니다.")
+            sys.exit(1)
+
+        # 4. 데이터 분석 (전체 순위 + 지역/기간별 순위)
         final_product_sales = analyze_sales(all_data)
+        regional_rankings = build_regional_rankings(all_data['sales_totals'], recent_sales, all_data['food_products'], geo)
         
-        # 3. 분석 결과를 DB에 저장
-        save_to_db(final_product_sales, DB_FILE, TABLE_NAME)
\ No newline at end of file
+        # 5. 분석 결과를 DB에 게시한 뒤에만 증분 상태(누적값 + 워터마크)를 저장
+        #    (게시가 실패하면 워터마크가 그대로라 다음 실행에서 같은 구간을 다시 반영)
+        if not save_to_db(final_product_sales, args.db, TABLE_NAME, rankings=regional_rankings):
+            sys.exit(1)
+        save_incremental_state()
+        print(f"✅ 증분 집계 상태 저장 완료 ('{state_path}')")
+    else:
+        sys.exit(1)
@@ -0,0 +1,72 @@
+# scripts/bench_grocery_engines.py
+# analyze_grocery_data 집계 엔진 비교 (pandas 청크 / pandas 병렬 / DuckDB)
+# - 엔진마다 새 프로세스에서 실행해 최대 RSS와 wall time을 따로 측정
+#   (병렬 pandas의 RSS는 파티션 워커를 제외한 메인 프로세스 기준)
+# - 결과 부분 집계가 pandas 단일 프로세스 결과와 완전히 같은지 확인 (다르면 종료 코드 1)
+#
+# 실행: python -m scripts.bench_grocery_engines [--data-dir ...] [--workers 4]
+
+import argparse
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from scripts import analyze_grocery_data as grocery
+    from scripts.grocery_duckdb import DUCKDB_AVAILABLE
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.bench_grocery_engines\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
+
+
+def run_engine(engine, data_dir, chunksize, workers):
+    """(새 프로세스) 차원 테이블 로드부터 부분 집계까지 실행하고 (부분 집계, wall time, 최대 RSS) 반환"""
+    started = time.perf_counter()
+    data = grocery.load_dataframes(data_dir)
+    food_products = grocery.prepare_products(data['products'], data['categories'])
+    customer_cities, _ = grocery.prepare_geo(data['customers'], data['cities'], data['countries'])
+    sales_cube, _ = grocery.aggregate_full_history(
+        food_products, customer_cities, data_dir, chunksize, cache_dir=None, workers=workers, engine=engine
+    )
+    return sales_cube.sort_index(), time.perf_counter() - started, grocery.peak_rss_mb()
+
+
+def run_isolated(engine, data_dir, chunksize, workers):
+    """엔진 하나를 깨끗한 프로세스(spawn)에서 실행 (이전 엔진의 메모리 사용량이 섞이지 않도록)"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(run_engine, engine, data_dir, chunksize, workers).result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="grocery 집계 엔진 벤치마크 + 결과 일치 확인")
+    parser.add_argument("--data-dir", default=grocery.DATA_DIR, help="grocery CSV 폴더")
+    parser.add_argument("--chunksize", type=int, default=grocery.SALES_CHUNK_SIZE, help="pandas 엔진 청크 행 수")
+    parser.add_argument("--workers", type=int, default=4, help="병렬 pandas / DuckDB 스레드 수")
+    args = parser.parse_args()
+
+    engines = [("pandas", "pandas", 1), (f"pandas x{args.workers}", "pandas", args.workers)]
+    if DUCKDB_AVAILABLE:
+        engines.append(("duckdb", "duckdb", args.workers))
+    else:
+        print("⚠️ duckdb가 설치되어 있지 않아 DuckDB 엔진은 건너뜁니다.")
+
+    results = {}
+    for label, engine, workers in engines:
+        print(f"\n=== {label} ===")
+        results[label] = run_isolated(engine, args.data_dir, args.chunksize, workers)
+
+    baseline = results["pandas"][0]
+    print("\n--- 결과 (차원 테이블 로드 포함) ---")
+    print(f"{'엔진':<14}{'wall(s)':>10}{'최대 RSS(MB)':>16}  결과 일치")
+    mismatched = False
+    for label, (sales_cube, wall, peak_rss) in results.items():
+        same = sales_cube.equals(baseline)
+        mismatched |= not same
+        print(f"{label:<14}{wall:>10.1f}{peak_rss:>16,.1f}  {'✅' if same else '❌'}")
+
+    sys.exit(1 if mismatched else 0)
@@ -0,0 +1,202 @@
+# scripts/bench_pipelines.py
+# 오프라인 파이프라인 스크립트 벤치마크 (합성 데이터 배율별 wall time + 최대 RSS)
+#
+# - scripts/generate_synthetic_data.py가 만든 <배율>x 폴더를 입력으로
+#   analyze_grocery_data, n_grams, extract_reddit_menus를 각각 새 프로세스로 실행
+# - 최대 RSS는 os.wait4의 자식 프로세스 rusage(ru_maxrss)로 측정 (스크립트 코드 수정 없이 프로세스 전체 기준)
+#   (grocery --workers > 1의 파티션 워커는 손자 프로세스라 포함되지 않음)
+# - 매 실행마다 결과 DB를 지우고 --full-rebuild / --no-cache로 실행 -> 항상 같은 조건(콜드 실행)
+# - 실행 후 결과(DB 테이블 행 / 출력)가 있는지 확인 -> 종료 코드가 0이어도 결과가 없으면 실패
+# - --save로 결과를 JSON에 저장하고, --baseline과 비교해 허용 비율보다 느려지거나 메모리가 늘면 종료 코드 1
+#
+# 실행: python -m scripts.bench_pipelines [--scales 1 10] [--repeat 3] [--baseline bench.json]
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    from scripts.generate_synthetic_data import SYNTHETIC_DIR, REDDIT_CSV_NAME, generate, scale_dir
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.bench_pipelines\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DB_NAME = 'bench_{name}.db'
+LOG_DIR_NAME = 'bench_logs'
+
+
+def expect_tables(db_path, *tables):
+    """결과 DB의 tables가 모두 있고 비어 있지 않은지 확인하는 함수 (문제 목록 반환)"""
+    def check(log_path):
+        if not os.path.exists(db_path):
+            return [f"결과 DB '{db_path}' 없음"]
+        problems = []
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            for table in tables:
+                try:
+                    if conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None:
+                        problems.append(f"'{table}' 테이블이 비어 있음")
+                except sqlite3.OperationalError:
+                    problems.append(f"'{table}' 테이블 없음")
+        finally:
+            conn.close()
+        return problems
+    return check
+
+
+def expect_log(marker):
+    """실행 로그에 marker(결과 출력)가 있는지 확인하는 함수 (문제 목록 반환)"""
+    def check(log_path):
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            return [] if marker in f.read() else [f"로그에 결과 출력('{marker}') 없음"]
+    return check
+
+
+def bench_commands(data_dir):
+    """스크립트 이름 -> (모듈, 인자, 실행 전에 지울 결과 DB, 결과 확인 함수)"""
+    grocery_db = os.path.join(data_dir, BENCH_DB_NAME.format(name='grocery'))
+    reddit_db = os.path.join(data_dir, BENCH_DB_NAME.format(name='reddit'))
+    corpus = os.path.join(data_dir, REDDIT_CSV_NAME)
+    return {
+        'analyze_grocery_data': (
+            'scripts.analyze_grocery_data',
+            ['--data-dir', os.path.join(data_dir, 'grocery_data'), '--db', grocery_db, '--no-cache', '--full-rebuild'],
+            grocery_db,
+            expect_tables(grocery_db, 'grocery_sales', 'grocery_rankings'),
+        ),
+        'n_grams': ('scripts.n_grams', ['--corpus', corpus], None, expect_log('[인사이트] 4-gram')),
+        'extract_reddit_menus': (
+            'scripts.extract_reddit_menus', ['--corpus', corpus, '--db', reddit_db, '--full-rebuild'], reddit_db,
+            expect_tables(reddit_db, 'hot_recipes'),
+        ),
+    }
+
+
+def _remove_db(db_path):
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+def maxrss_mb(rusage):
+    """ru_maxrss를 MB로 (Linux는 KB 단위 / macOS는 byte 단위)"""
+    return rusage.ru_maxrss / (1024 * 1024) if sys.platform == "darwin" else rusage.ru_maxrss / 1024
+
+
+def run_measured(module, args, log_path):
+    """모듈을 새 프로세스로 실행하고 (종료 코드, wall time, 최대 RSS MB) 반환 (출력은 로그 파일에)"""
+    with open(log_path, 'w', encoding='utf-8') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', module, *args], cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT
+        )
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)  # Popen이 다시 wait하지 않도록
+    return process.returncode, wall, maxrss_mb(rusage)
+
+
+def bench_scale(out_dir, scale, scripts, repeat):
+    """배율 하나에서 스크립트별로 repeat번 실행, 이름 -> {'wall_s', 'maxrss_mb'} (중앙값, 실패 시 None)"""
+    data_dir = scale_dir(out_dir, scale)
+    log_dir = os.path.join(data_dir, LOG_DIR_NAME)
+    os.makedirs(log_dir, exist_ok=True)
+    results = {}
+    for name, (module, args, result_db, check) in bench_commands(data_dir).items():
+        if name not in scripts:
+            continue
+        walls, rss = [], []
+        for attempt in range(1, repeat + 1):
+            if result_db:
+                _remove_db(result_db)
+            log_path = os.path.join(log_dir, f"{name}.{attempt}.log")
+            returncode, wall, peak = run_measured(module, args, log_path)
+            if returncode != 0:
+                print(f"❌ [{scale}x] {name} 실패 (종료 코드 {returncode}, 로그: {log_path})")
+                results[name] = None
+                break
+            problems = check(log_path)
+            if problems:
+                print(f"❌ [{scale}x] {name} 결과 없음: {', '.join(problems)} (로그: {log_path})")
+                results[name] = None
+                break
+            walls.append(wall)
+            rss.append(peak)
+            print(f"⏱️  [{scale}x] {name} #{attempt}: {wall:.1f}s, 최대 RSS {peak:,.1f}MB")
+        else:
+            results[name] = {'wall_s': round(statistics.median(walls), 3), 'maxrss_mb': round(statistics.median(rss), 1)}
+    return results
+
+
+def find_regressions(results, baseline, max_regression):
+    """baseline보다 (1 + max_regression)배 넘게 느려지거나 메모리가 는 항목 목록"""
+    regressions = []
+    for scale, scripts in results.items():
+        for name, measured in scripts.items():
+            base = baseline.get(scale, {}).get(name)
+            if not base or not measured:
+                continue
+            for metric in ('wall_s', 'maxrss_mb'):
+                if measured[metric] > base[metric] * (1 + max_regression):
+                    regressions.append(f"{scale} {name} {metric}: {base[metric]} -> {measured[metric]}")
+    return regressions
+
+
+if __name__ == "__main__":
+    script_names = list(bench_commands('').keys())
+    parser = argparse.ArgumentParser(description="합성 데이터 배율별 오프라인 파이프라인 벤치마크")
+    parser.add_argument("--data-dir", default=SYNTHETIC_DIR, help="합성 데이터 폴더 (배율마다 <배율>x 하위 폴더)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="측정할 배율")
+    parser.add_argument("--scripts", nargs="+", choices=script_names, default=script_names, help="측정할 스크립트")
+    parser.add_argument("--repeat", type=int, default=1, help="스크립트별 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--seed", type=int, default=42, help="데이터가 없을 때 생성에 쓸 시드")
+    parser.add_argument("--save", default=None, help="결과를 저장할 JSON 파일")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="허용할 증가 비율 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scales:
+        if not os.path.exists(os.path.join(scale_dir(args.data_dir, scale), REDDIT_CSV_NAME)):
+            generate(args.data_dir, scale, args.seed)
+        print(f"\n=== {scale}x ===")
+        results[f"{scale}x"] = bench_scale(args.data_dir, scale, set(args.scripts), args.repeat)
+
+    print("\n--- 결과 (중앙값) ---")
+    print("(최대 RSS는 각 스크립트 프로세스 기준: --workers 파티션 워커 같은 손자 프로세스의 메모리는 포함되지 않음)")
+    print(f"{'배율':<6}{'스크립트':<24}{'wall(s)':>10}{'최대 RSS(MB)':>16}")
+    for scale, scripts in results.items():
+        for name, measured in scripts.items():
+            if measured is None:
+                print(f"{scale:<6}{name:<24}{'실패':>10}")
+            else:
+                print(f"{scale:<6}{name:<24}{measured['wall_s']:>10.1f}{measured['maxrss_mb']:>16,.1f}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n결과를 '{args.save}'에 저장했습니다.")
+
+    failed = any(measured is None for scripts in results.values() for measured in scripts.values())
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n⚠️ 기준 대비 {args.max_regression:.0%} 넘게 나빠진 항목:")
+            for line in regressions:
+                print(f"  - {line}")
+            failed = True
+        else:
+            print(f"\n✅ 기준 대비 {args.max_regression:.0%} 이내입니다.")
+    sys.exit(1 if failed else 0)
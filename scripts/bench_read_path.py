@@ -0,0 +1,68 @@
+# scripts/bench_read_path.py
+# /hot-recipes/all 읽기 경로 마이크로 벤치마크
+# (기존: 요청마다 sqlite3.Row -> dict -> List[Dict[str, Any]] 검증 -> json 직렬화
+#  vs 현재: 데이터 버전 확인 후 캐시된 JSON bytes 반환)
+#
+# 실행: python -m scripts.bench_read_path [--requests 2000]
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List, Dict, Any
+
+try:
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from app.services import db_service
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.bench_read_path\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
+
+LEGACY_RESPONSE_MODEL = TypeAdapter(List[Dict[str, Any]])
+
+
+def legacy_get_all_recipes() -> bytes:
+    """변경 전 /hot-recipes/all 경로 재현 (DB 조회 + 행별 dict 생성 + 일반 dict 검증 + json 직렬화)"""
+    conn = db_service.get_db_connection()
+    rows = conn.execute(
+        """
+        SELECT ranking, recipe_name, image_url, cook_time, description, recipe_detail_ko, recipe_detail_en
+        FROM hot_recipes
+        """
+    ).fetchall()
+    conn.close()
+    recipes = LEGACY_RESPONSE_MODEL.validate_python([dict(row) for row in rows])
+    return json.dumps(jsonable_encoder(recipes), ensure_ascii=False).encode("utf-8")
+
+
+def measure(label, func, requests):
+    """requests번 호출한 CPU 시간(process_time)과 요청당 평균을 출력"""
+    func()  # 워밍업 (캐시 채우기)
+    start_cpu, start_wall = time.process_time(), time.perf_counter()
+    for _ in range(requests):
+        func()
+    cpu, wall = time.process_time() - start_cpu, time.perf_counter() - start_wall
+    per_request_us = cpu / requests * 1_000_000
+    print(f"{label:<10} CPU {cpu:.3f}s / wall {wall:.3f}s  ->  요청당 CPU {per_request_us:,.1f}µs")
+    return per_request_us
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/hot-recipes/all 읽기 경로 벤치마크")
+    parser.add_argument("--requests", type=int, default=2000, help="측정할 요청 수")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    current = lambda: loop.run_until_complete(db_service.get_all_recipes_json())
+
+    print(f"--- '/hot-recipes/all' 읽기 경로 벤치마크 ({args.requests}회, DB: {db_service.DB_PATH}) ---")
+    legacy_us = measure("legacy", legacy_get_all_recipes, args.requests)
+    cached_us = measure("cached", current, args.requests)
+    print(f"\n요청당 CPU 절감: {legacy_us - cached_us:,.1f}µs ({legacy_us / max(cached_us, 1e-9):.1f}x)")
+    loop.close()
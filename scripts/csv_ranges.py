@@ -0,0 +1,80 @@
+# scripts/csv_ranges.py
+# 큰 CSV를 줄 경계에 맞춘 바이트 구간 단위로 읽는 헬퍼
+# (증분 집계의 "워터마크 이후 구간", 병렬 집계의 파티션에서 공통으로 사용)
+
+import csv
+import io
+
+import pandas as pd
+
+
+def read_header(path):
+    """헤더(첫 줄)의 컬럼명 리스트와 데이터가 시작하는 바이트 위치를 반환"""
+    with open(path, "rb") as f:
+        line = f.readline()
+    return next(csv.reader([line.decode("utf-8-sig")])), len(line)
+
+
+def line_aligned_ranges(path, start, end, parts):
+    """
+    [start, end) 구간을 parts개의 바이트 구간으로 나누되, 각 경계를 다음 줄의 시작으로 맞춤
+    (start는 줄의 시작이어야 하며, 행이 두 구간에 걸치지 않음 / 빈 구간은 제외)
+    """
+    bounds = [start]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            target = start + (end - start) * i // parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # target-1 위치가 줄바꿈이면 target 그대로, 아니면 다음 줄 시작으로 이동
+            bounds.append(min(f.tell(), end))
+    bounds.append(end)
+    return [(range_start, range_end) for range_start, range_end in zip(bounds, bounds[1:]) if range_start < range_end]
+
+
+def count_lines(path, start, end, block_size=1024 * 1024):
+    """[start, end) 구간의 줄 수 (end가 줄 끝이면 = 구간에 있는 행 수)"""
+    lines = 0
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(block_size, remaining))
+            if not block:
+                break
+            lines += block.count(b"\n")
+            remaining -= len(block)
+    return lines
+
+
+class _RangeReader(io.RawIOBase):
+    """열린 파일의 [start, end) 구간만 읽히는 파일 객체 (구간 전체를 메모리에 올리지 않음)"""
+
+    def __init__(self, f, start, end):
+        self.f = f
+        self.f.seek(start)
+        self.remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self.remaining)
+        if size <= 0:
+            return 0
+        data = self.f.read(size)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
+
+
+def iter_csv_range(path, start, end, usecols, dtype, chunksize, names=None):
+    """CSV의 [start, end) 구간에 있는 행만 청크(DataFrame) 단위로 반환 (컬럼명은 헤더에서 읽음)"""
+    if start >= end:
+        return
+    if names is None:
+        names = read_header(path)[0]
+    with open(path, "rb") as f:
+        reader = io.BufferedReader(_RangeReader(f, start, end))
+        yield from pd.read_csv(reader, header=None, names=names, usecols=usecols, dtype=dtype, chunksize=chunksize)
@@ -0,0 +1,100 @@
+# scripts/db_publish.py
+# 수집 스크립트가 API가 읽고 있는 DB를 안전하게 갱신하기 위한 헬퍼
+#
+# 1. WAL 모드로 연결 -> 쓰기 중에도 API(reader)는 이전 스냅샷을 계속 읽음
+# 2. 새 데이터는 버전이 붙은 staging 테이블에 먼저 채움 (live 테이블은 그대로)
+# 3. 짧은 트랜잭션 한 번으로 staging -> live 교체 (DROP + RENAME은 트랜잭션으로 원자적)
+#    reader는 "이전 버전 전체" 또는 "새 버전 전체"만 보게 됨
+# 4. 데이터 버전은 쓰기 트랜잭션 안에서 MAX(version) + 1 (시계가 뒤로 가도 항상 증가)
+
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+VERSION_TABLE = 'data_versions'
+STAGING_SUFFIX = '__staging_'
+
+
+def connect_for_ingest(db_path):
+    """WAL 모드로 DB에 연결하고 data_versions 테이블을 준비"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")  # DB 파일에 영구 저장되는 설정
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"""
+    CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+        table_name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        published_at TEXT NOT NULL
+    )
+    """)
+    conn.commit()
+    return conn
+
+
+def next_version(cursor):
+    """다음 데이터 버전 (쓰기 트랜잭션 안에서 호출해야 동시 게시와 겹치지 않음)"""
+    cursor.execute(f"SELECT COALESCE(MAX(version), 0) + 1 FROM {VERSION_TABLE}")
+    return cursor.fetchone()[0]
+
+
+def new_staging_token():
+    """staging 테이블 이름에 붙일 고유 값 (게시 버전과는 무관)"""
+    return f"{os.getpid()}_{time.time_ns()}"
+
+
+def staging_table_name(table_name, token):
+    return f"{table_name}{STAGING_SUFFIX}{token}"
+
+
+def drop_stale_staging_tables(conn, table_name):
+    """이전 실행이 실패해서 남은 staging 테이블 정리"""
+    cursor = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ?",
+        (f"{table_name}{STAGING_SUFFIX}%",)
+    )
+    for (name,) in cursor.fetchall():
+        print(f"이전 staging 테이블 '{name}'을 삭제합니다.")
+        conn.execute(f"DROP TABLE IF EXISTS {name}")
+    conn.commit()
+
+
+def record_version(cursor, table_name, version=None):
+    """
+    테이블의 데이터 버전을 기록 (in-place 갱신 시에도 호출해 캐시 무효화에 사용)
+    version이 없으면 다음 버전을 사용하므로, 같은 트랜잭션에서 데이터를 쓴 뒤에 호출
+    """
+    version = version or next_version(cursor)
+    cursor.execute(
+        f"INSERT OR REPLACE INTO {VERSION_TABLE} (table_name, version, published_at) VALUES (?, ?, ?)",
+        (table_name, version, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    )
+    return version
+
+
+def publish_tables(conn, swaps, indexes=None, after_swap=None):
+    """
+    staging 테이블들을 live 테이블로 원자적으로 교체하고 게시한 버전을 반환
+    swaps: {live 테이블명: staging 테이블명}
+    indexes: 교체 후 live 테이블에 생성할 CREATE INDEX 문 리스트
+    after_swap: 같은 트랜잭션 안에서 실행할 함수 (cursor를 인자로 받음, 파생 테이블 갱신용)
+    """
+    conn.commit()  # staging 쓰기 마무리
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        version = next_version(cursor)
+        for live_table, staging_table in swaps.items():
+            cursor.execute(f"DROP TABLE IF EXISTS {live_table}")
+            cursor.execute(f"ALTER TABLE {staging_table} RENAME TO {live_table}")
+            record_version(cursor, live_table, version)
+        for ddl in indexes or []:
+            cursor.execute(ddl)
+        if after_swap:
+            after_swap(cursor)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    print(f"✅ 버전 {version} 게시 완료: {', '.join(swaps)}")
+    return version
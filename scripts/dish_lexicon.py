@@ -0,0 +1,194 @@
+# scripts/dish_lexicon.py
+# 한국 요리 이름 사전 + Aho-Corasick 매처 (extract_reddit_menus의 '메뉴' 추출용)
+#
+# - 큐레이션한 요리명(대표 이름 -> 로마자 표기/영어 이름/한글 변형) + 학습된 요리명(JSON)을 합쳐
+#   Aho-Corasick 오토마톤 하나로 컴파일
+# - 글마다 문자 단위로 한 번만 훑어서, 길이와 상관없이 사전에 있는 요리 언급을 대표 이름으로 셈
+#   (겹치면 가장 앞 + 가장 긴 이름 하나만: "kimchi fried rice"는 "kimchi"로 세지 않음)
+# - 학습: n-gram 빈도 중 요리 접미어(jjigae, bokkeum, tang, ...)로 끝나는 구문을 새 요리명으로 추가
+
+import json
+import os
+import re
+from collections import Counter, deque
+
+# 대표 이름 -> 변형 표기 (소문자/한 칸 공백 기준으로 정규화해서 매칭)
+CURATED_DISHES = {
+    "Kimchi Jjigae": ["kimchi jjigae", "kimchi chigae", "kimchi jigae", "kimchi stew", "김치찌개"],
+    "Doenjang Jjigae": ["doenjang jjigae", "doenjang chigae", "dwenjang jjigae", "soybean paste stew", "된장찌개"],
+    "Sundubu Jjigae": ["sundubu jjigae", "soondubu jjigae", "sundubu", "soondubu", "soft tofu stew", "순두부찌개"],
+    "Budae Jjigae": ["budae jjigae", "budae chigae", "army stew", "army base stew", "부대찌개"],
+    "Kimchi Fried Rice": ["kimchi fried rice", "kimchi bokkeumbap", "kimchi bokkeum bap", "김치볶음밥"],
+    "Bibimbap": ["bibimbap", "bibim bap", "bibimbop", "dolsot bibimbap", "비빔밥"],
+    "Bulgogi": ["bulgogi", "bul go gi", "beef bulgogi", "불고기"],
+    "Galbi": ["galbi", "kalbi", "la galbi", "la kalbi", "갈비"],
+    "Galbi Jjim": ["galbi jjim", "galbijjim", "kalbi jjim", "braised short ribs", "갈비찜"],
+    "Samgyeopsal": ["samgyeopsal", "samgyupsal", "samgyeopsal gui", "pork belly bbq", "삼겹살"],
+    "Dakgalbi": ["dakgalbi", "dak galbi", "닭갈비"],
+    "Korean Fried Chicken": ["korean fried chicken", "yangnyeom chicken", "yangnyeom tongdak", "양념치킨"],
+    "Jjimdak": ["jjimdak", "andong jjimdak", "찜닭"],
+    "Samgyetang": ["samgyetang", "samgyetaang", "ginseng chicken soup", "삼계탕"],
+    "Tteokbokki": ["tteokbokki", "ddeokbokki", "topokki", "tteok bokki", "dukbokki", "rabokki", "떡볶이"],
+    "Gimbap": ["gimbap", "kimbap", "kimbob", "김밥"],
+    "Japchae": ["japchae", "chapchae", "jap chae", "잡채"],
+    "Jjajangmyeon": ["jjajangmyeon", "jajangmyeon", "jjajangmyun", "black bean noodles", "짜장면", "자장면"],
+    "Jjamppong": ["jjamppong", "jjambbong", "champon", "짬뽕"],
+    "Naengmyeon": ["naengmyeon", "naengmyun", "mul naengmyeon", "bibim naengmyeon", "cold noodles", "냉면"],
+    "Bibim Guksu": ["bibim guksu", "bibimguksu", "비빔국수"],
+    "Kalguksu": ["kalguksu", "kal guksu", "knife cut noodles", "칼국수"],
+    "Ramyeon": ["ramyeon", "ramyun", "shin ramyun", "라면"],
+    "Kimchi": ["kimchi", "baechu kimchi", "napa cabbage kimchi", "김치"],
+    "Kkakdugi": ["kkakdugi", "radish kimchi", "cubed radish kimchi", "깍두기"],
+    "Pajeon": ["pajeon", "haemul pajeon", "scallion pancake", "green onion pancake", "파전"],
+    "Kimchijeon": ["kimchijeon", "kimchi jeon", "kimchi pancake", "김치전"],
+    "Hotteok": ["hotteok", "hoddeok", "hotteock", "호떡"],
+    "Bingsu": ["bingsu", "patbingsu", "bingsoo", "빙수", "팥빙수"],
+    "Sundae": ["sundae", "soondae", "blood sausage", "순대"],
+    "Gyeran Jjim": ["gyeran jjim", "gyeranjjim", "steamed egg", "계란찜"],
+    "Dakbokkeumtang": ["dakbokkeumtang", "dak bokkeum tang", "dakdoritang", "닭볶음탕", "닭도리탕"],
+    "Jeyuk Bokkeum": ["jeyuk bokkeum", "jeyuk", "spicy pork stir fry", "제육볶음"],
+    "Miyeok Guk": ["miyeok guk", "miyeokguk", "seaweed soup", "birthday soup", "미역국"],
+    "Seolleongtang": ["seolleongtang", "sullungtang", "ox bone soup", "설렁탕"],
+    "Gamjatang": ["gamjatang", "gamja tang", "pork bone soup", "감자탕"],
+    "Haejangguk": ["haejangguk", "haejang guk", "hangover soup", "해장국"],
+    "Yukgaejang": ["yukgaejang", "yukgyejang", "spicy beef soup", "육개장"],
+    "Mandu": ["mandu", "mandoo", "korean dumplings", "군만두", "만두"],
+    "Bossam": ["bossam", "bo ssam", "보쌈"],
+    "Jokbal": ["jokbal", "족발"],
+    "Dak Kkochi": ["dak kkochi", "dakkochi", "닭꼬치"],
+    "Eomuk": ["eomuk", "odeng", "fish cake skewers", "어묵", "오뎅"],
+    "Kongguksu": ["kongguksu", "kong guksu", "soy milk noodles", "콩국수"],
+    "Dalgona": ["dalgona", "ppopgi", "달고나"],
+}
+
+# 학습된 요리명 파일 (learn_dishes 결과, 대표 이름 -> 변형 표기)
+LEARNED_LEXICON_FILE = 'data/dish_lexicon_learned.json'
+
+# 이 단어로 끝나는 n-gram은 요리 이름일 가능성이 높음 (학습 후보)
+DISH_SUFFIXES = {
+    'jjigae', 'chigae', 'jigae', 'guk', 'tang', 'jjim', 'bokkeum', 'bokkeumbap', 'bap', 'bab',
+    'jeon', 'myeon', 'myun', 'guksu', 'gui', 'muchim', 'namul', 'jorim', 'kimchi', 'tteok',
+}
+
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+NON_WORD_PATTERN = re.compile(r'[^\w]+')
+
+
+def normalize_text(text):
+    """소문자 + 구두점/공백 연속을 한 칸 공백으로 (예: "Kimchi-Jjigae!!" -> "kimchi jjigae ")"""
+    return NON_WORD_PATTERN.sub(' ', text.lower())
+
+
+def load_lexicon(learned_path=None):
+    """큐레이션 사전 + (있으면) 학습된 사전을 합친 대표 이름 -> 변형 표기 dict"""
+    lexicon = {name: list(variants) for name, variants in CURATED_DISHES.items()}
+    if learned_path and os.path.exists(learned_path):
+        with open(learned_path, encoding='utf-8') as f:
+            learned = json.load(f)
+        for name, variants in learned.items():
+            lexicon.setdefault(name, []).extend(variants)
+        print(f"학습된 요리명 {len(learned)}개를 사전에 추가했습니다. ('{learned_path}')")
+    return lexicon
+
+
+class DishMatcher:
+    """
+    요리명 변형 표기들을 Aho-Corasick 오토마톤으로 컴파일한 매처
+    - 영어/로마자 표기는 단어 경계에서만 매칭 ("bulgogi"는 "bulgogis"의 일부로 세지 않음)
+    - 한글 표기는 뒤에 조사가 붙어도 매칭 ("김치찌개를")
+    """
+
+    def __init__(self, lexicon):
+        # 노드 i의 전이(dict), 실패 링크, 출력 (변형 길이, 대표 이름, 한글 여부) 리스트
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for name, variants in lexicon.items():
+            for variant in variants:
+                pattern = normalize_text(variant).strip()
+                if pattern:
+                    self._add(pattern, name)
+        self._build_failure_links()
+
+    def _add(self, pattern, name):
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = next_node
+        self.output[node].append((len(pattern), name, bool(HANGUL_PATTERN.search(pattern))))
+
+    def _build_failure_links(self):
+        # 루트의 자식은 실패 링크가 루트(0), 그 아래는 BFS 순서로 부모의 실패 링크를 따라가며 계산
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                # 실패 링크의 출력도 이 노드에서 끝나는 매칭 (접미사 관계인 변형들)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """정규화된 text에서 겹치지 않는 (시작, 끝, 대표 이름) 매칭 리스트 (앞 + 긴 매칭 우선)"""
+        matches = []
+        node = 0
+        goto, fail, output = self.goto, self.fail, self.output
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, name, hangul in output[node]:
+                start = end - length
+                if start > 0 and text[start - 1] != ' ':
+                    continue
+                if not hangul and end < len(text) and text[end] != ' ':
+                    continue
+                matches.append((start, end, name))
+
+        selected, last_end = [], 0
+        for start, end, name in sorted(matches, key=lambda match: (match[0], match[0] - match[1])):
+            if start >= last_end:
+                selected.append((start, end, name))
+                last_end = end
+        return selected
+
+    def count(self, texts):
+        """글마다 한 번 훑어서 대표 이름별 언급 수를 셈"""
+        counts = Counter()
+        for text in texts:
+            counts.update(name for _, _, name in self.find(normalize_text(text)))
+        return counts
+
+
+def learn_dishes(ngram_counts, lexicon, min_count=5):
+    """
+    n-gram 빈도({n: Counter}) 중 요리 접미어로 끝나고 min_count번 이상 나온 구문을
+    아직 사전에 없는 새 요리명 후보로 반환 (대표 이름 -> [구문])
+    """
+    known = {normalize_text(variant).strip() for variants in lexicon.values() for variant in variants}
+    learned = {}
+    for n, counter in ngram_counts.items():
+        if n < 2:
+            continue
+        for phrase, count in counter.items():
+            if count >= min_count and phrase.split()[-1] in DISH_SUFFIXES and phrase not in known:
+                learned[phrase.title()] = [phrase]
+    return learned
+
+
+def save_learned_lexicon(learned, path=LEARNED_LEXICON_FILE):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(learned, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    print(f"학습된 요리명 {len(learned)}개를 '{path}'에 저장했습니다.")
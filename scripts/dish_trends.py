@@ -0,0 +1,194 @@
+# scripts/dish_trends.py
+# extract_reddit_menus 트렌드 점수 (요리별 지수 감쇠 점수 + Reddit CSV 워터마크)
+#
+# - 글 하나의 가중치 = 1 + log1p(추천수) + 0.5 * log1p(댓글수), 글에 언급된 요리마다 한 번씩 더함
+# - 점수는 기준 시각(as_of)에서 본 값: 가중치 * 2^(-(as_of - 글 작성 시각) / 반감기)
+# - dish_trend_scores: 요리별 (감쇠 점수, 누적 언급 글 수, 마지막 언급 시각)
+#   dish_trend_watermark: 마지막으로 반영한 created_date(+ 같은 시각 글의 URL), 기준 시각, 사전 해시
+#   다음 실행은 저장된 점수에 감쇠(2^(-경과 / 반감기))를 한 번 곱하고, 워터마크 이후 글만 매칭해서 더함
+#   (요리명 사전이 바뀌면 lexicon_key가 달라져 전체 재계산)
+
+import hashlib
+import json
+import math
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+from scripts.dish_lexicon import normalize_text
+from scripts.reddit_store import iter_post_frames
+
+SCORES_TABLE = 'dish_trend_scores'
+WATERMARK_TABLE = 'dish_trend_watermark'
+WATERMARK_SOURCE = 'reddit_koreanfood.csv'
+
+# 7일 전 언급은 지금 언급의 절반
+HALF_LIFE_DAYS = 7.0
+COMMENT_WEIGHT = 0.5
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+TREND_COLUMNS = ['title', 'content', 'created_date', 'URL', 'score', 'num_comments']
+
+STATE_TABLES_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {SCORES_TABLE} (
+        dish TEXT PRIMARY KEY,
+        decayed_score REAL NOT NULL,
+        mentions INTEGER NOT NULL,
+        last_seen TEXT NOT NULL
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+        source TEXT PRIMARY KEY,
+        last_created_date TEXT NOT NULL,
+        boundary_urls TEXT NOT NULL,
+        as_of TEXT NOT NULL,
+        lexicon_key TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+]
+
+
+def create_state_tables(cursor):
+    for ddl in STATE_TABLES_DDL:
+        cursor.execute(ddl)
+
+
+def lexicon_fingerprint(lexicon):
+    """요리명 사전(대표 이름 -> 변형 표기) 내용의 해시"""
+    return hashlib.sha256(json.dumps(lexicon, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def decay_factor(elapsed_seconds, half_life_days=HALF_LIFE_DAYS):
+    """elapsed_seconds만큼 지난 점수에 곱할 값 (미래 시각의 글은 감쇠 없이 1)"""
+    return 2.0 ** (-max(elapsed_seconds, 0.0) / (half_life_days * 86400))
+
+
+def post_weight(score, num_comments):
+    """추천수/댓글수가 많은 글일수록 크게, 하지만 로그로 눌러서 글 하나가 랭킹을 독식하지 않도록"""
+    return 1.0 + math.log1p(max(score, 0)) + COMMENT_WEIGHT * math.log1p(max(num_comments, 0))
+
+
+class TrendState:
+    """저장된 (또는 빈) 트렌드 상태에 새 글을 반영하고 결과를 저장"""
+
+    def __init__(self, as_of, lexicon_key, scores=None, mentions=None, last_seen=None,
+                 last_created_date='', boundary_urls=()):
+        self.as_of = as_of
+        self.lexicon_key = lexicon_key
+        self.scores = scores if scores is not None else Counter()
+        self.mentions = mentions if mentions is not None else Counter()
+        self.last_seen = last_seen if last_seen is not None else {}
+        # 이번 실행에서 새 글을 가려내는 기준 (저장된 워터마크, 실행 중에는 고정)
+        # CSV는 최신 글부터 저장되므로 읽는 도중 올라간 워터마크로 판단하면 오래된 새 글을 놓침
+        self.watermark = (last_created_date, frozenset(boundary_urls))
+        self.last_created_date = last_created_date
+        self.boundary_urls = set(boundary_urls)
+        self.new_posts = 0
+
+    def advance(self, as_of):
+        """기준 시각을 as_of로 옮기며 모든 점수에 감쇠를 한 번 곱함"""
+        if as_of <= self.as_of:
+            return
+        factor = decay_factor((as_of - self.as_of).total_seconds())
+        self.scores = Counter({dish: score * factor for dish, score in self.scores.items()})
+        self.as_of = as_of
+
+    def is_new(self, created_date, url):
+        """워터마크 이후 글인지 (같은 시각의 글은 이미 반영한 URL인지로 구분)"""
+        last_created_date, boundary_urls = self.watermark
+        return created_date > last_created_date or (created_date == last_created_date and url not in boundary_urls)
+
+    def apply_chunk(self, chunk, matcher):
+        """글 청크(DataFrame) 중 워터마크 이후 글만 요리명을 매칭해서 점수에 더함"""
+        chunk = chunk.dropna(subset=['created_date'])
+        chunk = chunk[chunk['created_date'] >= self.watermark[0]]
+        for row in chunk.itertuples(index=False):
+            url = row.URL if isinstance(row.URL, str) else ''
+            if not self.is_new(row.created_date, url):
+                continue
+            text = f"{row.title if isinstance(row.title, str) else ''} {row.content if isinstance(row.content, str) else ''}"
+            dishes = {name for _, _, name in matcher.find(normalize_text(text))}
+            if dishes:
+                created = datetime.strptime(row.created_date, DATE_FORMAT)
+                contribution = post_weight(_as_int(row.score), _as_int(row.num_comments)) * decay_factor(
+                    (self.as_of - created).total_seconds()
+                )
+                for dish in dishes:
+                    self.scores[dish] += contribution
+                    self.mentions[dish] += 1
+                    self.last_seen[dish] = max(self.last_seen.get(dish, ''), row.created_date)
+            if row.created_date > self.last_created_date:
+                self.last_created_date = row.created_date
+                self.boundary_urls = {url}
+            elif row.created_date == self.last_created_date:
+                self.boundary_urls.add(url)
+            self.new_posts += 1
+
+    def ranked(self, top_k):
+        """감쇠 점수 순 상위 top_k개 (요리명, 누적 언급 글 수, 감쇠 점수)"""
+        return [(dish, self.mentions[dish], score) for dish, score in self.scores.most_common(top_k)]
+
+    def save(self, cursor, replace):
+        """점수와 워터마크를 저장 (publish_tables의 after_swap에서 같은 트랜잭션으로 호출)"""
+        create_state_tables(cursor)
+        if replace:
+            cursor.execute(f"DELETE FROM {SCORES_TABLE}")
+        cursor.executemany(
+            f"INSERT OR REPLACE INTO {SCORES_TABLE} (dish, decayed_score, mentions, last_seen) VALUES (?, ?, ?, ?)",
+            ((dish, score, self.mentions[dish], self.last_seen[dish]) for dish, score in self.scores.items())
+        )
+        cursor.execute(
+            f"""
+            INSERT OR REPLACE INTO {WATERMARK_TABLE}
+                (source, last_created_date, boundary_urls, as_of, lexicon_key, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                WATERMARK_SOURCE, self.last_created_date, json.dumps(sorted(self.boundary_urls)),
+                self.as_of.strftime(DATE_FORMAT), self.lexicon_key, datetime.now().strftime(DATE_FORMAT)
+            )
+        )
+
+
+def _as_int(value):
+    return 0 if pd.isna(value) else int(value)
+
+
+def load_state(conn, lexicon_key):
+    """저장된 트렌드 상태를 반환 (없거나 요리명 사전이 바뀌었으면 None -> 전체 재계산)"""
+    cursor = conn.cursor()
+    create_state_tables(cursor)
+    conn.commit()
+    row = cursor.execute(
+        f"SELECT last_created_date, boundary_urls, as_of, lexicon_key FROM {WATERMARK_TABLE} WHERE source = ?",
+        (WATERMARK_SOURCE,)
+    ).fetchone()
+    if row is None:
+        return None
+    if row[3] != lexicon_key:
+        print("⚠️ 요리명 사전이 바뀌어 트렌드 점수를 전체 재계산합니다.")
+        return None
+
+    scores, mentions, last_seen = Counter(), Counter(), {}
+    for dish, score, mention_count, seen in cursor.execute(
+        f"SELECT dish, decayed_score, mentions, last_seen FROM {SCORES_TABLE}"
+    ):
+        scores[dish] = score
+        mentions[dish] = mention_count
+        last_seen[dish] = seen
+    return TrendState(
+        datetime.strptime(row[2], DATE_FORMAT), lexicon_key, scores, mentions, last_seen,
+        last_created_date=row[0], boundary_urls=json.loads(row[1])
+    )
+
+
+def iter_trend_chunks(csv_path, chunksize, since=None):
+    """
+    트렌드 계산에 필요한 컬럼만 청크 단위로 읽음 (since: 이 created_date 이후 글만)
+    글 저장소(.db)면 created_date 인덱스로 새 글만 읽고, CSV면 전체를 읽어 거름
+    """
+    yield from iter_post_frames(csv_path, TREND_COLUMNS, chunksize, since=since)
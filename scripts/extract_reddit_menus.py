@@ -1,13 +1,32 @@
-import pandas as pd
-import re
 import sqlite3
 import os
+import sys
+import argparse
 from collections import Counter
+from datetime import datetime
+
+# 정규화 레시피/검색 색인 정리, n-gram 계산, 원자적 게시를 위해 scripts 모듈을 사용하므로,
+# 'python -m scripts.extract_reddit_menus'로 실행해야 함
+try:
+    from scripts.recipe_tables import create_structured_tables, rebuild_structured_recipes, sync_search_index
+    from scripts.ngram_counter import POST_CHUNK_SIZE, iter_post_texts, count_ngrams_streaming
+    from scripts.dish_lexicon import LEARNED_LEXICON_FILE, DishMatcher, load_lexicon, learn_dishes, save_learned_lexicon
+    from scripts import dish_trends
+    from scripts.reddit_store import resolve_corpus_path
+    from scripts.db_publish import (
+        connect_for_ingest, drop_stale_staging_tables, new_staging_token, staging_table_name, publish_tables
+    )
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.extract_reddit_menus\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
 
 # --- 1. 설정 ---
 DB_FILE = 'kfood_recipes.db'
 TABLE_NAME = 'hot_recipes'
-CSV_FILE = 'data/reddit_koreanfood.csv'
 
 
 STOPWORDS_SET = {
@@ -17,72 +36,144 @@ print(f"--- 총 {len(STOPWORDS_SET)}개의 고유한 불용어를 사용합니
 
 
 # --- 2. N-Gram 분석 함수 ---
-def analyze_dish_ngrams(csv_path):
+def analyze_dish_ngrams(csv_path, chunksize=POST_CHUNK_SIZE, workers=1, epsilon=None):
     """
-    CSV 파일을 읽어 3-gram을 "순수 발견" 방식으로 분석하고,
+    CSV 파일을 글 chunksize개씩 스트리밍하며 3-gram을 "순수 발견" 방식으로 분석하고,
     '완성된 요리'로 보이는 구문(phrase)의 빈도를 반환 (Counter 객체)
+    epsilon을 지정하면 메모리가 제한된 근사 Top-K 요약(HeavyHitters)을 반환
     """
+    print(f"--- 3-gram 분석 시작 (청크 {chunksize}개 글, 워커 {workers}개) ---")
+    
+    # 3-gram(3단어)만, 불용어/1글자 단어/숫자가 포함된 구문은 제외 (겹치는 구문도 모두 셈)
     try:
-        df = pd.read_csv(csv_path)
+        filtered_phrases = count_ngrams_streaming(
+            iter_post_texts(csv_path, chunksize), orders=(3,), stopwords=STOPWORDS_SET, workers=workers, epsilon=epsilon
+        )[3]
     except FileNotFoundError:
         print(f"오류: '{csv_path}' 파일을 찾을 수 없습니다.")
         print("스크립트가 루트 폴더에서 실행되고 있는지, 'data/reddit_koreanfood.csv' 경로가 맞는지 확인하세요.")
         return None
-    
-    df['content'] = df['content'].fillna('')
-    df['title'] = df['title'].fillna('')
-    all_text = ' '.join(df['title'].str.lower() + ' ' + df['content'].str.lower())
-    
-    # 3-gram(3단어)만 추출
-    trigrams = re.findall(r'\b(\w+ \w+ \w+)\b', all_text)
-    
-    print(f"--- 3-gram 분석 시작 (총 {len(trigrams)}개 대상) ---")
-    
-    filtered_phrases = Counter()
-    for phrase in trigrams:
-        words_in_phrase = set(phrase.split())
-        
-        # 조건 1: 구문에 불용어가 포함되어 있으면 버림
-        if words_in_phrase.intersection(STOPWORDS_SET):
-            continue
             
-        # 조건 2: 1글자 단어 또는 숫자만 있는 단어는 무시
-        if any(len(word) < 2 or word.isdigit() for word in words_in_phrase):
-            continue
-            
-        filtered_phrases[phrase] += 1
-            
-    print("--- N-gram 분석 완료 ---")
+    print(f"--- N-gram 분석 완료 (고유 구문 {len(filtered_phrases)}개) ---")
     return filtered_phrases
 
+
+def analyze_dish_mentions(csv_path, chunksize=POST_CHUNK_SIZE, learned_path=None):
+    """
+    요리명 사전(큐레이션 + 학습)을 Aho-Corasick 오토마톤으로 컴파일하고,
+    글마다 한 번 훑어서 대표 요리명별 언급 수를 반환 (Counter 객체)
+    ("kimchi fried rice", "김치찌개"처럼 길이/불용어와 상관없이 사전에 있는 이름을 그대로 셈)
+    """
+    matcher = DishMatcher(load_lexicon(learned_path))
+    print(f"--- 요리명 사전 매칭 시작 (오토마톤 노드 {len(matcher.goto)}개, 청크 {chunksize}개 글) ---")
+
+    mentions = Counter()
+    try:
+        for texts in iter_post_texts(csv_path, chunksize):
+            mentions.update(matcher.count(texts))
+    except FileNotFoundError:
+        print(f"오류: '{csv_path}' 파일을 찾을 수 없습니다.")
+        print("스크립트가 루트 폴더에서 실행되고 있는지, 'data/reddit_koreanfood.csv' 경로가 맞는지 확인하세요.")
+        return None
+
+    print(f"--- 요리명 매칭 완료 (언급된 요리 {len(mentions)}개) ---")
+    return mentions
+
+
+def learn_dish_lexicon(csv_path, learned_path, chunksize=POST_CHUNK_SIZE, workers=1, min_count=5):
+    """2~3-gram 빈도에서 요리 접미어로 끝나는 새 요리명을 찾아 학습된 사전(JSON)에 저장"""
+    print(f"--- 요리명 학습 시작 (2~3-gram, 최소 {min_count}회) ---")
+    try:
+        counts = count_ngrams_streaming(
+            iter_post_texts(csv_path, chunksize), orders=(2, 3), stopwords=STOPWORDS_SET, workers=workers
+        )
+    except FileNotFoundError:
+        print(f"오류: '{csv_path}' 파일을 찾을 수 없습니다.")
+        return
+    save_learned_lexicon(learn_dishes(counts, load_lexicon(), min_count), learned_path)
+
+
+def compute_dish_trends(csv_path, db_path, chunksize=POST_CHUNK_SIZE, learned_path=None, full_rebuild=False):
+    """
+    요리별 지수 감쇠 트렌드 점수를 갱신
+    - 저장된 상태가 있으면 점수에 감쇠를 한 번 곱하고, 워터마크(created_date) 이후 글만 매칭해서 더함
+    - 없거나(--full-rebuild 포함) 요리명 사전이 바뀌었으면 전체 글로 다시 계산
+    (TrendState, 상태 저장 함수(after_swap용)) 반환, 실패 시 (None, None)
+    """
+    lexicon = load_lexicon(learned_path)
+    matcher = DishMatcher(lexicon)
+    lexicon_key = dish_trends.lexicon_fingerprint(lexicon)
+    now = datetime.utcnow().replace(microsecond=0)  # created_date와 같은 UTC 기준
+
+    state = None
+    if not full_rebuild and os.path.exists(db_path):
+        conn = sqlite3.connect(db_path)
+        try:
+            state = dish_trends.load_state(conn, lexicon_key)
+        finally:
+            conn.close()
+    replace = state is None
+    if replace:
+        print("--- 트렌드 점수 전체 계산 시작 ---")
+        state = dish_trends.TrendState(now, lexicon_key)
+    else:
+        print(f"--- 트렌드 점수 증분 갱신 시작 (워터마크 {state.last_created_date}, 기준 시각 {state.as_of}) ---")
+        state.advance(now)
+
+    try:
+        since = None if replace else state.watermark[0]
+        for chunk in dish_trends.iter_trend_chunks(csv_path, chunksize, since):
+            state.apply_chunk(chunk, matcher)
+    except FileNotFoundError:
+        print(f"오류: '{csv_path}' 파일을 찾을 수 없습니다.")
+        print("스크립트가 루트 폴더에서 실행되고 있는지, 'data/reddit_koreanfood.csv' 경로가 맞는지 확인하세요.")
+        return None, None
+
+    print(f"--- 트렌드 점수 갱신 완료 (새 글 {state.new_posts}개, 요리 {len(state.scores)}개) ---")
+    return state, lambda cursor: state.save(cursor, replace)
+
 # --- 3. SQLite DB 생성 함수 (스키마/로직 변경) ---
-def create_db_schema(db_path, table_name, data_counter, top_k=15):
+def create_db_schema(db_path, table_name, data_counter, top_k=15, after_swap=None):
     """
     DB 테이블을 생성하고, '메뉴' (랭킹, 이름)을 삽입
+    data_counter가 TrendState면 감쇠 트렌드 점수 순으로 랭킹을 매김 (score = 누적 언급 글 수)
+    after_swap: 교체 트랜잭션 안에서 함께 실행할 함수 (트렌드 상태 저장)
+    게시하면 True, 분석 결과가 없거나 저장에 실패하면 False (이때 기존 랭킹은 그대로 유지)
     """
-    if data_counter is None or not data_counter:
-        print("저장할 데이터가 없습니다.")
-        # [추가] 데이터가 없을 때도 빈 DB 파일과 테이블은 생성
-        print(f"'{db_path}'에 빈 테이블을 생성합니다.")
-        data_counter = Counter() # 빈 카운터
+    if data_counter is None:
+        print("❌ 분석 결과가 없어 랭킹을 게시하지 않습니다. (기존 랭킹 유지)")
+        return False
+
+    # 상위 K개의 (이름, 점수, 트렌드 점수) 튜플 리스트
+    if isinstance(data_counter, dish_trends.TrendState):
+        top_recipes = data_counter.ranked(top_k)
+    else:
+        top_recipes = [(name, score, None) for name, score in data_counter.most_common(top_k)]
+    if not top_recipes:
+        print("❌ 저장할 '요리'를 찾지 못해 랭킹을 게시하지 않습니다. (기존 랭킹 유지)")
+        return False
     
     # DB 파일이 루트 폴더에 생성되도록 경로 보정
     db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), db_path)
 
+    conn = None
     try:
-        conn = sqlite3.connect(db_path)
+        # WAL 모드 연결: 새 랭킹을 쓰는 동안에도 API는 이전 버전을 계속 조회
+        conn = connect_for_ingest(db_path)
         cursor = conn.cursor()
-        
-        # 테이블이 이미 존재하면 삭제
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-        print(f"'{table_name}' 테이블이 존재하면 삭제합니다.")
+
+        # 이전 실패로 남은 staging 테이블 정리 후, 버전이 붙은 staging 테이블에 새 랭킹 작성
+        drop_stale_staging_tables(conn, table_name)
+        staging_token = new_staging_token()
+        staging_table = staging_table_name(table_name, staging_token)
         
         # '레시피' 컬럼들을 NULL을 허용하는 TEXT로 미리 생성
         cursor.execute(f"""
-        CREATE TABLE {table_name} (
+        CREATE TABLE {staging_table} (
             ranking INTEGER PRIMARY KEY,
             recipe_name TEXT NOT NULL,
             score INTEGER NOT NULL,
+            trend_score REAL,
             recipe_detail_ko TEXT, 
             recipe_detail_en TEXT,
             image_url TEXT,
@@ -90,51 +181,101 @@ def create_db_schema(db_path, table_name, data_counter, top_k=15):
             description TEXT
         )
         """)
-        print(f"'{table_name}' 테이블을 새로 생성합니다.")
+        print(f"staging 테이블 '{staging_table}'을 생성합니다.")
         
-        # 상위 K개의 (이름, 점수) 튜플 리스트
-        top_recipes = data_counter.most_common(top_k) 
+        # (랭킹, 이름, 점수, 트렌드 점수) 데이터만 먼저 삽입
+        insert_data = []
+        for i, (name, score, trend_score) in enumerate(top_recipes, 1):
+            # (ranking, recipe_name, score, trend_score)
+            insert_data.append((i, name, score, trend_score))
+        cursor.executemany(
+            f"INSERT INTO {staging_table} (ranking, recipe_name, score, trend_score) VALUES (?, ?, ?, ?)", insert_data
+        )
+
+        # 이전 랭킹에도 있던 요리는 이미 채운 레시피/설명/이미지를 그대로 가져옴
+        # (순위만 바뀐 요리를 Bedrock으로 다시 생성하지 않도록, 새로 들어온 요리만 NULL로 남김)
+        if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)).fetchone():
+            cursor.execute(f"""
+            UPDATE {staging_table}
+            SET (recipe_detail_ko, recipe_detail_en, image_url, cook_time, description) = (
+                SELECT live.recipe_detail_ko, live.recipe_detail_en, live.image_url, live.cook_time, live.description
+                FROM {table_name} AS live WHERE live.recipe_name = {staging_table}.recipe_name
+            )
+            WHERE recipe_name IN (SELECT recipe_name FROM {table_name})
+            """)
+            print(f"이전 랭킹에도 있던 요리 {cursor.rowcount}개의 레시피 컬럼을 유지합니다.")
+
+        def refresh_derived_tables(publish_cursor):
+            # 랭킹 번호가 새로 매겨지므로, 유지한 레시피로 정규화 테이블/검색 색인을 같은 트랜잭션에서 다시 만듦
+            create_structured_tables(publish_cursor)
+            rebuild_structured_recipes(publish_cursor, table_name)
+            sync_search_index(publish_cursor)
+            if after_swap is not None:
+                after_swap(publish_cursor)
+
+        # staging -> live 원자적 교체
+        publish_tables(conn, {table_name: staging_table}, after_swap=refresh_derived_tables)
         
-        if top_recipes:
-            # (랭킹, 이름, 점수) 데이터만 먼저 삽입
-            insert_data = []
-            for i, (name, score) in enumerate(top_recipes, 1):
-                # (ranking, recipe_name, score)
-                insert_data.append((i, name, score))
-            
-            cursor.executemany(f"INSERT INTO {table_name} (ranking, recipe_name, score) VALUES (?, ?, ?)", insert_data)
-            conn.commit()
-            
-            print(f"\n--- SQLite DB '{db_path}' 생성 완료 ---")
-            print(f"'{table_name}' 테이블에 상위 {len(top_recipes)}개 '메뉴' 저장 완료.")
-            
-            # (검증)
-            print("\n--- [DB 검증] 저장된 '메뉴' (Top 5) ---")
-            for row in cursor.execute(f"SELECT ranking, recipe_name, score FROM {table_name} ORDER BY ranking ASC LIMIT 5"):
-                print(f"- Rank {row[0]}: {row[1]} (Score: {row[2]})")
+        print(f"\n--- SQLite DB '{db_path}' 생성 완료 ---")
+        print(f"'{table_name}' 테이블에 상위 {len(top_recipes)}개 '메뉴' 저장 완료.")
         
-        else:
-            print("\n--- SQLite DB '{db_path}' 생성 완료 ---")
-            print(f"'{table_name}' 테이블에 저장할 '요리' 키워드를 찾지 못했습니다. (테이블은 비어있음)")
-            
-        conn.close()
+        # (검증)
+        print("\n--- [DB 검증] 저장된 '메뉴' (Top 5) ---")
+        for row in cursor.execute(f"SELECT ranking, recipe_name, score, trend_score FROM {table_name} ORDER BY ranking ASC LIMIT 5"):
+            trend = f", Trend: {row[3]:.2f}" if row[3] is not None else ""
+            print(f"- Rank {row[0]}: {row[1]} (Score: {row[2]}{trend})")
+        return True
 
     except sqlite3.Error as e:
         print(f"SQLite 오류 발생: {e}")
+        return False
     except Exception as e:
         print(f"DB 생성 중 알 수 없는 오류: {e}")
+        return False
+    finally:
+        if conn is not None:
+            conn.close()
 
 
 # --- 4. 스크립트 실행 ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reddit 요리명 언급 분석 -> hot_recipes 랭킹 생성")
+    parser.add_argument("--matcher", choices=["lexicon", "ngram"], default="lexicon",
+                        help="lexicon: 요리명 사전 매칭 (기본) / ngram: 기존 3-gram 발견 방식")
+    parser.add_argument("--rank-by", choices=["trend", "mentions"], default="trend",
+                        help="lexicon 매처의 랭킹 기준: trend(감쇠 트렌드 점수, 기본) / mentions(전체 기간 언급 수)")
+    parser.add_argument("--full-rebuild", action="store_true", help="저장된 트렌드 상태를 무시하고 전체 글로 다시 계산")
+    parser.add_argument("--learn-lexicon", action="store_true",
+                        help="매칭 전에 n-gram에서 새 요리명을 학습해 학습된 사전(JSON)을 갱신")
+    parser.add_argument("--chunksize", type=int, default=POST_CHUNK_SIZE, help="한 번에 읽을 글 수")
+    parser.add_argument("--workers", type=int, default=1, help="n-gram 계산 프로세스 수")
+    parser.add_argument("--approx-epsilon", type=float, default=None, help="근사 Top-K 모드 빈도 오차 비율 (대용량 덤프용)")
+    parser.add_argument("--corpus", default=None, help="읽을 글 저장소(.db) 또는 CSV (기본: data/ 아래 저장소, 없으면 CSV)")
+    parser.add_argument("--db", default=DB_FILE, help="랭킹을 저장할 SQLite DB 파일 (상대 경로는 루트 폴더 기준)")
+    args = parser.parse_args()
     
-    # 스크립트 파일 위치 기준으로 CSV 파일 경로 설정
+    # 스크립트 파일 위치 기준으로 글 저장소(없으면 CSV) 경로 설정
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
-    csv_file_path = os.path.join(project_root, CSV_FILE)
+    csv_file_path = args.corpus or resolve_corpus_path(project_root)
 
-    ranking_data = analyze_dish_ngrams(csv_file_path)
-    
+    learned_path = os.path.join(project_root, LEARNED_LEXICON_FILE)
     # DB 파일을 루트 폴더에 생성
-    db_file_path = os.path.join(project_root, DB_FILE)
-    create_db_schema(db_file_path, TABLE_NAME, ranking_data, top_k=15)
\ No newline at end of file
+    db_file_path = os.path.join(project_root, args.db)
+
+    save_trends = None
+    if args.matcher == "lexicon":
+        if args.learn_lexicon:
+            learn_dish_lexicon(csv_file_path, learned_path, args.chunksize, args.workers)
+        if args.rank_by == "trend":
+            ranking_data, save_trends = compute_dish_trends(
+                csv_file_path, db_file_path, args.chunksize, learned_path, args.full_rebuild
+            )
+        else:
+            ranking_data = analyze_dish_mentions(csv_file_path, args.chunksize, learned_path)
+    else:
+        ranking_data = analyze_dish_ngrams(csv_file_path, args.chunksize, args.workers, args.approx_epsilon)
+    
+    # 게시하지 못했으면 실패 종료 코드 (파이프라인/벤치마크가 성공으로 기록하지 않도록)
+    if not create_db_schema(db_file_path, TABLE_NAME, ranking_data, top_k=15, after_swap=save_trends):
+        sys.exit(1)
\ No newline at end of file
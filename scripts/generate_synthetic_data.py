@@ -0,0 +1,280 @@
+# scripts/generate_synthetic_data.py
+# 벤치마크용 합성 데이터 생성기 (실제 데이터는 크고 일부 비공개라 개발 PC에서 그대로 쓸 수 없음)
+#
+# - grocery CSV(sales, products, categories, customers, cities, countries)와 Reddit CSV를
+#   실제 파일과 같은 컬럼/형식으로 생성 -> analyze_grocery_data, n_grams, extract_reddit_menus가 그대로 읽음
+# - 시드가 같으면 항상 같은 파일 (시드와 배율로 만든 random.Random만 사용, 현재 시각/환경에 의존하지 않음)
+# - 배율(1x/10x/100x)은 행 수가 늘어나는 테이블(sales, customers, Reddit 글)에만 곱함
+#   (상품/카테고리/도시/국가는 실제 데이터처럼 고정 크기)
+# - 상품 판매량과 요리 언급은 Zipf 분포 -> 순위/Top-K 결과가 실제 데이터처럼 한쪽으로 쏠림
+# - 표준 라이브러리만 사용 (pandas 없이도 생성 가능)
+#
+# 결과 폴더: <out-dir>/<배율>x/grocery_data/*.csv, <out-dir>/<배율>x/reddit_koreanfood.csv
+#   (--reddit-store: 같은 글로 data/reddit_corpus.db 형식의 글 저장소도 생성)
+#
+# 실행: python -m scripts.generate_synthetic_data [--scales 1 10 100] [--seed 42]
+
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+try:
+    from scripts.dish_lexicon import CURATED_DISHES
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.generate_synthetic_data\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
+
+# --- 1. 설정 ---
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYNTHETIC_DIR = os.path.join(PROJECT_ROOT, 'data', 'synthetic')
+REDDIT_CSV_NAME = 'reddit_koreanfood.csv'
+REDDIT_STORE_NAME = 'reddit_corpus.db'
+
+# 1x 기준 행 수 (배율을 곱함)
+BASE_SALES_ROWS = 100_000
+BASE_CUSTOMERS = 1_000
+BASE_REDDIT_POSTS = 2_000
+
+# 고정 크기 차원 테이블
+PRODUCT_COUNT = 450
+CITY_COUNT = 96
+COUNTRY_COUNT = 20
+
+# 판매/글 날짜 범위 (고정 -> 재현 가능)
+# (트렌드 점수는 현재 시각 기준으로 감쇠하므로 합성 글의 트렌드 값은 작지만, 처리량/메모리 측정에는 영향 없음)
+SALES_START = datetime(2018, 1, 1)
+SALES_DAYS = 130
+REDDIT_END = datetime(2025, 10, 1)
+REDDIT_DAYS = 365
+
+# 한 번에 생성해서 쓰는 행 수
+WRITE_BATCH = 50_000
+
+# 실제 데이터의 카테고리 (음식이 아닌 카테고리도 섞어서 필터 경로까지 측정)
+CATEGORIES = [
+    "Confections", "Shell fish", "Cereals", "Dairy", "Beverages", "Seafood",
+    "Meat", "Grain", "Poultry", "Snails", "Produce", "Cleaning", "Household",
+]
+PRODUCT_WORDS = [
+    "Beef", "Pork", "Chicken", "Tofu", "Rice", "Noodles", "Kimchi", "Garlic", "Onion", "Scallion",
+    "Sesame", "Soy", "Chili", "Radish", "Cabbage", "Egg", "Mushroom", "Seaweed", "Anchovy", "Squid",
+]
+PRODUCT_FORMS = ["Paste", "Powder", "Fresh", "Frozen", "Sliced", "Ground", "Dried", "Whole", "Sauce", "Oil"]
+NON_FOOD_PRODUCTS = ["Towels", "Cleaning Sponge", "Dish Soap", "Paper Napkin", "Table Cloth"]
+
+COUNTRY_NAMES = [
+    "United States", "Canada", "Mexico", "Brazil", "United Kingdom", "France", "Germany", "Spain", "Italy", "Korea",
+    "Japan", "China", "India", "Australia", "Vietnam", "Thailand", "Philippines", "Indonesia", "Turkey", "Egypt",
+]
+CITY_SYLLABLES = ["San", "Port", "Lake", "New", "Fort", "Spring", "River", "Green", "Mill", "Oak", "Bay", "Hill"]
+
+# Reddit 글 본문 (요리명 외 단어는 n-gram 불용어/일반 단어 위주)
+TITLE_TEMPLATES = [
+    "Made {dish} for the first time",
+    "Homemade {dish} tonight",
+    "My mom's {dish} recipe",
+    "Best {dish} I've had in a while",
+    "Question about {dish}",
+    "{dish} and {dish2} for dinner",
+    "Trying to recreate {dish} from Seoul",
+    "First attempt at {dish}, how did I do?",
+]
+CONTENT_SENTENCES = [
+    "I used gochujang and a little sugar.",
+    "Any tips to make it less salty?",
+    "Recipe from Maangchi, slightly modified.",
+    "It took about 40 minutes start to finish.",
+    "Served with rice and some banchan.",
+    "The kids loved it.",
+    "Next time I will add more garlic.",
+    "Bought the ingredients at H Mart.",
+    "Also made {dish2} on the side.",
+    "",
+]
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """순위 i(0부터)의 가중치가 1/(i+1)^exponent인 누적 가중치 (random.choices용)"""
+    return list(accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def write_csv(path, header, rows):
+    """행 iterable을 WRITE_BATCH 단위로 기록하고 행 수를 반환"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= WRITE_BATCH:
+                writer.writerows(batch)
+                written += len(batch)
+                batch = []
+        writer.writerows(batch)
+        written += len(batch)
+    return written
+
+
+# --- 2. grocery 데이터 ---
+
+def generate_grocery(out_dir, scale, rng):
+    """grocery_data 폴더에 6개 CSV 생성, 파일명 -> 행 수 dict 반환"""
+    counts = {}
+    customer_count = BASE_CUSTOMERS * scale
+    sales_rows = BASE_SALES_ROWS * scale
+
+    counts['categories.csv'] = write_csv(
+        os.path.join(out_dir, 'categories.csv'), ['CategoryID', 'CategoryName'],
+        ((category_id, name) for category_id, name in enumerate(CATEGORIES, start=1))
+    )
+    counts['countries.csv'] = write_csv(
+        os.path.join(out_dir, 'countries.csv'), ['CountryID', 'CountryName', 'CountryCode'],
+        ((country_id, name, name[:2].upper()) for country_id, name in enumerate(COUNTRY_NAMES[:COUNTRY_COUNT], start=1))
+    )
+    counts['cities.csv'] = write_csv(
+        os.path.join(out_dir, 'cities.csv'), ['CityID', 'CityName', 'Zipcode', 'CountryID'],
+        (
+            (city_id, f"{rng.choice(CITY_SYLLABLES)} {rng.choice(CITY_SYLLABLES).lower()}ville {city_id}",
+             rng.randint(10000, 99999), rng.randint(1, COUNTRY_COUNT))
+            for city_id in range(1, CITY_COUNT + 1)
+        )
+    )
+    counts['customers.csv'] = write_csv(
+        os.path.join(out_dir, 'customers.csv'),
+        ['CustomerID', 'FirstName', 'MiddleInitial', 'LastName', 'CityID', 'Address'],
+        (
+            (customer_id, f"First{customer_id}", chr(65 + customer_id % 26), f"Last{customer_id}",
+             rng.randint(1, CITY_COUNT), f"{rng.randint(1, 9999)} Main St")
+            for customer_id in range(1, customer_count + 1)
+        )
+    )
+
+    # 상품: 대부분 음식, 일부는 비음식(카테고리 또는 이름 키워드로 걸러지는 상품)
+    products, prices = [], {}
+    for product_id in range(1, PRODUCT_COUNT + 1):
+        if product_id % 40 == 0:
+            name = f"{rng.choice(NON_FOOD_PRODUCTS)} {product_id}"
+        else:
+            name = f"{rng.choice(PRODUCT_WORDS)} {rng.choice(PRODUCT_FORMS)} {product_id}"
+        price = round(rng.uniform(0.5, 100), 4)
+        prices[product_id] = price
+        products.append((product_id, name, price, rng.randint(1, len(CATEGORIES)), rng.choice("ABC"),
+                         "2018-02-19 08:46:" + f"{rng.randint(0, 59):02d}.000", rng.choice(["Durable", "Weak", "Unknown"]),
+                         rng.choice(["Yes", "No", "Unknown"]), rng.randint(0, 100)))
+    counts['products.csv'] = write_csv(
+        os.path.join(out_dir, 'products.csv'),
+        ['ProductID', 'ProductName', 'Price', 'CategoryID', 'Class', 'ModifyDate', 'Resistant', 'IsAllergic', 'VitalityDays'],
+        products
+    )
+
+    # 판매: SalesID와 판매 시각 모두 오름차순 (증분 집계의 tail 추가 패턴과 같음)
+    product_ids = list(range(1, PRODUCT_COUNT + 1))
+    rng.shuffle(product_ids)  # 인기 순위가 ProductID 순서와 같지 않도록
+    product_weights = zipf_cum_weights(PRODUCT_COUNT)
+    seconds_per_row = SALES_DAYS * 86400 / sales_rows
+
+    def sales_rows_iter():
+        for sales_id in range(1, sales_rows + 1):
+            product_id = rng.choices(product_ids, cum_weights=product_weights)[0]
+            quantity = rng.randint(1, 25)
+            discount = rng.choice((0.0, 0.0, 0.0, 0.1, 0.2))
+            sold_at = SALES_START + timedelta(seconds=(sales_id + rng.random()) * seconds_per_row)
+            yield (
+                sales_id, rng.randint(1, 23), rng.randint(1, customer_count), product_id, quantity, discount,
+                round(prices[product_id] * quantity * (1 - discount), 2),
+                sold_at.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3], f"TX{sales_id:010d}",
+            )
+
+    counts['sales.csv'] = write_csv(
+        os.path.join(out_dir, 'sales.csv'),
+        ['SalesID', 'SalesPersonID', 'CustomerID', 'ProductID', 'Quantity', 'Discount', 'TotalPrice', 'SalesDate',
+         'TransactionNumber'],
+        sales_rows_iter()
+    )
+    return counts
+
+
+# --- 3. Reddit 데이터 ---
+
+def generate_reddit(csv_path, scale, rng):
+    """save_reddit_data.py와 같은 컬럼의 Reddit CSV 생성 (created_date 오름차순), 행 수 반환"""
+    dish_variants = list(CURATED_DISHES.values())
+    dish_weights = zipf_cum_weights(len(dish_variants))
+    post_count = BASE_REDDIT_POSTS * scale
+    start = REDDIT_END - timedelta(days=REDDIT_DAYS)
+    seconds_per_post = REDDIT_DAYS * 86400 / post_count
+
+    def pick_dish():
+        return rng.choice(rng.choices(dish_variants, cum_weights=dish_weights)[0])
+
+    def posts_iter():
+        for post_index in range(post_count):
+            dish, dish2 = pick_dish(), pick_dish()
+            title = rng.choice(TITLE_TEMPLATES).format(dish=dish, dish2=dish2)
+            sentences = rng.sample(CONTENT_SENTENCES, rng.randint(0, 4))
+            content = " ".join(sentence.format(dish2=dish2) for sentence in sentences).strip()
+            created = start + timedelta(seconds=int(post_index * seconds_per_post))
+            post_id = f"s{scale}{post_index:07d}"
+            score = int(rng.paretovariate(1.2)) - 1
+            yield (
+                title, 'koreanfood', score, content, created.strftime('%Y-%m-%d %H:%M:%S'),
+                f"https://www.reddit.com/r/koreanfood/comments/{post_id}/synthetic_post/",
+                min(int(score * rng.uniform(0.05, 0.5)), 5000), round(rng.uniform(0.6, 1.0), 2),
+            )
+
+    return write_csv(
+        csv_path,
+        ['title', 'subreddit', 'score', 'content', 'created_date', 'URL', 'num_comments', 'upvote_ratio'],
+        posts_iter()
+    )
+
+
+def scale_dir(out_dir, scale):
+    return os.path.join(out_dir, f"{scale}x")
+
+
+def generate(out_dir, scale, seed, reddit_store=False):
+    """배율 하나의 데이터셋 생성 (grocery + Reddit), (파일명 -> 행 수) dict 반환"""
+    target = scale_dir(out_dir, scale)
+    print(f"--- {scale}x 합성 데이터 생성 -> '{target}' (시드 {seed}) ---")
+    started = time.perf_counter()
+    counts = generate_grocery(os.path.join(target, 'grocery_data'), scale, random.Random(seed * 1000 + scale))
+
+    reddit_csv = os.path.join(target, REDDIT_CSV_NAME)
+    counts[REDDIT_CSV_NAME] = generate_reddit(reddit_csv, scale, random.Random(seed * 1000 + scale + 500))
+    if reddit_store:
+        from scripts.reddit_store import migrate_csv
+
+        store_path = os.path.join(target, REDDIT_STORE_NAME)
+        if os.path.exists(store_path):
+            os.remove(store_path)  # 이전 생성 결과와 섞이지 않도록 새로 만듦
+        counts[REDDIT_STORE_NAME] = migrate_csv(reddit_csv, store_path)
+
+    for name, rows in counts.items():
+        print(f"✅ {name}: {rows:,}행")
+    print(f"--- {scale}x 생성 완료 ({time.perf_counter() - started:.1f}s) ---")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벤치마크용 grocery/Reddit 합성 데이터 생성")
+    parser.add_argument("--out-dir", default=SYNTHETIC_DIR, help="결과 폴더 (배율마다 <배율>x 하위 폴더)")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="생성할 배율")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드 (같으면 같은 파일)")
+    parser.add_argument("--reddit-store", action="store_true", help="Reddit CSV로 SQLite 글 저장소도 생성")
+    args = parser.parse_args()
+
+    for scale in args.scales:
+        generate(args.out_dir, scale, args.seed, args.reddit_store)
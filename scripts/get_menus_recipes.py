@@ -5,13 +5,18 @@ import boto3
 import json
 import time
 import sys
-import xml.etree.ElementTree as ET
-import re
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # 이 스크립트는 app 모듈(config)을 사용하므로,
 # 'python -m scripts.get_menus_recipes'로 실행해야 함
 try:
     from app.core.config import settings
+    from app.services.recipe_parser import extract_recipe_xml
+    from scripts.recipe_tables import create_structured_tables, save_structured_recipe, sync_search_index
+    from scripts.db_publish import connect_for_ingest, record_version
+    from scripts.llm_cache import LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES, LLMCache, cache_key
 except ModuleNotFoundError:
     print("---------------------------------------------------------------")
     print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
@@ -25,6 +30,11 @@ except ModuleNotFoundError:
 DB_FILE = settings.DB_PATH # config에서 DB 경로 가져오기
 TABLE_NAME = 'hot_recipes'
 
+# 동시에 처리할 메뉴 수, Bedrock 호출 속도 제한 (초당 호출 수 / 한 번에 몰아 보낼 수 있는 호출 수)
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RATE_PER_SEC = 1.0
+DEFAULT_BURST = 3
+
 # Bedrock 템플릿 (영어 메인)
 SYSTEM_PROMPT_XML = """
 <template>
@@ -73,6 +83,17 @@ Your mission is to provide K-Food recipes in **English** in a **very clear and e
 </guidelines>
 """
 
+TRANSLATE_SYSTEM_PROMPT = """You are a professional translator specializing in Korean food recipes.
+Your task is to translate the provided English recipe XML into Korean, maintaining the exact same XML structure and format.
+Translate all content including titles, ingredients, steps, recommendations, and tips.
+Keep the XML tags and structure exactly the same - only translate the text content.
+Do not add any greetings or extra text. Just provide the translated XML directly."""
+
+DESCRIPTION_SYSTEM_PROMPT = """You are a food expert. Provide a concise one-sentence description of Korean dishes in English.
+The description should be clear and informative, explaining what the dish is made of.
+Example: For "김밥" (kimbap), you would say: "Seaweed-wrapped rice rolls filled with vegetables, egg, and sometimes meat or tuna."
+Do not include any greetings or extra text. Just provide the description directly."""
+
 # --- 2. Bedrock 클라이언트 및 헬퍼 함수 ---
 try:
     bedrock_runtime = boto3.client(
@@ -84,34 +105,84 @@ except Exception as e:
     print(f"Boto3 클라이언트 초기화 실패: {e}")
     sys.exit(1)
 
-def _extract_recipe_xml(text):
-    """응답 텍스트에서 <recipe> 태그만 깔끔하게 추출하는 헬퍼 함수"""
-    if '<recipe>' in text:
-        text = "<recipe>" + text.split('<recipe>', 1)[1]
-    if '</recipe>' in text:
-        text = text.split('</recipe>', 1)[0] + "</recipe>"
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷: 초당 rate개씩 토큰이 차고(최대 capacity개), 호출마다 하나씩 사용
+    고정 sleep과 달리 응답을 기다리는 시간은 제한에 포함되지 않음 (벽시계 시간 ≈ 호출 수 / rate)
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# Bedrock 호출 속도 제한, 응답 캐시 (enrich_database에서 설정값으로 교체, 캐시 None = 사용 안 함)
+rate_limiter = TokenBucket(DEFAULT_RATE_PER_SEC, DEFAULT_BURST)
+llm_cache = LLMCache()
+
+def _model_input(system_prompt, user_query, max_tokens):
+    """Bedrock Anthropic 메시지 요청 본문 (invoke_model과 배치 작업 파일이 같은 형식을 사용)"""
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "max_tokens": max_tokens,
+        "system": system_prompt,
+        "messages": [{"role": "user", "content": user_query}]
+    }
+
+def _invoke_claude(system_prompt, user_query, max_tokens):
+    """
+    (모델, 프롬프트, max_tokens)가 같은 응답이 캐시에 있으면 그대로 반환하고,
+    없으면 속도 제한 토큰을 받은 뒤 Bedrock을 호출해 응답 텍스트를 캐시에 저장
+    """
+    key = cache_key(MODEL_ID, system_prompt, user_query, max_tokens)
+    if llm_cache is not None:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    body = json.dumps(_model_input(system_prompt, user_query, max_tokens))
+    rate_limiter.acquire()
+    response = bedrock_runtime.invoke_model(
+        body=body, modelId=MODEL_ID, contentType='application/json', accept='application/json'
+    )
+    text = json.loads(response.get('body').read()).get('content')[0].get('text')
+    if llm_cache is not None:
+        llm_cache.put(key, text, MODEL_ID)
     return text
 
+def recipe_prompt(menu_name):
+    """영어 XML 레시피 요청의 (system 프롬프트, user 프롬프트, max_tokens)"""
+    return f"{SYSTEM_PROMPT_HEADER}\n{SYSTEM_PROMPT_XML}", f"Provide a recipe for {menu_name}.", 2048
+
+def translation_prompt(recipe_xml_en):
+    """한글 번역 요청의 (system 프롬프트, user 프롬프트, max_tokens)"""
+    user_query = f"Translate the following recipe XML from English to Korean, maintaining the exact XML structure:\n\n{recipe_xml_en}"
+    return TRANSLATE_SYSTEM_PROMPT, user_query, 2048
+
+def description_prompt(menu_name):
+    """한 줄 설명 요청의 (system 프롬프트, user 프롬프트, max_tokens), 한 줄 설명이므로 짧게"""
+    return DESCRIPTION_SYSTEM_PROMPT, f"Provide a one-sentence description for {menu_name}.", 100
+
 def get_recipe_from_bedrock(menu_name):
     """Bedrock을 호출하여 영어 XML 레시피를 받아오는 함수"""
-    user_query = f"Provide a recipe for {menu_name}."
-    system_prompt = f"{SYSTEM_PROMPT_HEADER}\n{SYSTEM_PROMPT_XML}"
-
     try:
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2048,
-            "system": system_prompt,
-            "messages": [{"role": "user", "content": user_query}]
-        })
-
-        response = bedrock_runtime.invoke_model(
-            body=body, modelId=MODEL_ID, contentType='application/json', accept='application/json'
-        )
-        response_body = json.loads(response.get('body').read())
-        answer = response_body.get('content')[0].get('text')
+        answer = _invoke_claude(*recipe_prompt(menu_name))
         
-        return _extract_recipe_xml(answer)
+        return extract_recipe_xml(answer)
     
     except Exception as e:
         print(f"  [Bedrock 오류] {menu_name}: {e}")
@@ -119,29 +190,10 @@ def get_recipe_from_bedrock(menu_name):
 
 def translate_recipe_to_korean(recipe_xml_en):
     """영어 레시피 XML을 한글로 번역하는 함수"""
-    system_prompt = """You are a professional translator specializing in Korean food recipes.
-Your task is to translate the provided English recipe XML into Korean, maintaining the exact same XML structure and format.
-Translate all content including titles, ingredients, steps, recommendations, and tips.
-Keep the XML tags and structure exactly the same - only translate the text content.
-Do not add any greetings or extra text. Just provide the translated XML directly."""
-
-    user_query = f"Translate the following recipe XML from English to Korean, maintaining the exact XML structure:\n\n{recipe_xml_en}"
-
     try:
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 2048,
-            "system": system_prompt,
-            "messages": [{"role": "user", "content": user_query}]
-        })
-
-        response = bedrock_runtime.invoke_model(
-            body=body, modelId=MODEL_ID, contentType='application/json', accept='application/json'
-        )
-        response_body = json.loads(response.get('body').read())
-        translated_xml = response_body.get('content')[0].get('text').strip()
+        translated_xml = _invoke_claude(*translation_prompt(recipe_xml_en)).strip()
         
-        return _extract_recipe_xml(translated_xml)
+        return extract_recipe_xml(translated_xml)
     
     except Exception as e:
         print(f"  [Bedrock 오류] Translation: {e}")
@@ -149,27 +201,8 @@ Do not add any greetings or extra text. Just provide the translated XML directly
 
 def get_description_from_bedrock(menu_name):
     """Bedrock을 호출하여 음식에 대한 한 줄 설명(영어)을 받아오는 함수"""
-    
-    system_prompt = """You are a food expert. Provide a concise one-sentence description of Korean dishes in English.
-The description should be clear and informative, explaining what the dish is made of.
-Example: For "김밥" (kimbap), you would say: "Seaweed-wrapped rice rolls filled with vegetables, egg, and sometimes meat or tuna."
-Do not include any greetings or extra text. Just provide the description directly."""
-
-    user_query = f"Provide a one-sentence description for {menu_name}."
-
     try:
-        body = json.dumps({
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 100,  # 한 줄 설명이므로 짧게
-            "system": system_prompt,
-            "messages": [{"role": "user", "content": user_query}]
-        })
-
-        response = bedrock_runtime.invoke_model(
-            body=body, modelId=MODEL_ID, contentType='application/json', accept='application/json'
-        )
-        response_body = json.loads(response.get('body').read())
-        description = response_body.get('content')[0].get('text').strip()
+        description = _invoke_claude(*description_prompt(menu_name)).strip()
         
         return description
     
@@ -177,88 +210,283 @@ Do not include any greetings or extra text. Just provide the description directl
         print(f"  [Bedrock 오류] Description for {menu_name}: {e}")
         return None
 
-def extract_cook_time_from_recipe(recipe_xml):
-    """영어 recipe XML에서 cook_time(Total estimated time)을 추출하는 함수"""
-    try:
-        root = ET.fromstring(_extract_recipe_xml(recipe_xml))
-        
-        for title in root.findall("./section/title"):
-            if title.text:
-                match = re.search(r'Total estimated time:\s*(\d+)\s*minutes?', title.text) or \
-                       re.search(r'Total Time:\s*(\d+)\s*minutes?', title.text)
-                if match:
-                    return int(match.group(1))
-
-        return None
-    
-    except Exception as e:
-        print(f"  [Cook time 추출 오류] {e}")
-        return None
+def save_structured_recipes(cursor, ranking, recipe_en, recipe_ko):
+    """
+    영어/한글 XML 레시피를 한 번씩만 파싱해 정규화 테이블에 저장하고,
+    영어 레시피의 총 조리 시간(cook_time)을 반환
+    """
+    parsed_en = save_structured_recipe(cursor, ranking, "eng", recipe_en)
+    save_structured_recipe(cursor, ranking, "kor", recipe_ko)
+    return parsed_en["total_time"] if parsed_en else None
 
 # --- 3. 메인 실행 로직 ---
-def enrich_database():
+def fetch_recipes(recipe_name):
+    """(워커 스레드) 영어 레시피 -> 한글 번역 체인, (영어 XML, 한글 XML 또는 None) 반환"""
+    print(f"  - '{recipe_name}' 영어(EN) 레시피 요청 중...")
+    recipe_en = get_recipe_from_bedrock(recipe_name)
+
+    if recipe_en and not recipe_en.startswith("<error>"):
+        print(f"  - '{recipe_name}' 한글(KO) 번역 중...")
+        recipe_ko = translate_recipe_to_korean(recipe_en)
+
+        # 번역 실패 시 None으로 설정
+        if not recipe_ko or recipe_ko.startswith("<error>"):
+            recipe_ko = None
+            print(f"  ⚠️  '{recipe_name}' 번역 실패 - 한글 레시피를 건너뜁니다.")
+    else:
+        recipe_ko = None
+        print(f"  ⚠️  '{recipe_name}' 영어 레시피 생성 실패 - 한글 레시피를 건너뜁니다.")
+    return recipe_en, recipe_ko
+
+def save_enrichment(conn, ranking, recipe_en, recipe_ko, description):
+    """
+    (메인 스레드) 한 메뉴의 레시피/정규화 테이블/검색 색인을 하나의 트랜잭션으로 반영
+    description이 None(설명 요청 실패)이면 기존 설명을 그대로 둠
+    """
+    cursor = conn.cursor()
+    # 레시피를 한 번만 파싱해 정규화 테이블에 저장 (cook_time은 영어 레시피에서)
+    cook_time = save_structured_recipes(cursor, ranking, recipe_en, recipe_ko)
+    cursor.execute(
+        f"""
+        UPDATE {TABLE_NAME} SET recipe_detail_ko = ?, recipe_detail_en = ?, cook_time = ?, description = COALESCE(?, description)
+        WHERE ranking = ?
+        """,
+        (recipe_ko, recipe_en, cook_time, description, ranking)
+    )
+    sync_search_index(cursor, ranking)
+    record_version(cursor, TABLE_NAME)
+    conn.commit()
+    return cook_time
+
+def enrich_database(concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE_PER_SEC, burst=DEFAULT_BURST, cache=None):
+    """레시피/설명이 비어 있는 메뉴를 채우고, 한글 레시피나 설명을 채우지 못한 메뉴 수를 반환 (다음 실행에서 다시 시도)"""
+    global rate_limiter, llm_cache
+    rate_limiter = TokenBucket(rate, burst)
+    llm_cache = cache
+
     print(f"'{DB_FILE}'의 'hot_recipes' 테이블 레시피 자동 채우기를 시작합니다.")
-    conn = sqlite3.connect(DB_FILE)
+    # WAL 모드 연결: 레시피를 채우는 동안에도 API는 읽기가 막히지 않음
+    conn = connect_for_ingest(DB_FILE)
     cursor = conn.cursor()
+    create_structured_tables(cursor)
+    conn.commit()
 
-    # '할 일 목록' (레시피가 비어있는 항목) 가져오기
-    cursor.execute("SELECT ranking, recipe_name FROM hot_recipes WHERE recipe_detail_ko IS NULL")
+    # '할 일 목록' (레시피 또는 설명이 비어있는 항목) 가져오기
+    cursor.execute(
+        "SELECT ranking, recipe_name, recipe_detail_en, recipe_detail_ko FROM hot_recipes "
+        "WHERE recipe_detail_ko IS NULL OR description IS NULL"
+    )
     tasks = cursor.fetchall()
     
     if not tasks:
         print("모든 레시피가 이미 채워져 있습니다. 작업을 종료합니다.")
         conn.close()
-        return
+        return 0
 
-    print(f"총 {len(tasks)}개의 메뉴에 대한 레시피를 Bedrock에서 가져옵니다...")
+    print(f"총 {len(tasks)}개의 메뉴에 대한 레시피를 Bedrock에서 가져옵니다... (동시 {concurrency}개, 초당 {rate}회)")
 
-    for ranking, recipe_name in tasks:
-        print(f"\n[작업 {ranking}/{len(tasks)}] '{recipe_name}' 레시피 가져오는 중...")
-        
-        # 1. 영어 레시피 가져오기 (메인)
-        print("  - 영어(EN) 레시피 요청 중...")
-        recipe_en = get_recipe_from_bedrock(recipe_name)
-        time.sleep(1) # Bedrock API 속도 제한 방지
-        
-        if recipe_en and not recipe_en.startswith("<error>"):
-            # 2. 영어 레시피를 한글로 번역
-            print("  - 한글(KO) 번역 중...")
-            recipe_ko = translate_recipe_to_korean(recipe_en)
-            time.sleep(1)
-            
-            # 번역 실패 시 None으로 설정
-            if not recipe_ko or recipe_ko.startswith("<error>"):
-                recipe_ko = None
-                print("  ⚠️  번역 실패 - 한글 레시피를 건너뜁니다.")
-        else:
-            recipe_ko = None
-            print("  ⚠️  영어 레시피 생성 실패 - 한글 레시피를 건너뜁니다.")
-
-        # 3. Description 가져오기 (영어로 한 줄 설명)
-        print("  - Description 요청 중...")
-        description = get_description_from_bedrock(recipe_name)
-        time.sleep(1)
-
-        # 4. Cook time 추출 (영어 레시피에서)
-        cook_time = None
-        if recipe_en and not recipe_en.startswith("<error>"):
-            cook_time = extract_cook_time_from_recipe(recipe_en)
-
-        # 5. DB에 업데이트
-        cursor.execute(
-            f"UPDATE {TABLE_NAME} SET recipe_detail_ko = ?, recipe_detail_en = ?, cook_time = ?, description = ? WHERE ranking = ?",
-            (recipe_ko, recipe_en, cook_time, description, ranking)
-        )
-        conn.commit()
-        print(f"  ✅ '{recipe_name}' (Rank {ranking}) DB 업데이트 완료.")
-        if cook_time:
-            print(f"     Cook time: {cook_time}분")
-        if description:
-            print(f"     Description: {description}")
+    # 메뉴마다 (영어 레시피 -> 번역) 체인과 Description을 따로 제출해 병렬로 실행
+    # Bedrock 호출은 워커 스레드에서, DB 쓰기는 이 (메인) 스레드에서만
+    # 한글 레시피까지 있는 메뉴(설명만 비어 있음)는 저장된 레시피를 그대로 쓰고 설명만 요청
+    results = {ranking: {} for ranking, *_ in tasks}
+    names = {ranking: recipe_name for ranking, recipe_name, *_ in tasks}
+    failed = 0
+    with ThreadPoolExecutor(max_workers=concurrency * 2) as pool:
+        futures = {}
+        for ranking, recipe_name, recipe_en, recipe_ko in tasks:
+            if recipe_ko is None:
+                futures[pool.submit(fetch_recipes, recipe_name)] = (ranking, 'recipes')
+            else:
+                results[ranking]['recipes'] = (recipe_en, recipe_ko)
+            futures[pool.submit(get_description_from_bedrock, recipe_name)] = (ranking, 'description')
+
+        for future in as_completed(futures):
+            ranking, kind = futures[future]
+            results[ranking][kind] = future.result()
+            if len(results[ranking]) < 2:
+                continue
+
+            recipe_name = names[ranking]
+            recipe_en, recipe_ko = results[ranking]['recipes']
+            description = results.pop(ranking)['description']
+            cook_time = save_enrichment(conn, ranking, recipe_en, recipe_ko, description)
+            failed += recipe_ko is None or description is None
+            print(f"  ✅ '{recipe_name}' (Rank {ranking}) DB 업데이트 완료. ({len(tasks) - len(results)}/{len(tasks)})")
+            if cook_time:
+                print(f"     Cook time: {cook_time}분")
+            if description:
+                print(f"     Description: {description}")
 
     conn.close()
+    if cache is not None:
+        removed, remaining = cache.prune()
+        print(f"\nLLM 캐시: 적중 {cache.hits}회 / 미적중 {cache.misses}회, 크기 {remaining / 1024 / 1024:.1f}MB (정리 {removed}개)")
+    if failed:
+        print(f"\n⚠️ {failed}개 메뉴의 레시피 또는 설명을 채우지 못했습니다. 다시 실행하면 남은 메뉴만 요청합니다.")
+        return failed
     print("\n--- 모든 레시피 자동 채우기 작업 완료! ---")
+    return 0
+
+def reparse_existing_recipes():
+    """이미 저장된 XML 레시피를 다시 파싱해 정규화 테이블을 채우는 함수 (Bedrock 호출 없음)"""
+    print(f"'{DB_FILE}'의 저장된 XML 레시피를 정규화 테이블로 변환합니다.")
+    conn = connect_for_ingest(DB_FILE)
+    cursor = conn.cursor()
+    create_structured_tables(cursor)
+
+    cursor.execute(f"SELECT ranking, recipe_detail_en, recipe_detail_ko FROM {TABLE_NAME} WHERE recipe_detail_en IS NOT NULL")
+    rows = cursor.fetchall()
+    for ranking, recipe_en, recipe_ko in rows:
+        cook_time = save_structured_recipes(cursor, ranking, recipe_en, recipe_ko)
+        if cook_time is not None:
+            cursor.execute(f"UPDATE {TABLE_NAME} SET cook_time = ? WHERE ranking = ?", (cook_time, ranking))
+    sync_search_index(cursor)
+    record_version(cursor, TABLE_NAME)
+    conn.commit()
+    conn.close()
+    print(f"--- {len(rows)}개 레시피 정규화 완료 ---")
+
+# --- 4. 배치 추론 모드 (JSONL 작업 파일) ---
+# 1) --batch-prepare jobs.jsonl: 남은 요청을 한 줄에 하나씩 {"recordId", "modelInput"}로 작성
+#    (번역은 영어 레시피가 있어야 하므로 레시피 결과를 반영한 뒤 다시 prepare하면 번역 요청이 나옴)
+# 2) jobs.jsonl로 Bedrock 배치 추론 작업 실행 (또는 같은 형식의 결과 파일을 직접 생성)
+# 3) --batch-ingest results.jsonl: {"recordId", "modelOutput"} 줄을 hot_recipes에 반영
+# recordId = "<종류>:<ranking>:<프롬프트 해시 16자>" -> 반영 시 현재 행의 프롬프트 해시와 다르면
+# (그 사이 랭킹이 바뀌었거나 영어 레시피가 달라짐) 건너뜀
+BATCH_RESPONSE_PARSERS = {
+    'recipe': extract_recipe_xml,
+    'translation': lambda text: extract_recipe_xml(text.strip()),
+    'description': lambda text: text.strip(),
+}
+
+def batch_record_id(kind, ranking, prompt):
+    return f"{kind}:{ranking}:{cache_key(MODEL_ID, *prompt)[:16]}"
+
+def expected_batch_prompt(kind, recipe_name, recipe_en):
+    """현재 행 기준으로 해당 종류 요청의 프롬프트 (번역인데 영어 레시피가 없으면 None)"""
+    if kind == 'recipe':
+        return recipe_prompt(recipe_name)
+    if kind == 'description':
+        return description_prompt(recipe_name)
+    if recipe_en and not recipe_en.startswith("<error>"):
+        return translation_prompt(recipe_en)
+    return None
+
+def pending_batch_requests(cursor):
+    """아직 채워지지 않은 (종류, ranking, 프롬프트) 목록"""
+    cursor.execute(
+        f"""
+        SELECT ranking, recipe_name, recipe_detail_en, recipe_detail_ko, description FROM {TABLE_NAME}
+        WHERE recipe_detail_ko IS NULL OR description IS NULL ORDER BY ranking
+        """
+    )
+    requests = []
+    for ranking, recipe_name, recipe_en, recipe_ko, description in cursor.fetchall():
+        if recipe_en is None or recipe_en.startswith("<error>"):
+            requests.append(('recipe', ranking, recipe_prompt(recipe_name)))
+        elif recipe_ko is None:
+            requests.append(('translation', ranking, translation_prompt(recipe_en)))
+        if description is None:
+            requests.append(('description', ranking, description_prompt(recipe_name)))
+    return requests
+
+def prepare_batch(jobs_path):
+    """남은 레시피/번역/설명 요청을 Bedrock 배치 추론 입력(JSONL)으로 작성"""
+    conn = connect_for_ingest(DB_FILE)
+    requests = pending_batch_requests(conn.cursor())
+    conn.close()
+
+    if not requests:
+        print("모든 레시피가 이미 채워져 있습니다. 작성할 배치 요청이 없습니다.")
+        return 0
+
+    with open(jobs_path, 'w', encoding='utf-8') as f:
+        for kind, ranking, prompt in requests:
+            record = {"recordId": batch_record_id(kind, ranking, prompt), "modelInput": _model_input(*prompt)}
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    counts = {kind: sum(1 for request in requests if request[0] == kind) for kind in BATCH_RESPONSE_PARSERS}
+    print(f"--- 배치 요청 {len(requests)}개를 '{jobs_path}'에 작성했습니다. {counts} ---")
+    return len(requests)
 
-# --- 4. 스크립트 실행 ---
+def ingest_batch_results(results_path, cache=None):
+    """배치 추론 결과(JSONL)를 recordId로 행에 맞춰 hot_recipes/정규화 테이블/검색 색인에 반영"""
+    conn = connect_for_ingest(DB_FILE)
+    cursor = conn.cursor()
+    create_structured_tables(cursor)
+    conn.commit()
+    rows = {
+        ranking: {'name': recipe_name, 'en': recipe_en, 'ko': recipe_ko, 'description': description}
+        for ranking, recipe_name, recipe_en, recipe_ko, description in cursor.execute(
+            f"SELECT ranking, recipe_name, recipe_detail_en, recipe_detail_ko, description FROM {TABLE_NAME}"
+        )
+    }
+
+    updates = {}
+    skipped = 0
+    with open(results_path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                kind, ranking, digest = record['recordId'].split(':')
+                ranking = int(ranking)
+                text = record['modelOutput']['content'][0]['text']
+            except (json.JSONDecodeError, KeyError, IndexError, TypeError, ValueError) as e:
+                print(f"  ⚠️  결과 줄을 건너뜁니다 ({e!r}): {line[:80]}")
+                skipped += 1
+                continue
+
+            row = rows.get(ranking)
+            prompt = expected_batch_prompt(kind, row['name'], row['en']) if row and kind in BATCH_RESPONSE_PARSERS else None
+            key = cache_key(MODEL_ID, *prompt) if prompt else None
+            if key is None or key[:16] != digest:
+                print(f"  ⚠️  '{record['recordId']}'는 현재 행과 맞지 않아 건너뜁니다. (랭킹/영어 레시피 변경)")
+                skipped += 1
+                continue
+
+            if cache is not None:
+                cache.put(key, text, MODEL_ID)
+            column = {'recipe': 'en', 'translation': 'ko', 'description': 'description'}[kind]
+            updates.setdefault(ranking, {})[column] = BATCH_RESPONSE_PARSERS[kind](text)
+
+    for ranking, values in sorted(updates.items()):
+        row = {**rows[ranking], **values}
+        save_enrichment(conn, ranking, row['en'], row['ko'], row['description'])
+        print(f"  ✅ '{row['name']}' (Rank {ranking}) 배치 결과 반영: {', '.join(sorted(values))}")
+    remaining = pending_batch_requests(cursor)
+    conn.close()
+
+    print(f"--- 배치 결과 반영 완료 (메뉴 {len(updates)}개, 건너뜀 {skipped}줄) ---")
+    if remaining:
+        print(f"남은 요청(번역 등) {len(remaining)}개가 있습니다. --batch-prepare를 다시 실행하세요.")
+    return len(updates)
+
+# --- 5. 스크립트 실행 ---
 if __name__ == "__main__":
-    enrich_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="hot_recipes 레시피 자동 채우기")
+    parser.add_argument("--reparse", action="store_true", help="Bedrock 호출 없이 저장된 XML을 정규화 테이블로 다시 파싱")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시에 처리할 메뉴 수")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE_PER_SEC, help="Bedrock 초당 최대 호출 수")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help="한 번에 몰아 보낼 수 있는 최대 호출 수")
+    parser.add_argument("--cache-dir", default=LLM_CACHE_DIR, help="Bedrock 응답 캐시 폴더")
+    parser.add_argument("--cache-max-mb", type=float, default=LLM_CACHE_MAX_BYTES / 1024 / 1024, help="응답 캐시 최대 크기(MB)")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 사용하지 않음 (항상 Bedrock 호출)")
+    parser.add_argument("--prune-cache", action="store_true", help="응답 캐시를 최대 크기 이하로 정리만 하고 종료")
+    parser.add_argument("--batch-prepare", metavar="JOBS_JSONL", help="남은 요청을 배치 추론 입력 파일(JSONL)로 작성하고 종료")
+    parser.add_argument("--batch-ingest", metavar="RESULTS_JSONL", help="배치 추론 결과 파일(JSONL)을 DB에 반영하고 종료")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else LLMCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+    if args.prune_cache:
+        removed, remaining = LLMCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024)).prune()
+        print(f"LLM 캐시 정리 완료: {removed}개 삭제, 남은 크기 {remaining / 1024 / 1024:.1f}MB")
+    elif args.batch_prepare:
+        prepare_batch(args.batch_prepare)
+    elif args.batch_ingest:
+        ingest_batch_results(args.batch_ingest, cache)
+    elif args.reparse:
+        reparse_existing_recipes()
+    elif enrich_database(args.concurrency, args.rate, args.burst, cache):
+        sys.exit(1)
\ No newline at end of file
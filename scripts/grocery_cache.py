@@ -0,0 +1,127 @@
+# scripts/grocery_cache.py
+# analyze_grocery_data용 정제된 판매 팩트 테이블(Parquet) 캐시
+#
+# - 캐시 키: 입력 CSV(sales, products, categories)의 내용 해시 + 정제 규칙
+#   (입력이 바뀌지 않으면 CSV 파싱/병합/필터링을 건너뜀)
+# - 저장 형식: Parquet (컬럼 단위, 청크마다 row group 1개)
+# - 읽기: 필요한 컬럼만 memory-map으로 row group 단위 스트리밍
+# - 새 캐시를 다 쓰면 입력 해시가 다른 이전 캐시 파일은 삭제 (캐시 폴더에는 최신 캐시 하나만)
+
+import glob
+import hashlib
+import json
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# 캐시 형식이나 정제 로직이 바뀌면 올려서 기존 캐시를 무효화
+CACHE_FORMAT_VERSION = 3
+HASH_INDEX_FILE = "file_hashes.json"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path, cache_dir):
+    """
+    파일 내용의 sha256 (크기/수정 시각이 같으면 이전에 계산한 해시를 재사용)
+    """
+    index_path = os.path.join(cache_dir, HASH_INDEX_FILE)
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        index = {}
+
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    entry = index.get(key)
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+
+    index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+    return digest.hexdigest()
+
+
+def fact_cache_path(cache_dir, input_paths, rules):
+    """입력 파일 해시 + 정제 규칙(rules)으로 캐시 파일 경로를 결정"""
+    key_source = json.dumps(
+        {
+            "version": CACHE_FORMAT_VERSION,
+            "inputs": {os.path.basename(path): file_sha256(path, cache_dir) for path in sorted(input_paths)},
+            "rules": rules,
+        },
+        sort_keys=True,
+    )
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()[:24]
+    return os.path.join(cache_dir, f"sales_fact_{key}.parquet")
+
+
+def prune_stale_fact_caches(current_path):
+    """current_path와 같은 폴더의 다른 sales_fact_*.parquet 삭제, 삭제한 파일 수 반환"""
+    removed = 0
+    for path in glob.glob(os.path.join(os.path.dirname(current_path), "sales_fact_*.parquet")):
+        if os.path.abspath(path) == os.path.abspath(current_path):
+            continue
+        try:
+            os.remove(path)
+            removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def iter_cached_chunks(path, columns=None, batch_size=500_000):
+    """캐시된 Parquet에서 필요한 컬럼만 memory-map으로 읽어 DataFrame 청크 단위로 반환"""
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+
+class FactCacheWriter:
+    """
+    청크를 받아 Parquet 캐시를 작성 (임시 파일에 쓰고 완료 시 원자적으로 교체)
+    중간에 실패하면 abort()로 임시 파일 삭제
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.writer = None
+        self.schema = None
+
+    def write(self, chunk):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self.writer is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.schema = table.schema
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd")
+        self.writer.write_table(table.cast(self.schema))
+
+    def close(self):
+        if self.writer is None:
+            return
+        self.writer.close()
+        os.replace(self.tmp_path, self.path)
+        removed = prune_stale_fact_caches(self.path)
+        if removed:
+            print(f"이전 입력의 Parquet 캐시 {removed}개를 삭제했습니다.")
+
+    def abort(self):
+        if self.writer is not None:
+            self.writer.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
@@ -0,0 +1,73 @@
+# scripts/grocery_duckdb.py
+# analyze_grocery_data의 (상품, 도시, 판매일) 부분 집계를 DuckDB SQL로 계산하는 선택 엔진
+#
+# - sales.csv(또는 정제된 Parquet 캐시)를 DuckDB가 직접 스캔: 필요한 컬럼만, 멀티스레드,
+#   중간 결과가 메모리 한도를 넘으면 디스크로 spill (pandas처럼 병합 프레임을 만들지 않음)
+# - CSV는 pandas 엔진과 같은 구간(헤더 다음 ~ end_offset, 완성된 줄까지)만 집계:
+#   구간의 행 수만큼만 LIMIT (삽입 순서 유지 -> 파일 앞쪽 행부터), 쓰는 중인 마지막 줄은 null_padding으로 오류 없이 건너뜀
+# - 결과 스키마/값은 pandas 엔진(fold_sales_chunks)과 동일
+#   (매출 센트 반올림도 numpy와 같은 banker's rounding = round_even)
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+import pandas as pd
+
+# CSV를 직접 읽을 때 컬럼 타입 (pandas 엔진의 CSV_SPECS dtype과 같게)
+SALES_CSV_TYPES = (
+    "{'SalesID': 'INTEGER', 'CustomerID': 'INTEGER', 'ProductID': 'INTEGER', "
+    "'Quantity': 'INTEGER', 'TotalPrice': 'FLOAT', 'SalesDate': 'VARCHAR'}"
+)
+CUSTOMERS_CSV_TYPES = "{'CustomerID': 'INTEGER', 'CityID': 'SMALLINT'}"
+
+SALES_CUBE_SQL = """
+SELECT
+    s.ProductID AS ProductID,
+    COALESCE(c.CityID, 0) AS CityID,
+    COALESCE(substr(s.SalesDate, 1, 10), '') AS SalesDay,
+    SUM(s.Quantity)::BIGINT AS TotalQuantity,
+    SUM(round_even(COALESCE(s.TotalPrice, 0)::DOUBLE * 100, 0))::BIGINT AS RevenueCents,
+    COUNT(s.SalesID)::BIGINT AS SalesCount,
+    MAX(s.SalesID) AS LastSalesID,
+    MAX(s.SalesDate) AS LastSalesDate
+FROM {sales} AS s
+JOIN food_products AS f ON f.ProductID = s.ProductID
+LEFT JOIN read_csv({customers}, header = true, types = {customer_types}) AS c ON c.CustomerID = s.CustomerID
+GROUP BY ALL
+"""
+
+
+def _sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def query_sales_cube(sales_path, customers_path, product_ids, parquet=False, threads=None, memory_limit=None, row_limit=None):
+    """
+    DuckDB로 음식 상품 판매를 (ProductID, CityID, SalesDay)별로 집계
+    parquet=True면 sales_path를 정제된 Parquet 캐시로 읽음
+    row_limit: CSV의 앞에서부터 이 행 수만 집계 (None이면 전체)
+    각 집계 단위의 마지막 SalesID/SalesDate(LastSalesID/LastSalesDate)를 포함한 DataFrame 반환
+    """
+    if parquet:
+        sales = f"read_parquet({_sql_string(sales_path)})"
+    else:
+        sales = f"read_csv({_sql_string(sales_path)}, header = true, null_padding = true, types = {SALES_CSV_TYPES})"
+        if row_limit is not None:
+            sales = f"(SELECT * FROM {sales} LIMIT {int(row_limit)})"
+
+    conn = duckdb.connect()
+    try:
+        if threads:
+            conn.execute(f"SET threads = {int(threads)}")
+        conn.execute("SET preserve_insertion_order = true")  # LIMIT이 파일 앞쪽 행을 고르도록
+        if memory_limit:
+            conn.execute(f"SET memory_limit = {_sql_string(memory_limit)}")
+        conn.register("food_products", pd.DataFrame({"ProductID": pd.Series(product_ids, dtype="int32")}))
+        return conn.execute(SALES_CUBE_SQL.format(
+            sales=sales, customers=_sql_string(customers_path), customer_types=CUSTOMERS_CSV_TYPES
+        )).df()
+    finally:
+        conn.close()
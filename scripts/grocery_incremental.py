@@ -0,0 +1,210 @@
+# scripts/grocery_incremental.py
+# analyze_grocery_data 증분 집계 상태 (서빙 DB와 분리된 별도 SQLite 파일)
+#
+# - grocery_city_totals: (ProductID, CityID)별 전체 기간 누적 (판매량, 매출액(센트), 판매 횟수)
+#   -> 크기는 상품 수 x 도시 수로 고정 (판매 이력이 길어져도 늘지 않음)
+# - grocery_recent_daily: 가장 긴 순위 기간(최근 90일)의 (ProductID, CityID, SalesDay)별 집계만 유지
+#   (매 실행마다 기간 밖의 날짜는 삭제)
+# - grocery_watermark: 마지막으로 반영한 SalesID/SalesDate와 sales.csv 바이트 위치
+#   다음 실행은 그 위치부터 새로 추가된 행만 읽어 누적값에 더함 (비용 = 새 행 수 + 고정 크기 상태)
+# - 재료명/지역/기간 단위 순위는 이 상태에서 바로 다시 계산
+#   (products/categories/customers 또는 음식 필터 규칙이 바뀌면 rules_key가 달라져 전체 재집계)
+# - API가 읽는 DB에는 쓰지 않음 (기본 위치: <data-dir>/.state/grocery_state.db)
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+STATE_DB_FILE = os.path.join('.state', 'grocery_state.db')
+TOTALS_TABLE = 'grocery_city_totals'
+DAILY_TABLE = 'grocery_recent_daily'
+WATERMARK_TABLE = 'grocery_watermark'
+WATERMARK_SOURCE = 'sales.csv'
+
+# 이전 버전이 서빙 DB에 만들던 상태 테이블 (게시할 때 정리)
+LEGACY_STATE_TABLES = ['grocery_daily_agg', 'grocery_watermark']
+
+# 이어 읽기 전, 워터마크 직전 바이트가 그대로인지(append만 되었는지) 확인하는 구간 크기
+TAIL_FINGERPRINT_BYTES = 4096
+
+MEASURE_COLUMNS = ['TotalQuantity', 'RevenueCents', 'SalesCount']
+KEY_DTYPES = {'ProductID': 'int32', 'CityID': 'int16', 'SalesDay': 'object'}
+MEASURE_DTYPES = {column: 'int64' for column in MEASURE_COLUMNS}
+
+STATE_TABLES_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {TOTALS_TABLE} (
+        ProductID INTEGER NOT NULL,
+        CityID INTEGER NOT NULL,
+        TotalQuantity INTEGER NOT NULL,
+        RevenueCents INTEGER NOT NULL,
+        SalesCount INTEGER NOT NULL,
+        PRIMARY KEY (ProductID, CityID)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {DAILY_TABLE} (
+        ProductID INTEGER NOT NULL,
+        CityID INTEGER NOT NULL,
+        SalesDay TEXT NOT NULL,
+        TotalQuantity INTEGER NOT NULL,
+        RevenueCents INTEGER NOT NULL,
+        SalesCount INTEGER NOT NULL,
+        PRIMARY KEY (ProductID, CityID, SalesDay)
+    ) WITHOUT ROWID
+    """,
+    f"CREATE INDEX IF NOT EXISTS idx_{DAILY_TABLE}_day ON {DAILY_TABLE} (SalesDay)",
+    f"""
+    CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+        source TEXT PRIMARY KEY,
+        last_sales_id INTEGER,
+        last_sales_date TEXT,
+        byte_offset INTEGER NOT NULL,
+        tail_sha256 TEXT NOT NULL,
+        rules_key TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+]
+
+
+def default_state_path(data_dir):
+    return os.path.join(data_dir, STATE_DB_FILE)
+
+
+def connect_state(path):
+    """상태 DB에 연결하고 테이블을 준비 (폴더가 없으면 생성)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    for ddl in STATE_TABLES_DDL:
+        conn.execute(ddl)
+    conn.commit()
+    return conn
+
+
+def rules_fingerprint(dimension_paths, rules):
+    """부분 집계 대상(음식 상품)을 결정하는 입력(products/categories 내용 + 필터 규칙)의 해시"""
+    digest = hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8"))
+    for path in sorted(dimension_paths):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def tail_fingerprint(path, offset):
+    """파일의 offset 직전 TAIL_FINGERPRINT_BYTES 바이트의 sha256"""
+    with open(path, "rb") as f:
+        start = max(0, offset - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def _read_frame(conn, table, keys):
+    columns = ", ".join(keys + MEASURE_COLUMNS)
+    frame = pd.read_sql(f"SELECT {columns} FROM {table}", conn)
+    return frame.astype({**{key: KEY_DTYPES[key] for key in keys}, **MEASURE_DTYPES}).set_index(keys)
+
+
+def load_state(path):
+    """저장된 (워터마크 dict, 도시별 누적 DataFrame, 최근 일별 DataFrame)을 반환 (없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    conn = connect_state(path)
+    try:
+        row = conn.execute(
+            f"""
+            SELECT last_sales_id, last_sales_date, byte_offset, tail_sha256, rules_key
+            FROM {WATERMARK_TABLE} WHERE source = ?
+            """,
+            (WATERMARK_SOURCE,)
+        ).fetchone()
+        if row is None:
+            return None
+        totals = _read_frame(conn, TOTALS_TABLE, ['ProductID', 'CityID'])
+        daily = _read_frame(conn, DAILY_TABLE, ['ProductID', 'CityID', 'SalesDay'])
+    finally:
+        conn.close()
+    watermark = dict(zip(('last_sales_id', 'last_sales_date', 'byte_offset', 'tail_sha256', 'rules_key'), row))
+    return watermark, totals, daily
+
+
+def resume_offset(sales_path, watermark, rules_key):
+    """
+    워터마크에서 이어 읽을 수 있으면 바이트 위치를, 전체 재집계가 필요하면 None을 반환
+    (규칙/차원 테이블 변경, 파일이 잘렸거나 앞부분이 수정된 경우)
+    """
+    if watermark['rules_key'] != rules_key:
+        print("⚠️ products/categories 또는 음식 필터 규칙이 바뀌어 전체 재집계합니다.")
+        return None
+    offset = watermark['byte_offset']
+    if os.path.getsize(sales_path) < offset or tail_fingerprint(sales_path, offset) != watermark['tail_sha256']:
+        print("⚠️ sales.csv가 append 이외의 방식으로 변경되어 전체 재집계합니다.")
+        return None
+    return offset
+
+
+def csv_end_offset(path):
+    """지금까지 완성된 마지막 줄 끝의 바이트 위치 (쓰는 중인 마지막 줄은 다음 실행에서 읽음)"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = max(0, size - TAIL_FINGERPRINT_BYTES)
+        f.seek(start)
+        tail = f.read(size - start)
+    last_newline = tail.rfind(b"\n")
+    return size if last_newline == -1 else start + last_newline + 1
+
+
+def _upsert_rows(cursor, table, keys, frame):
+    """(키 -> 측정값) 부분 집계를 기존 누적값에 더함"""
+    columns = keys + MEASURE_COLUMNS
+    rows = frame.reset_index()[columns].astype(object)  # numpy 정수 -> 파이썬 int (sqlite3 바인딩)
+    cursor.executemany(
+        f"""
+        INSERT INTO {table} ({", ".join(columns)})
+        VALUES ({", ".join("?" for _ in columns)})
+        ON CONFLICT ({", ".join(keys)}) DO UPDATE SET
+            TotalQuantity = TotalQuantity + excluded.TotalQuantity,
+            RevenueCents = RevenueCents + excluded.RevenueCents,
+            SalesCount = SalesCount + excluded.SalesCount
+        """,
+        rows.itertuples(index=False, name=None)
+    )
+
+
+def save_state(path, totals, daily, progress, byte_offset, tail_sha256, rules_key, replace=True, keep_from_day=None):
+    """
+    누적 상태와 워터마크를 한 트랜잭션으로 저장
+    replace=True: 전체 재집계 결과로 교체 / False: 증분(totals, daily)만 기존 누적값에 더함
+    keep_from_day: 이 날짜('YYYY-MM-DD') 이전의 일별 행은 삭제 (None이면 일별 행을 모두 삭제)
+    """
+    conn = connect_state(path)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        if replace:
+            cursor.execute(f"DELETE FROM {TOTALS_TABLE}")
+            cursor.execute(f"DELETE FROM {DAILY_TABLE}")
+        _upsert_rows(cursor, TOTALS_TABLE, ['ProductID', 'CityID'], totals)
+        _upsert_rows(cursor, DAILY_TABLE, ['ProductID', 'CityID', 'SalesDay'], daily)
+        cursor.execute(f"DELETE FROM {DAILY_TABLE} WHERE SalesDay < ?", (keep_from_day or '9999-99-99',))
+        cursor.execute(
+            f"""
+            INSERT OR REPLACE INTO {WATERMARK_TABLE}
+                (source, last_sales_id, last_sales_date, byte_offset, tail_sha256, rules_key, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                WATERMARK_SOURCE, progress['last_sales_id'], progress['last_sales_date'],
+                byte_offset, tail_sha256, rules_key, datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            )
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,90 @@
+# scripts/llm_cache.py
+# Bedrock 응답 텍스트의 디스크 캐시 (get_menus_recipes의 레시피/번역/설명 생성용)
+#
+# - 캐시 키: (모델 ID, system 프롬프트, user 프롬프트, max_tokens)의 sha256
+#   -> 같은 요리를 같은 프롬프트로 다시 요청하면 Bedrock을 호출하지 않음
+#   (랭킹 갱신으로 hot_recipes가 새로 만들어져도 이미 비용을 낸 요리는 캐시에서 채움)
+# - 저장 형식: <cache_dir>/<키 앞 2글자>/<키>.json (항목 하나 = 파일 하나, 원자적 교체)
+# - 크기 제한: 전체 크기가 max_bytes를 넘으면 가장 오래 사용하지 않은(mtime) 항목부터 삭제
+#   (캐시 적중 시 mtime을 갱신)
+
+import hashlib
+import json
+import os
+import tempfile
+from datetime import datetime
+
+LLM_CACHE_DIR = 'data/llm_cache'
+LLM_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+def cache_key(model_id, system_prompt, user_prompt, max_tokens):
+    key_source = json.dumps([model_id, system_prompt, user_prompt, max_tokens], ensure_ascii=False)
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, cache_dir=LLM_CACHE_DIR, max_bytes=LLM_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """캐시된 응답 텍스트 (없으면 None)"""
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = json.load(f)['text']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self.misses += 1
+            return None
+        os.utime(path)  # 최근 사용 시각 갱신 (prune 순서)
+        self.hits += 1
+        return text
+
+    def put(self, key, text, model_id):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 같은 폴더에 고유한 임시 파일을 만들어 쓴 뒤 교체 (같은 프로세스의 여러 스레드가 동시에 써도 충돌 없음)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'model_id': model_id,
+                    'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'text': text,
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def prune(self, max_bytes=None):
+        """전체 크기가 max_bytes 이하가 될 때까지 오래 사용하지 않은 항목부터 삭제, (삭제 수, 남은 바이트) 반환"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed, total
@@ -1,12 +1,22 @@
 import pandas as pd
 import re
 import os
-from collections import Counter
+import sys
+import argparse
 
-# --- 1. 설정 ---
-# [경로 수정] CSV 파일이 'data' 폴더 안에 있다고 가정
-CSV_FILE = 'data/reddit_koreanfood.csv'
+# n-gram 계산은 scripts/ngram_counter.py를 공유하므로 'python -m scripts.n_grams'로 실행해야 함
+try:
+    from scripts.ngram_counter import POST_CHUNK_SIZE, iter_post_texts, count_ngrams_streaming
+    from scripts.reddit_store import resolve_corpus_path
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.n_grams\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
 
+# --- 1. 설정 ---
 
 BASE_STOPWORDS_SET = {
     'i', 'me', 'my', 'myself', 'we', 'our', 'ours', 'ourselves', 'you', 'your',
@@ -42,80 +52,88 @@ print(f"--- 총 {len(STOPWORDS_SET)}개의 고유한 불용어를 사용합니
 
 
 # --- 2. N-Gram 분석 및 출력 함수 ---
-def analyze_ngrams_for_comparison(csv_path):
+# n -> (출력 제목, 컬럼명)
+NGRAM_LABELS = {
+    1: ("1-gram (단일 단어)", "Unigram"),
+    2: ("2-gram (2단어 구문)", "Bigram"),
+    3: ("3-gram (3단어 구문)", "Trigram"),
+    4: ("4-gram (4단어 구문)", "4-gram"),
+}
+
+def analyze_ngrams_for_comparison(csv_path, chunksize=POST_CHUNK_SIZE, workers=1, epsilon=None):
     """
-    CSV 파일을 읽어 1~5-gram을 "순수 발견" 방식으로 분석하고,
+    CSV 파일을 글 chunksize개씩 스트리밍하며 1~4-gram을 "순수 발견" 방식으로 분석하고,
     Top 15 결과를 각각 print
+    (글마다 한 번 토큰화해서 모든 n-gram을 한 번에 셈 -> scripts/ngram_counter.py)
+    epsilon을 지정하면 근사 Top-K (빈도 오차 <= epsilon * 전체 구문 수, 메모리는 1/epsilon개)
     """
+    mode = f"근사 (epsilon={epsilon})" if epsilon else "정확"
+    print(f"'{csv_path}' 스트리밍 분석을 시작합니다... (청크 {chunksize}개 글, 워커 {workers}개, {mode})")
+    
+    # 구문에 불용어, 1글자 단어, 숫자가 '하나라도' 포함되면 제외
     try:
-        df = pd.read_csv(csv_path)
+        ngram_counts = count_ngrams_streaming(
+            iter_post_texts(csv_path, chunksize), orders=tuple(NGRAM_LABELS), stopwords=STOPWORDS_SET,
+            workers=workers, epsilon=epsilon
+        )
     except FileNotFoundError:
         print(f"오류: '{csv_path}' 파일을 찾을 수 없습니다.")
         print("스크립트가 루트 폴더에서 실행되고 있는지, 'data/reddit_koreanfood.csv' 경로가 맞는지 확인하세요.")
-        return
-
-    print(f"'{csv_path}' 로드 완료. 텍스트 정제를 시작합니다...")
-    
-    df['content'] = df['content'].fillna('')
-    df['title'] = df['title'].fillna('')
-    all_text = ' '.join(df['title'].str.lower() + ' ' + df['content'].str.lower())
-    
-    # --- 공통 필터링 함수 ---
-    def filter_ngrams(ngrams_list):
-        filtered_ngrams = []
-        for phrase in ngrams_list:
-            words_in_phrase = phrase.split()
-            
-            # 조건 1: 구문에 불용어, 1글자 단어, 숫자가 '하나라도' 포함되면 제외
-            if any(w in STOPWORDS_SET or len(w) < 2 or w.isdigit() for w in words_in_phrase):
-                continue
-            
-            filtered_ngrams.append(phrase)
-        return filtered_ngrams
+        return None
 
-    # --- 1-gram (Unigram) 분석 ---
-    unigrams = re.findall(r'\b(\w+)\b', all_text)
-    filtered_unigrams = filter_ngrams(unigrams)
-    unigram_counts = Counter(filtered_unigrams)
-    
-    print("\n--- [인사이트] 1-gram (단일 단어) Top 15 ---")
-    df_unigram = pd.DataFrame(unigram_counts.most_common(15), columns=['Unigram', 'Frequency'])
-    print(df_unigram.to_markdown(index=False, numalign="left", stralign="left"))
+    for n, (title, column) in NGRAM_LABELS.items():
+        print(f"\n--- [인사이트] {title} Top 15 ---")
+        if epsilon:
+            print(f"(빈도는 하한값, 실제 빈도와의 차이 최대 {ngram_counts[n].max_error:,} / 추적 구문 {len(ngram_counts[n]):,}개)")
+        df_ngram = pd.DataFrame(ngram_counts[n].most_common(15), columns=[column, 'Frequency'])
+        print(df_ngram.to_markdown(index=False, numalign="left", stralign="left"))
+    return ngram_counts
 
-    # --- 2-gram (Bigram) 분석 ---
-    bigrams = re.findall(r'\b(\w+ \w+)\b', all_text)
-    filtered_bigrams = filter_ngrams(bigrams)
-    bigram_counts = Counter(filtered_bigrams)
-    
-    print("\n--- [인사이트] 2-gram (2단어 구문) Top 15 ---")
-    df_bigram = pd.DataFrame(bigram_counts.most_common(15), columns=['Bigram', 'Frequency'])
-    print(df_bigram.to_markdown(index=False, numalign="left", stralign="left"))
 
-    # --- 3-gram (Trigram) 분석 ---
-    trigrams = re.findall(r'\b(\w+ \w+ \w+)\b', all_text)
-    filtered_trigrams = filter_ngrams(trigrams)
-    trigram_counts = Counter(filtered_trigrams)
-    
-    print("\n--- [인사이트] 3-gram (3단어 구문) Top 15 ---")
-    df_trigram = pd.DataFrame(trigram_counts.most_common(15), columns=['Trigram', 'Frequency'])
-    print(df_trigram.to_markdown(index=False, numalign="left", stralign="left"))
+def compare_with_exact(csv_path, epsilon, chunksize=POST_CHUNK_SIZE, workers=1, top_n=15):
+    """
+    근사 모드의 Top N을 정확한 빈도와 비교
+    - 정확한 Top N 중 근사 Top N에 포함된 비율
+    - 정확한 Top N 구문의 (실제 - 추정) 빈도가 보장된 오차 이내인지
+    오차 보장이 깨지면 False 반환
+    """
+    exact = analyze_ngrams_for_comparison(csv_path, chunksize, workers)
+    approx = analyze_ngrams_for_comparison(csv_path, chunksize, workers, epsilon)
+    if exact is None or approx is None:
+        return False
 
-    # --- 4-gram (4-gram) 분석 ---
-    four_grams = re.findall(r'\b(\w+ \w+ \w+ \w+)\b', all_text)
-    filtered_4grams = filter_ngrams(four_grams)
-    four_gram_counts = Counter(filtered_4grams)
-    
-    print("\n--- [인사이트] 4-gram (4단어 구문) Top 15 ---")
-    df_4gram = pd.DataFrame(four_gram_counts.most_common(15), columns=['4-gram', 'Frequency'])
-    print(df_4gram.to_markdown(index=False, numalign="left", stralign="left"))
+    print(f"\n--- [검증] 근사 Top {top_n} vs 정확한 Top {top_n} (epsilon={epsilon}) ---")
+    ok = True
+    for n, (title, _) in NGRAM_LABELS.items():
+        exact_top = exact[n].most_common(top_n)
+        approx_keys = {phrase for phrase, _ in approx[n].most_common(top_n)}
+        overlap = sum(phrase in approx_keys for phrase, _ in exact_top)
+        worst = max((count - approx[n].counts.get(phrase, 0) for phrase, count in exact_top), default=0)
+        within_bound = worst <= approx[n].max_error
+        ok &= within_bound
+        print(
+            f"{title}: 일치 {overlap}/{len(exact_top)}, 최대 빈도 오차 {worst:,} "
+            f"(보장 {approx[n].max_error:,}) {'✅' if within_bound else '❌'}"
+        )
+    return ok
 
 
 # --- 3. 스크립트 실행 ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reddit 게시글 1~4-gram 빈도 분석")
+    parser.add_argument("--chunksize", type=int, default=POST_CHUNK_SIZE, help="한 번에 읽을 글 수")
+    parser.add_argument("--workers", type=int, default=1, help="n-gram 계산 프로세스 수")
+    parser.add_argument("--approx-epsilon", type=float, default=None, help="근사 Top-K 모드 빈도 오차 비율 (예: 0.0001)")
+    parser.add_argument("--compare-exact", action="store_true", help="근사 모드 Top 15를 정확한 빈도와 비교 검증")
+    parser.add_argument("--corpus", default=None, help="읽을 글 저장소(.db) 또는 CSV (기본: data/ 아래 저장소, 없으면 CSV)")
+    args = parser.parse_args()
     
-    # 스크립트 파일 위치 기준으로 CSV 파일 경로 설정
+    # 스크립트 파일 위치 기준으로 글 저장소(없으면 CSV) 경로 설정
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.dirname(script_dir)
-    csv_file_path = os.path.join(project_root, CSV_FILE)
+    csv_file_path = args.corpus or resolve_corpus_path(project_root)
 
-    analyze_ngrams_for_comparison(csv_file_path)
\ No newline at end of file
+    if args.compare_exact:
+        sys.exit(0 if compare_with_exact(csv_file_path, args.approx_epsilon or 1e-4, args.chunksize, args.workers) else 1)
+    if analyze_ngrams_for_comparison(csv_file_path, args.chunksize, args.workers, args.approx_epsilon) is None:
+        sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,145 @@
+# scripts/ngram_counter.py
+# Reddit 게시글 n-gram 빈도 계산 (n_grams.py, extract_reddit_menus.py 공통)
+#
+# - 글마다 한 번만 토큰화해서 유효 단어 구간을 만들고, 그 구간에서 1~N-gram을 모두 셈
+# - 불용어/1글자/숫자 검사는 구문마다가 아니라 토큰마다 한 번
+# - 겹치는 n-gram도 모두 셈 (re.findall(r'\b(\w+ \w+)\b')는 매칭된 부분을 소비해서
+#   "a b c"에서 "b c"를 놓침)
+# - n-gram은 한 칸 공백으로 이어진 단어들만 (구두점/줄바꿈/글 경계를 넘지 않음)
+# - 스트리밍 모드: CSV를 글 chunksize개씩 읽어 청크별로 세고 Counter를 병합
+#   (전체 본문 문자열/구간 리스트를 만들지 않으므로 메모리는 청크 크기 + 고유 구문 수에 비례)
+# - 근사 모드(epsilon 지정): n마다 heavy hitters 요약(Misra-Gries) 하나에 청크별 빈도를 병합
+#   (메모리는 고유 구문 수와 무관하게 ceil(1/epsilon)개, 빈도 오차는 epsilon * 전체 구문 수 이하)
+
+import heapq
+import math
+import re
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from scripts.reddit_store import iter_post_frames
+
+# 스트리밍 모드에서 한 번에 읽는 글 수
+POST_CHUNK_SIZE = 2000
+
+# 한 칸 공백으로 이어진 단어들의 최대 구간 (이 구간 안에서만 n-gram을 만듦)
+WORD_RUN_PATTERN = re.compile(r'\w+(?: \w+)*')
+
+
+def is_valid_token(word, stopwords):
+    """n-gram에 들어갈 수 있는 단어인지 (불용어, 1글자 단어, 숫자 제외)"""
+    return not (word in stopwords or len(word) < 2 or word.isdigit())
+
+
+def valid_runs(texts, stopwords):
+    """글마다 한 번 토큰화해서, 유효하지 않은 단어로 끊은 "연속된 유효 단어" 리스트들을 반환"""
+    runs = []
+    for text in texts:
+        for run in WORD_RUN_PATTERN.findall(text.lower()):
+            current = []
+            for word in run.split(' '):
+                if is_valid_token(word, stopwords):
+                    current.append(word)
+                elif current:
+                    runs.append(current)
+                    current = []
+            if current:
+                runs.append(current)
+    return runs
+
+
+def count_ngrams(texts, orders=(1, 2, 3, 4), stopwords=frozenset()):
+    """
+    texts(글 단위 문자열)에서 orders에 있는 모든 n에 대해 n-gram 빈도를 계산
+    구문에 유효하지 않은 단어가 하나라도 있으면 제외 ({n: Counter(구문 -> 빈도)} 반환)
+    연속 구간마다 zip으로 겹치는 n-gram을 만들어 Counter(C 구현)로 한 번에 셈
+    """
+    runs = valid_runs(texts, stopwords)
+    counts = {}
+    for n in orders:
+        ngrams = chain.from_iterable(zip(*(run[i:] for i in range(n))) for run in runs if len(run) >= n)
+        counts[n] = Counter(map(' '.join, ngrams))
+    return counts
+
+
+class HeavyHitters:
+    """
+    병합 가능한 Misra-Gries 요약 (Space-Saving과 같은 보장을 주는 heavy hitters 요약)
+    - 청크별 정확한 빈도(Counter)를 더한 뒤 capacity개를 넘으면
+      (capacity + 1)번째로 큰 빈도만큼 모두 빼고 0 이하인 구문을 버림
+    - 남은 값은 실제 빈도의 하한이며, 실제 빈도 - 추정 <= offset(뺀 값의 합) <= total / (capacity + 1)
+      -> capacity = ceil(1 / epsilon)이면 오차 <= epsilon * total
+    - 빈도가 epsilon * total보다 큰 구문은 반드시 요약에 남음
+    청크 단위로 한 번에 줄이므로 구문마다 힙을 갱신하는 방식보다 빠름
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = Counter()
+        self.total = 0
+        self.offset = 0
+
+    @classmethod
+    def from_epsilon(cls, epsilon):
+        return cls(math.ceil(1 / epsilon))
+
+    def update(self, counter):
+        """청크별 정확한 빈도(Counter)를 반영"""
+        self.counts.update(counter)
+        self.total += sum(counter.values())
+        if len(self.counts) > self.capacity:
+            cutoff = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+            self.offset += cutoff
+            self.counts = Counter({key: count - cutoff for key, count in self.counts.items() if count > cutoff})
+
+    def most_common(self, n=None):
+        return self.counts.most_common(n)
+
+    def __len__(self):
+        return len(self.counts)
+
+    @property
+    def max_error(self):
+        """추정 빈도가 실제보다 작을 수 있는 최대값"""
+        return self.offset
+
+
+def iter_post_texts(csv_path, chunksize=POST_CHUNK_SIZE):
+    """Reddit CSV(또는 글 저장소 .db)를 chunksize개 글씩 읽어 글별 (제목 + 본문) 문자열 리스트로 반환"""
+    for chunk in iter_post_frames(csv_path, ['title', 'content'], chunksize):
+        yield (chunk['title'].fillna('') + ' ' + chunk['content'].fillna('')).tolist()
+
+
+def merge_ngram_counts(totals, counts):
+    """청크별 n-gram 빈도를 누적 결과에 더함"""
+    for n, counter in counts.items():
+        totals[n].update(counter)
+
+
+def count_ngrams_streaming(text_chunks, orders=(1, 2, 3, 4), stopwords=frozenset(), workers=1, epsilon=None):
+    """
+    글 청크들을 차례로 세어 병합 (workers > 1이면 프로세스 풀에서 청크별로 세고 메인에서 병합)
+    동시에 처리 중인 청크는 workers * 2개로 제한하고, 제출 순서대로 병합해서
+    결과(빈도가 같은 구문의 most_common 순서 포함)가 단일 프로세스와 동일
+    epsilon을 지정하면 n마다 정확한 Counter 대신 HeavyHitters 요약으로 병합 (근사 Top-K)
+    """
+    if epsilon:
+        totals = {n: HeavyHitters.from_epsilon(epsilon) for n in orders}
+    else:
+        totals = {n: Counter() for n in orders}
+    stopwords = frozenset(stopwords)
+    if workers <= 1:
+        for texts in text_chunks:
+            merge_ngram_counts(totals, count_ngrams(texts, orders, stopwords))
+        return totals
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for texts in text_chunks:
+            pending.append(pool.submit(count_ngrams, texts, orders, stopwords))
+            if len(pending) >= workers * 2:
+                merge_ngram_counts(totals, pending.popleft().result())
+        while pending:
+            merge_ngram_counts(totals, pending.popleft().result())
+    return totals
@@ -0,0 +1,264 @@
+# scripts/pipeline.py
+# 오프라인 데이터 스크립트를 DAG로 묶어 실행하는 파이프라인 러너
+#
+# - 단계마다 (코드 파일 + 입력 파일 내용 + 인자 + 선행 단계 지문 + 출력 존재 여부)의 sha256 지문을 계산하고,
+#   마지막 성공 실행과 지문이 같으면 건너뜀 (입력이 그대로면 결과도 그대로)
+#   출력(파일 / DB 테이블)이 지워졌으면 지문이 달라져 다시 실행
+# - 선행 단계가 모두 끝난 단계는 바로 시작 -> Reddit 줄기와 grocery 줄기는 병렬로 실행
+# - 단계마다 별도 프로세스(python -m ...)로 실행하고 출력은 로그 파일에, 소요 시간은 요약 표로 출력
+# - Reddit 수집(save_reddit_data)은 외부 API가 입력이라 항상 실행하지만,
+#   새 글이 없으면 수집 결과(CSV/글 저장소) 지문이 같아 다음 단계부터 건너뜀
+#   (트렌드 감쇠는 모든 점수에 같은 값을 곱하므로 새 글이 없으면 순위도 그대로)
+#
+# 실행: python -m scripts.pipeline [--only extract_menus ...] [--force] [--dry-run] [--workers 2]
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+try:
+    from scripts.grocery_cache import file_sha256
+except ModuleNotFoundError:
+    print("---------------------------------------------------------------")
+    print("오류: 이 스크립트는 모듈로 실행해야 합니다.")
+    print("프로젝트 루트(kook_backend) 폴더에서")
+    print("\n  python -m scripts.pipeline\n")
+    print("---------------------------------------------------------------")
+    sys.exit(1)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.path.join(PROJECT_ROOT, 'data', '.pipeline')
+STATE_FILE = os.path.join(STATE_DIR, 'state.json')
+LOG_DIR = os.path.join(STATE_DIR, 'logs')
+
+
+class Stage:
+    """
+    파이프라인 단계 하나
+    module: python -m으로 실행할 모듈, code: 지문에 넣을 코드 파일, inputs: 지문에 넣을 입력 파일/폴더
+    outputs: 단계가 만드는 파일 또는 (DB 파일, 테이블) (존재 여부를 지문에 넣음)
+    deps: 선행 단계 이름, always: 지문과 상관없이 항상 실행 (외부 API 입력)
+    """
+
+    def __init__(self, name, module, code=(), inputs=(), outputs=(), deps=(), args=(), always=False):
+        self.name = name
+        self.module = module
+        self.code = list(code)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.deps = list(deps)
+        self.args = list(args)
+        self.always = always
+
+    def command(self):
+        return ' '.join(['python -m', self.module, *self.args])
+
+
+def _scripts(*names):
+    return [os.path.join('scripts', f"{name}.py") for name in names]
+
+
+def _tables(*names, db='kfood_recipes.db'):
+    return [(db, name) for name in names]
+
+
+STAGES = [
+    Stage(
+        'reddit_ingest', 'scripts.save_reddit_data',
+        code=_scripts('save_reddit_data', 'reddit_store'),
+        always=True,
+    ),
+    Stage(
+        'extract_menus', 'scripts.extract_reddit_menus',
+        code=_scripts('extract_reddit_menus', 'dish_lexicon', 'dish_trends', 'ngram_counter', 'reddit_store',
+                      'db_publish', 'recipe_tables'),
+        inputs=['data/reddit_koreanfood.csv', 'data/reddit_corpus.db', 'data/dish_lexicon_learned.json'],
+        outputs=_tables('hot_recipes'),
+        deps=['reddit_ingest'],
+    ),
+    Stage(
+        'enrich_recipes', 'scripts.get_menus_recipes',
+        code=_scripts('get_menus_recipes', 'llm_cache', 'recipe_tables', 'db_publish') + ['app/services/recipe_parser.py'],
+        outputs=_tables('recipe_summaries', 'recipe_ingredients', 'recipe_steps'),
+        deps=['extract_menus'],
+    ),
+    Stage(
+        'grocery', 'scripts.analyze_grocery_data',
+        code=_scripts('analyze_grocery_data', 'grocery_cache', 'grocery_incremental', 'grocery_duckdb', 'csv_ranges',
+                      'db_publish'),
+        inputs=['data/grocery_data'],
+        outputs=_tables('grocery_sales', 'grocery_rankings') + ['data/grocery_data/.state/grocery_state.db'],
+    ),
+]
+
+
+def _input_files(path):
+    """입력 경로(파일 또는 폴더)의 파일 목록 (폴더는 숨김 파일/폴더 제외, 정렬), 없으면 빈 목록"""
+    full_path = os.path.join(PROJECT_ROOT, path)
+    if os.path.isfile(full_path):
+        return [full_path]
+    files = []
+    for root, dirs, names in os.walk(full_path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        files.extend(os.path.join(root, name) for name in sorted(names) if not name.startswith('.'))
+    return files
+
+
+def output_exists(output):
+    """출력 파일, 또는 (DB 파일, 테이블)의 테이블이 있는지"""
+    if isinstance(output, str):
+        return os.path.exists(os.path.join(PROJECT_ROOT, output))
+    db_path, table = output
+    db_path = os.path.join(PROJECT_ROOT, db_path)
+    if not os.path.exists(db_path):
+        return False
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (table,)).fetchone() is not None
+    except sqlite3.Error:
+        return False
+    finally:
+        conn.close()
+
+
+def stage_fingerprint(stage, dep_fingerprints):
+    """
+    코드 + 입력 파일 내용 + 인자 + 선행 단계 지문 + 출력 존재 여부의 sha256 (파일 해시는 크기/수정 시각이 같으면 재사용)
+    출력은 내용이 아닌 존재 여부만 넣음 (같은 DB를 여러 단계가 갱신하므로 내용을 넣으면 서로를 다시 실행시킴)
+    """
+    outputs = [[output, output_exists(output)] for output in stage.outputs]
+    digest = hashlib.sha256(json.dumps([stage.module, stage.args, dep_fingerprints, outputs]).encode('utf-8'))
+    for path in stage.code + stage.inputs:
+        for file_path in _input_files(path):
+            digest.update(os.path.relpath(file_path, PROJECT_ROOT).encode('utf-8'))
+            digest.update(file_sha256(file_path, STATE_DIR).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_state():
+    try:
+        with open(STATE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = STATE_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def run_stage(stage):
+    """(스레드) 단계를 별도 프로세스로 실행, (종료 코드, 소요 시간, 로그 경로) 반환"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{stage.name}.log")
+    started = time.perf_counter()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        returncode = subprocess.run(
+            [sys.executable, '-m', stage.module, *stage.args],
+            cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT
+        ).returncode
+    return returncode, time.perf_counter() - started, log_path
+
+
+def _print_log_tail(log_path, lines=15):
+    with open(log_path, encoding='utf-8', errors='replace') as f:
+        tail = f.readlines()[-lines:]
+    print("".join(f"    | {line}" for line in tail).rstrip())
+
+
+def run_pipeline(stages, only=None, force=False, dry_run=False, workers=2):
+    """
+    선행 단계가 끝난 단계부터 workers개까지 동시에 실행
+    only: 실행할 단계 이름 (선행 단계는 지문 계산에만 사용), force: 지문이 같아도 실행
+    단계 결과 dict(이름 -> (상태, 소요 시간)) 반환, 실패한 단계의 후속 단계는 'blocked'
+    """
+    by_name = {stage.name: stage for stage in stages}
+    state = load_state()
+    results, fingerprints = {}, {}
+    remaining = [stage.name for stage in stages]
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while remaining or running:
+            for name in list(remaining):
+                stage = by_name[name]
+                if any(dep in remaining or dep in running.values() for dep in stage.deps):
+                    continue
+                remaining.remove(name)
+
+                if any(results[dep][0] in ('failed', 'blocked') for dep in stage.deps):
+                    results[name] = ('blocked', 0.0)
+                    print(f"⛔ [{name}] 선행 단계 실패로 건너뜁니다.")
+                    continue
+                if only and name not in only:
+                    fingerprints[name] = state.get(name, {}).get('fingerprint', '')
+                    results[name] = ('not selected', 0.0)
+                    continue
+
+                fingerprint = stage_fingerprint(stage, [fingerprints[dep] for dep in stage.deps])
+                fingerprints[name] = fingerprint
+                if not (force or stage.always) and state.get(name, {}).get('fingerprint') == fingerprint:
+                    results[name] = ('cached', 0.0)
+                    print(f"⏭️  [{name}] 입력/코드가 그대로라 건너뜁니다. (지문 {fingerprint[:12]})")
+                    continue
+                if dry_run:
+                    results[name] = ('would run', 0.0)
+                    print(f"📝 [{name}] 실행 예정 ({stage.command()})")
+                    continue
+
+                print(f"▶️  [{name}] 시작 ({stage.command()})")
+                running[pool.submit(run_stage, stage)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, seconds, log_path = future.result()
+                if returncode == 0:
+                    results[name] = ('ran', seconds)
+                    # 단계가 만든 출력이 다음 단계 입력이므로, 실행 후 지문을 다시 계산해 저장
+                    stage = by_name[name]
+                    fingerprints[name] = stage_fingerprint(stage, [fingerprints[dep] for dep in stage.deps])
+                    state[name] = {
+                        'fingerprint': fingerprints[name],
+                        'seconds': round(seconds, 2),
+                        'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    }
+                    save_state(state)
+                    print(f"✅ [{name}] 완료 ({seconds:.1f}s, 로그: {log_path})")
+                else:
+                    results[name] = ('failed', seconds)
+                    print(f"❌ [{name}] 실패 (종료 코드 {returncode}, {seconds:.1f}s, 로그: {log_path})")
+                    _print_log_tail(log_path)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="오프라인 데이터 파이프라인 (Reddit 트렌드 + grocery 순위) 실행")
+    parser.add_argument("--only", nargs="+", choices=[stage.name for stage in STAGES], help="이 단계들만 실행")
+    parser.add_argument("--force", action="store_true", help="지문이 같아도 모든 단계를 실행")
+    parser.add_argument("--dry-run", action="store_true", help="실행하지 않고 실행할 단계만 출력")
+    parser.add_argument("--workers", type=int, default=2, help="동시에 실행할 단계 수")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = run_pipeline(STAGES, set(args.only or []), args.force, args.dry_run, args.workers)
+
+    print(f"\n--- 파이프라인 결과 (전체 {time.perf_counter() - started:.1f}s) ---")
+    print(f"{'단계':<18}{'상태':<14}{'소요(s)':>10}")
+    for stage in STAGES:
+        status, seconds = results[stage.name]
+        print(f"{stage.name:<18}{status:<14}{seconds:>10.1f}")
+    sys.exit(1 if any(status in ('failed', 'blocked') for status, _ in results.values()) else 0)
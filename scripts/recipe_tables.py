@@ -0,0 +1,193 @@
+# scripts/recipe_tables.py
+# hot_recipes의 XML 레시피를 정규화한 테이블들 (수집 스크립트에서 공통으로 사용)
+
+import sqlite3
+
+from app.services.recipe_parser import parse_recipe_xml, ingredient_terms, recipe_xml_to_text
+
+STRUCTURED_TABLES = ['recipe_summaries', 'recipe_ingredients', 'recipe_steps', 'recipe_extras', 'ingredient_index']
+
+STRUCTURED_TABLES_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS recipe_summaries (
+        ranking INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        title TEXT,
+        message TEXT,
+        total_time INTEGER,
+        PRIMARY KEY (ranking, language)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recipe_ingredients (
+        ranking INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        quantity TEXT,
+        raw TEXT NOT NULL,
+        PRIMARY KEY (ranking, language, position)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recipe_steps (
+        ranking INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        step_no INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        minutes INTEGER,
+        description TEXT,
+        PRIMARY KEY (ranking, language, step_no)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS recipe_extras (
+        ranking INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        PRIMARY KEY (ranking, language, kind, position)
+    ) WITHOUT ROWID
+    """,
+    # 정규화된 재료 term -> 레시피 역색인 (term 접두 PK로 조회)
+    """
+    CREATE TABLE IF NOT EXISTS ingredient_index (
+        term TEXT NOT NULL,
+        ranking INTEGER NOT NULL,
+        language TEXT NOT NULL,
+        weight REAL NOT NULL,
+        PRIMARY KEY (term, ranking, language)
+    ) WITHOUT ROWID
+    """,
+]
+
+
+def create_structured_tables(cursor):
+    """정규화 레시피 테이블이 없으면 생성"""
+    for ddl in STRUCTURED_TABLES_DDL:
+        cursor.execute(ddl)
+
+
+def clear_structured_recipes(cursor, ranking=None, language=None):
+    """정규화 레시피 행 삭제 (ranking/language 미지정 시 전체 삭제)"""
+    for table in STRUCTURED_TABLES:
+        if ranking is None:
+            cursor.execute(f"DELETE FROM {table}")
+        elif language is None:
+            cursor.execute(f"DELETE FROM {table} WHERE ranking = ?", (ranking,))
+        else:
+            cursor.execute(f"DELETE FROM {table} WHERE ranking = ? AND language = ?", (ranking, language))
+
+
+def save_structured_recipe(cursor, ranking, language, recipe_xml):
+    """
+    XML 레시피를 한 번 파싱하여 정규화 테이블에 저장
+    language: 'eng' 또는 'kor' (ChatRequest.language와 동일한 값)
+    파싱 결과(dict)를 반환하며, 파싱 실패 시 None
+    """
+    clear_structured_recipes(cursor, ranking, language)
+    parsed = parse_recipe_xml(recipe_xml)
+    if parsed is None:
+        return None
+
+    cursor.execute(
+        "INSERT INTO recipe_summaries (ranking, language, title, message, total_time) VALUES (?, ?, ?, ?, ?)",
+        (ranking, language, parsed["title"], parsed["message"], parsed["total_time"])
+    )
+    cursor.executemany(
+        "INSERT INTO recipe_ingredients (ranking, language, position, name, quantity, raw) VALUES (?, ?, ?, ?, ?, ?)",
+        [(ranking, language, item["position"], item["name"], item["quantity"], item["raw"]) for item in parsed["ingredients"]]
+    )
+    cursor.executemany(
+        "INSERT INTO recipe_steps (ranking, language, step_no, name, minutes, description) VALUES (?, ?, ?, ?, ?, ?)",
+        [(ranking, language, step["step_no"], step["name"], step["minutes"], "\n".join(step["description"])) for step in parsed["steps"]]
+    )
+    extras = [(ranking, language, "drink", i, text) for i, text in enumerate(parsed["drinks"], 1)]
+    extras += [(ranking, language, "tip", i, text) for i, text in enumerate(parsed["tips"], 1)]
+    cursor.executemany(
+        "INSERT INTO recipe_extras (ranking, language, kind, position, text) VALUES (?, ?, ?, ?, ?)",
+        extras
+    )
+    index_recipe_ingredients(cursor, ranking, language, [item["name"] for item in parsed["ingredients"]])
+    return parsed
+
+
+def rebuild_structured_recipes(cursor, table_name='hot_recipes'):
+    """
+    table_name에 저장된 XML 레시피로 정규화 테이블 전체를 다시 만듦 (랭킹 번호가 새로 매겨졌을 때)
+    다시 파싱한 레시피 수를 반환
+    """
+    clear_structured_recipes(cursor)
+    rows = cursor.execute(
+        f"SELECT ranking, recipe_detail_en, recipe_detail_ko FROM {table_name} WHERE recipe_detail_en IS NOT NULL"
+    ).fetchall()
+    for ranking, recipe_en, recipe_ko in rows:
+        save_structured_recipe(cursor, ranking, "eng", recipe_en)
+        save_structured_recipe(cursor, ranking, "kor", recipe_ko)
+    return len(rows)
+
+
+def index_recipe_ingredients(cursor, ranking, language, ingredient_names):
+    """레시피의 재료명 목록을 정규화하여 ingredient_index에 추가 (같은 term은 높은 가중치 유지)"""
+    rows = []
+    for name in ingredient_names:
+        for term, weight in ingredient_terms(name).items():
+            rows.append((term, ranking, language, weight))
+    cursor.executemany(
+        """
+        INSERT INTO ingredient_index (term, ranking, language, weight) VALUES (?, ?, ?, ?)
+        ON CONFLICT (term, ranking, language) DO UPDATE SET weight = MAX(weight, excluded.weight)
+        """,
+        rows
+    )
+
+
+
+# --- hot_recipes 전문 검색(FTS5) 색인 ---
+SEARCH_TABLE = 'hot_recipes_fts'
+
+# trigram 토크나이저는 띄어쓰기/조사에 상관없이 한국어 부분 문자열을 매칭
+# (SQLite 3.34 미만이면 unicode61로 대체)
+SEARCH_TOKENIZERS = ["trigram case_sensitive 0", "unicode61 remove_diacritics 2"]
+
+
+def create_search_table(cursor):
+    """hot_recipes 검색용 FTS5 가상 테이블 생성 (rowid = ranking)"""
+    for tokenizer in SEARCH_TOKENIZERS:
+        try:
+            cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+                recipe_name, description, recipe_en, recipe_ko,
+                tokenize = '{tokenizer}'
+            )
+            """)
+            return
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 토크나이저 '{tokenizer}' 사용 불가: {e}")
+    raise sqlite3.OperationalError("사용 가능한 FTS5 토크나이저가 없습니다.")
+
+
+def sync_search_index(cursor, ranking=None):
+    """
+    hot_recipes 내용을 검색 색인에 반영 (ranking 미지정 시 전체 재생성)
+    레시피 XML은 태그를 제거한 본문 텍스트로 색인
+    """
+    create_search_table(cursor)
+    if ranking is None:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute("SELECT ranking, recipe_name, description, recipe_detail_en, recipe_detail_ko FROM hot_recipes")
+    else:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = ?", (ranking,))
+        cursor.execute(
+            "SELECT ranking, recipe_name, description, recipe_detail_en, recipe_detail_ko FROM hot_recipes WHERE ranking = ?",
+            (ranking,)
+        )
+    rows = [
+        (row_ranking, name, description or "", recipe_xml_to_text(recipe_en), recipe_xml_to_text(recipe_ko))
+        for row_ranking, name, description, recipe_en, recipe_ko in cursor.fetchall()
+    ]
+    cursor.executemany(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, recipe_name, description, recipe_en, recipe_ko) VALUES (?, ?, ?, ?, ?)",
+        rows
+    )
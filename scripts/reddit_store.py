@@ -0,0 +1,181 @@
+# scripts/reddit_store.py
+# Reddit 글 저장소 (SQLite reddit_posts 테이블, created_date 인덱스)
+#
+# - 분석 스크립트는 필요한 컬럼과 기간만 읽음 (CSV처럼 URL/upvote_ratio까지 전부 파싱하지 않음)
+#   created_date 인덱스로 "워터마크 이후 글"만 바로 찾음 -> 트렌드 갱신 비용 = 새 글 수
+# - 글 하나 = URL 하나 (UPSERT: 다시 수집된 글은 추천수/댓글수만 최신 값으로 갱신)
+# - 기존 CSV는 migrate_csv로 옮기며, 저장소가 없으면 읽기 함수가 CSV로 대신 동작
+#
+# 변환: python -m scripts.reddit_store [--csv data/reddit_koreanfood.csv] [--db data/reddit_corpus.db]
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+CSV_FILE = 'data/reddit_koreanfood.csv'
+CORPUS_DB_FILE = 'data/reddit_corpus.db'
+POSTS_TABLE = 'reddit_posts'
+POST_COLUMNS = ['title', 'subreddit', 'score', 'content', 'created_date', 'URL', 'num_comments', 'upvote_ratio']
+READ_CHUNK_SIZE = 2000
+MIGRATE_BATCH_SIZE = 1000
+# URL IN (...) 조회 한 번에 넣을 URL 수 (SQLite 바인딩 변수 제한 이내)
+URL_LOOKUP_BATCH_SIZE = 500
+
+POSTS_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {POSTS_TABLE} (
+        URL TEXT NOT NULL UNIQUE,
+        created_date TEXT NOT NULL,
+        title TEXT,
+        content TEXT,
+        subreddit TEXT,
+        score INTEGER,
+        num_comments INTEGER,
+        upvote_ratio REAL
+    )
+    """,
+    f"CREATE INDEX IF NOT EXISTS idx_{POSTS_TABLE}_created_date ON {POSTS_TABLE} (created_date)",
+]
+
+
+def connect_corpus(db_path):
+    """WAL 모드로 저장소에 연결하고 테이블/인덱스를 준비"""
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for ddl in POSTS_DDL:
+        conn.execute(ddl)
+    conn.commit()
+    return conn
+
+
+def upsert_posts(conn, rows):
+    """글(dict, CSV와 같은 컬럼) 저장, 이미 있는 URL이면 추천수/댓글수/추천 비율만 갱신"""
+    conn.executemany(
+        f"""
+        INSERT INTO {POSTS_TABLE} (URL, created_date, title, content, subreddit, score, num_comments, upvote_ratio)
+        VALUES (:URL, :created_date, :title, :content, :subreddit, :score, :num_comments, :upvote_ratio)
+        ON CONFLICT (URL) DO UPDATE SET
+            score = excluded.score,
+            num_comments = excluded.num_comments,
+            upvote_ratio = excluded.upvote_ratio
+        """,
+        rows
+    )
+    conn.commit()
+
+
+def existing_urls(conn, urls):
+    """urls 중 이미 저장소에 있는 URL 집합 (URL UNIQUE 인덱스로 조회, 저장소 전체를 읽지 않음)"""
+    urls = list(dict.fromkeys(urls))
+    found = set()
+    for start in range(0, len(urls), URL_LOOKUP_BATCH_SIZE):
+        batch = urls[start:start + URL_LOOKUP_BATCH_SIZE]
+        rows = conn.execute(
+            f"SELECT URL FROM {POSTS_TABLE} WHERE URL IN ({', '.join('?' for _ in batch)})", batch
+        ).fetchall()
+        found.update(url for url, in rows)
+    return found
+
+
+def _parse_csv_row(row):
+    """CSV 문자열 값을 저장소 타입으로 (빈 값은 NULL)"""
+    parsed = {column: row.get(column) or None for column in POST_COLUMNS}
+    for column in ('score', 'num_comments'):
+        if parsed[column] is not None:
+            parsed[column] = int(float(parsed[column]))
+    if parsed['upvote_ratio'] is not None:
+        parsed['upvote_ratio'] = float(parsed['upvote_ratio'])
+    return parsed
+
+
+def migrate_csv(csv_path, db_path, batch_size=MIGRATE_BATCH_SIZE):
+    """기존 CSV를 저장소로 옮김 (여러 번 실행해도 URL 기준으로 중복 없음), 옮긴 행 수 반환"""
+    conn = connect_corpus(db_path)
+    migrated = 0
+    try:
+        with open(csv_path, newline='', encoding='utf-8-sig') as f:
+            batch = []
+            for row in csv.DictReader(f):
+                if not row.get('URL') or not row.get('created_date'):
+                    continue
+                batch.append(_parse_csv_row(row))
+                if len(batch) >= batch_size:
+                    upsert_posts(conn, batch)
+                    migrated += len(batch)
+                    batch = []
+            if batch:
+                upsert_posts(conn, batch)
+                migrated += len(batch)
+    finally:
+        conn.close()
+    return migrated
+
+
+def iter_posts(db_path, columns, since=None, until=None, chunksize=READ_CHUNK_SIZE):
+    """
+    저장소에서 columns만, created_date가 [since, until) 구간인 글을 DataFrame 청크로 반환
+    (since/until이 없으면 그쪽 경계 없음, created_date 인덱스 순서로 읽음)
+    """
+    conditions, params = [], []
+    if since is not None:
+        conditions.append("created_date >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("created_date < ?")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = f"SELECT {', '.join(columns)} FROM {POSTS_TABLE} {where} ORDER BY created_date"
+
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        yield from pd.read_sql(query, conn, params=params, chunksize=chunksize)
+    finally:
+        conn.close()
+
+
+def iter_post_frames(source_path, columns, chunksize=READ_CHUNK_SIZE, since=None):
+    """
+    글 DataFrame 청크 (source_path가 .db면 저장소, 아니면 CSV)
+    CSV는 기간 인덱스가 없으므로 전체를 읽고 since 이후 글만 남김
+    """
+    if source_path.endswith('.db'):
+        yield from iter_posts(source_path, columns, since=since, chunksize=chunksize)
+        return
+    usecols = list(dict.fromkeys(columns + (['created_date'] if since is not None else [])))
+    for chunk in pd.read_csv(source_path, usecols=usecols, dtype={'created_date': 'object'}, chunksize=chunksize):
+        if since is not None:
+            chunk = chunk[chunk['created_date'] >= since]
+        yield chunk[columns]
+
+
+def resolve_corpus_path(project_root):
+    """저장소가 있으면 저장소를, 없으면 CSV 경로를 반환"""
+    db_path = os.path.join(project_root, CORPUS_DB_FILE)
+    if os.path.exists(db_path):
+        print(f"Reddit 글 저장소 '{db_path}'를 사용합니다.")
+        return db_path
+    print("⚠️ Reddit 글 저장소가 없어 CSV를 읽습니다. (python -m scripts.reddit_store 로 변환)")
+    return os.path.join(project_root, CSV_FILE)
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    project_root = os.path.dirname(script_dir)
+
+    parser = argparse.ArgumentParser(description="Reddit CSV -> SQLite 글 저장소 변환")
+    parser.add_argument("--csv", default=os.path.join(project_root, CSV_FILE), help="변환할 CSV")
+    parser.add_argument("--db", default=os.path.join(project_root, CORPUS_DB_FILE), help="저장소 DB 파일")
+    args = parser.parse_args()
+
+    try:
+        count = migrate_csv(args.csv, args.db)
+    except FileNotFoundError:
+        print(f"오류: '{args.csv}' 파일을 찾을 수 없습니다.")
+        sys.exit(1)
+    print(f"--- '{args.csv}'의 글 {count}개를 '{args.db}'의 {POSTS_TABLE} 테이블로 옮겼습니다. ---")
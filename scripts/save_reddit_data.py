@@ -1,60 +1,197 @@
 from datetime import datetime
+from types import SimpleNamespace
+import argparse
 import csv
-import dotenv
-import praw
+import json
 import os
+import sys
 
-dotenv.load_dotenv()
-
-REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
-REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
-REDDIT_PASSWORD = os.getenv('REDDIT_PASSWORD')
-REDDIT_USER_AGENT = os.getenv('REDDIT_USER_AGENT')
-REDDIT_USERNAME = os.getenv('REDDIT_USERNAME')
-
-# 1. PRAW 인스턴스 생성 (아이디/비밀번호/앱 정보만 주면 됨)
-reddit = praw.Reddit(
-    client_id=REDDIT_CLIENT_ID,
-    client_secret=REDDIT_CLIENT_SECRET,
-    password=REDDIT_PASSWORD,
-    user_agent=REDDIT_USER_AGENT,
-    username=REDDIT_USERNAME,
-)
+# r/koreanfood 새 글을 data/reddit_koreanfood.csv에 증분으로 추가
+# - 체크포인트(마지막으로 저장한 글의 created_utc + 같은 시각 글의 id)보다 새 글만 가져옴
+#   (new()는 최신 글부터 주므로 체크포인트에 닿으면 더 요청하지 않음 -> API 호출/시간 = 새 글 수)
+# - 이미 저장된 URL은 건너뜀 (체크포인트 저장 전에 중단된 경우의 중복 방지)
+#   글 저장소가 있으면 이번에 가져온 URL만 저장소의 URL 인덱스로 조회 (CSV 전체를 읽지 않음)
+# - 글 저장소(data/reddit_corpus.db, scripts/reddit_store.py)가 있으면 저장소에 먼저 UPSERT한 뒤 새 글만 CSV에 추가
+# - --source-file: PRAW 대신 로컬 JSON Lines 파일을 글 목록으로 사용 (API 없이 동작 확인용)
 
 # CSV 파일명
 csv_filename = 'data/reddit_koreanfood.csv'
+checkpoint_filename = 'data/reddit_checkpoint.json'
+corpus_db_filename = 'data/reddit_corpus.db'
+
+SUBREDDIT_NAME = 'koreanfood'
+FETCH_LIMIT = 3000
+FIELDNAMES = ['title', 'subreddit', 'score', 'content', 'created_date', 'URL', 'num_comments', 'upvote_ratio']
+
+
+def connect_reddit():
+    """PRAW 인스턴스 생성 (아이디/비밀번호/앱 정보만 주면 됨)"""
+    import dotenv
+    import praw
+
+    dotenv.load_dotenv()
+    return praw.Reddit(
+        client_id=os.getenv('REDDIT_CLIENT_ID'),
+        client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
+        password=os.getenv('REDDIT_PASSWORD'),
+        user_agent=os.getenv('REDDIT_USER_AGENT'),
+        username=os.getenv('REDDIT_USERNAME'),
+    )
+
+
+class JsonLinesSubreddit:
+    """
+    PRAW subreddit처럼 new(limit=...)로 글을 최신순으로 주는 로컬 소스
+    한 줄에 글 하나: {"id", "title", "selftext", "created_utc", "score", "num_comments", "upvote_ratio", "permalink"}
+    (선택) "subreddit_name": 서브레딧 이름 (없으면 display_name)
+    submission.subreddit은 PRAW처럼 display_name을 가진 객체이므로 "subreddit" 필드는 쓰지 않음
+    """
+
+    def __init__(self, path, display_name=SUBREDDIT_NAME):
+        self.path = path
+        self.display_name = display_name
+
+    def new(self, limit=None):
+        with open(self.path, encoding='utf-8') as f:
+            posts = [json.loads(line) for line in f if line.strip()]
+        posts.sort(key=lambda post: post['created_utc'], reverse=True)
+        for post in posts[:limit]:
+            subreddit = SimpleNamespace(display_name=post.pop('subreddit_name', self.display_name))
+            yield SimpleNamespace(subreddit=subreddit, **post)
+
+
+def load_checkpoint(path):
+    """마지막으로 저장한 글의 created_utc와 그 시각 글들의 id (없으면 처음부터)"""
+    if not os.path.exists(path):
+        return {'created_utc': 0, 'ids': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def load_known_urls(csv_path, corpus_db_path=None, urls=()):
+    """
+    이미 저장된 글의 URL 집합
+    글 저장소가 있으면 urls(이번에 가져온 글) 중 저장소에 있는 것만 URL 인덱스로 조회, 없으면 CSV 전체를 읽음
+    """
+    if corpus_db_path and os.path.exists(corpus_db_path):
+        from scripts.reddit_store import connect_corpus, existing_urls
 
-try:
-    # 2. 검색 실행 (PRAW가 내부적으로 토큰 처리)
-    search_results = reddit.subreddit('koreanfood').new(limit=3000)
-
-    # 3. 데이터 수집
-    data_list = []
-    for submission in search_results:
-        created_date = datetime.utcfromtimestamp(submission.created_utc)
-        data_list.append({
-            'title': submission.title,
-            'subreddit': submission.subreddit.display_name,
-            'score': submission.score,
-            'content': submission.selftext,
-            'created_date': created_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'URL': f'https://www.reddit.com{submission.permalink}',
-            'num_comments': submission.num_comments,
-            'upvote_ratio': submission.upvote_ratio
-        })
-
-    # 4. CSV 파일로 저장
-    if data_list:
-        with open(csv_filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-            fieldnames = ['title', 'subreddit', 'score', 'content', 'created_date', 'URL', 'num_comments', 'upvote_ratio']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            
+        conn = connect_corpus(corpus_db_path)
+        try:
+            return existing_urls(conn, urls)
+        finally:
+            conn.close()
+    if not os.path.exists(csv_path):
+        return set()
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        return {row['URL'] for row in csv.DictReader(f)}
+
+
+def submission_to_row(submission):
+    created_date = datetime.utcfromtimestamp(submission.created_utc)
+    return {
+        'title': submission.title,
+        'subreddit': submission.subreddit.display_name,
+        'score': submission.score,
+        'content': submission.selftext,
+        'created_date': created_date.strftime('%Y-%m-%d %H:%M:%S'),
+        'URL': f'https://www.reddit.com{submission.permalink}',
+        'num_comments': submission.num_comments,
+        'upvote_ratio': submission.upvote_ratio
+    }
+
+
+def fetch_new_submissions(subreddit, checkpoint, limit=FETCH_LIMIT):
+    """체크포인트 이후 글만 최신순으로 가져옴 (체크포인트보다 오래된 글이 나오면 중단)"""
+    seen_ids = set(checkpoint['ids'])
+    submissions = []
+    for submission in subreddit.new(limit=limit):
+        if submission.created_utc < checkpoint['created_utc']:
+            break
+        if submission.created_utc == checkpoint['created_utc'] and submission.id in seen_ids:
+            continue
+        submissions.append(submission)
+    return submissions
+
+
+def advance_checkpoint(checkpoint, submissions):
+    """새로 저장한 글까지 반영한 체크포인트"""
+    latest = max([checkpoint['created_utc']] + [submission.created_utc for submission in submissions])
+    ids = checkpoint['ids'] if latest == checkpoint['created_utc'] else []
+    ids = sorted(set(ids) | {submission.id for submission in submissions if submission.created_utc == latest})
+    return {'created_utc': latest, 'ids': ids}
+
+
+def append_rows(path, rows):
+    """CSV 끝에 행 추가 (파일이 없으면 헤더부터 작성), 디스크에 기록된 뒤에 반환"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, 'a', newline='', encoding='utf-8-sig' if write_header else 'utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FIELDNAMES)
+        if write_header:
             writer.writeheader()
-            writer.writerows(data_list)
-        
-        print(f"총 {len(data_list)}개의 데이터를 {csv_filename} 파일로 저장했습니다.")
+        writer.writerows(rows)
+        csvfile.flush()
+        os.fsync(csvfile.fileno())
+
+
+def ingest(subreddit, csv_path, checkpoint_path, limit=FETCH_LIMIT, corpus_db_path=None):
+    """새 글을 가져와 (글 저장소와) CSV에 추가하고 체크포인트를 갱신, 추가한 글 수를 반환"""
+    checkpoint = load_checkpoint(checkpoint_path)
+    submissions = fetch_new_submissions(subreddit, checkpoint, limit)
+    print(f"체크포인트({checkpoint['created_utc']}) 이후 새 글 {len(submissions)}개를 가져왔습니다.")
+
+    submissions = sorted(submissions, key=lambda submission: submission.created_utc)
+    fetched = [submission_to_row(submission) for submission in submissions]
+    known_urls = load_known_urls(csv_path, corpus_db_path, [row['URL'] for row in fetched])
+    rows = []
+    for row in fetched:
+        if row['URL'] not in known_urls:
+            known_urls.add(row['URL'])
+            rows.append(row)
+
+    # 글 저장소가 있으면 저장소에 먼저 저장 (이미 있는 글도 추천수/댓글수를 최신 값으로 갱신)
+    # -> 저장소가 중복 제거 기준이므로, CSV 추가 전에 중단되어도 저장소에는 빠지는 글이 없음
+    if fetched and corpus_db_path and os.path.exists(corpus_db_path):
+        from scripts.reddit_store import connect_corpus, upsert_posts
+
+        conn = connect_corpus(corpus_db_path)
+        try:
+            upsert_posts(conn, fetched)
+        finally:
+            conn.close()
+        print(f"글 저장소 '{corpus_db_path}'에 {len(fetched)}개를 저장했습니다. (새 글 {len(rows)}개)")
+    if rows:
+        append_rows(csv_path, rows)
+        print(f"총 {len(rows)}개의 데이터를 {csv_path} 파일에 추가했습니다.")
     else:
         print("저장할 데이터가 없습니다.")
+    # 저장이 끝난 뒤에 체크포인트를 옮김 (중간에 실패하면 다음 실행에서 URL로 중복 제거)
+    save_checkpoint(checkpoint_path, advance_checkpoint(checkpoint, submissions))
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="r/koreanfood 새 글 증분 수집")
+    parser.add_argument("--limit", type=int, default=FETCH_LIMIT, help="한 번에 요청할 최대 글 수")
+    parser.add_argument("--source-file", default=None, help="PRAW 대신 사용할 로컬 JSON Lines 글 목록")
+    args = parser.parse_args()
+
+    try:
+        if args.source_file:
+            subreddit = JsonLinesSubreddit(args.source_file)
+        else:
+            # 검색 실행 (PRAW가 내부적으로 토큰 처리)
+            subreddit = connect_reddit().subreddit(SUBREDDIT_NAME)
+        ingest(subreddit, csv_filename, checkpoint_filename, args.limit, corpus_db_filename)
 
-except Exception as e:
-    print(f"PRAW 실행 중 오류 발생: {e}")
\ No newline at end of file
+    except Exception as e:
+        print(f"PRAW 실행 중 오류 발생: {e}")
+        sys.exit(1)
@@ -0,0 +1,13 @@
+import pytest
+
+from scripts import generate_synthetic_data
+
+
+@pytest.fixture
+def small_grocery_dir(tmp_path, monkeypatch):
+    """합성 데이터 생성기로 만든 작은 grocery_data 폴더 (sales 3,000행, 고객 200명)"""
+    monkeypatch.setattr(generate_synthetic_data, "BASE_SALES_ROWS", 3000)
+    monkeypatch.setattr(generate_synthetic_data, "BASE_CUSTOMERS", 200)
+    data_dir = tmp_path / "grocery_data"
+    generate_synthetic_data.generate_grocery(str(data_dir), 1, generate_synthetic_data.random.Random(7))
+    return str(data_dir)
@@ -0,0 +1,128 @@
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("boto3")
+pytest.importorskip("pydantic_settings")
+
+from scripts import get_menus_recipes as menus  # noqa: E402
+
+RECIPE_XML = """<recipe>
+<title>Kimchi Jjigae (for 1 serving)</title>
+<section><title>1. Ingredients 🥣</title><ingredients>
+- Kimchi (100g)
+- Tofu (1/2 block)
+</ingredients></section>
+<section><title>2. Cooking Method 🍳 (Total estimated time: 20 minutes)</title><steps>
+<step><name>1) Boil (Estimated time: 20 minutes)</name><description>
+- Simmer kimchi and tofu
+</description></step>
+</steps></section>
+</recipe>"""
+
+
+@pytest.fixture
+def batch_db(tmp_path, monkeypatch):
+    """hot_recipes 두 행(레시피 비어 있음)만 있는 임시 DB"""
+    db_path = str(tmp_path / "recipes.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE hot_recipes (
+        ranking INTEGER PRIMARY KEY,
+        recipe_name TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        recipe_detail_ko TEXT,
+        recipe_detail_en TEXT,
+        image_url TEXT,
+        cook_time INTEGER,
+        description TEXT
+    )
+    """)
+    conn.executemany(
+        "INSERT INTO hot_recipes (ranking, recipe_name, score) VALUES (?, ?, ?)",
+        [(1, "김치찌개", 30), (2, "비빔밥", 20)]
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(menus, "DB_FILE", db_path)
+    monkeypatch.setattr(menus, "MODEL_ID", "test-model")
+    return db_path
+
+
+def _read_jobs(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["recordId"] for line in f]
+
+
+def _result(record_id, text):
+    return json.dumps({"recordId": record_id, "modelOutput": {"content": [{"text": text}]}}, ensure_ascii=False)
+
+
+def test_batch_prepare_and_ingest(batch_db, tmp_path):
+    jobs_path, results_path = tmp_path / "jobs.jsonl", tmp_path / "results.jsonl"
+    assert menus.prepare_batch(str(jobs_path)) == 4
+    record_ids = {tuple(record_id.split(":")[:2]): record_id for record_id in _read_jobs(jobs_path)}
+    assert set(record_ids) == {("recipe", "1"), ("description", "1"), ("recipe", "2"), ("description", "2")}
+
+    # 2위 레시피 결과는 해시가 다른(그 사이 행이 바뀐) 줄, 마지막 줄은 깨진 JSON
+    stale_id = record_ids[("recipe", "2")].rsplit(":", 1)[0] + ":" + "0" * 16
+    results_path.write_text("\n".join([
+        _result(record_ids[("recipe", "1")], f"Here you go!\n{RECIPE_XML}\nEnjoy."),
+        _result(record_ids[("description", "1")], "  Spicy kimchi stew with tofu.  "),
+        _result(record_ids[("description", "2")], "Rice bowl with vegetables."),
+        _result(stale_id, RECIPE_XML),
+        '{"recordId": "recipe:2:',
+    ]) + "\n", encoding="utf-8")
+
+    assert menus.ingest_batch_results(str(results_path)) == 2
+
+    conn = sqlite3.connect(batch_db)
+    try:
+        rows = conn.execute(
+            "SELECT ranking, recipe_detail_en, recipe_detail_ko, cook_time, description FROM hot_recipes ORDER BY ranking"
+        ).fetchall()
+        assert rows == [
+            (1, RECIPE_XML, None, 20, "Spicy kimchi stew with tofu."),
+            (2, None, None, None, "Rice bowl with vegetables."),
+        ]
+        assert conn.execute("SELECT ranking, language, title FROM recipe_summaries").fetchall() == [
+            (1, "eng", "Kimchi Jjigae (for 1 serving)")
+        ]
+        assert conn.execute(
+            "SELECT name FROM recipe_ingredients WHERE ranking = 1 AND language = 'eng' ORDER BY position"
+        ).fetchall() == [("Kimchi",), ("Tofu",)]
+        assert conn.execute("SELECT COUNT(*) FROM recipe_steps WHERE ranking = 1").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+    # 영어 레시피가 반영된 1위는 번역 요청이, 건너뛴 2위는 레시피 요청이 다시 나옴
+    assert menus.prepare_batch(str(jobs_path)) == 2
+    assert {tuple(record_id.split(":")[:2]) for record_id in _read_jobs(jobs_path)} == {
+        ("translation", "1"), ("recipe", "2")
+    }
+
+
+def test_enrich_keeps_description_when_request_fails(batch_db, monkeypatch):
+    conn = sqlite3.connect(batch_db)
+    conn.execute("UPDATE hot_recipes SET description = 'Mixed rice.' WHERE ranking = 2")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(menus, "fetch_recipes", lambda recipe_name: (RECIPE_XML, RECIPE_XML))
+    monkeypatch.setattr(menus, "get_description_from_bedrock", lambda recipe_name: None)
+
+    # 두 메뉴 모두 설명 요청이 실패 -> 실패로 집계되고, 기존 설명은 덮어쓰지 않음
+    assert menus.enrich_database(concurrency=1, rate=100, burst=10) == 2
+
+    conn = sqlite3.connect(batch_db)
+    try:
+        assert conn.execute("SELECT ranking, description FROM hot_recipes ORDER BY ranking").fetchall() == [
+            (1, None), (2, "Mixed rice.")
+        ]
+    finally:
+        conn.close()
+
+    # 다음 실행은 한글 레시피가 채워진 메뉴도 설명이 비어 있으면 (레시피는 다시 요청하지 않고) 설명만 요청
+    monkeypatch.setattr(menus, "fetch_recipes", lambda recipe_name: pytest.fail("레시피를 다시 요청함"))
+    monkeypatch.setattr(menus, "get_description_from_bedrock", lambda recipe_name: f"{recipe_name} dish.")
+    assert menus.enrich_database(concurrency=1, rate=100, burst=10) == 0
@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+
+from scripts import analyze_grocery_data as grocery
+
+pytest.importorskip("duckdb")
+
+
+def test_duckdb_rankings_match_pandas(small_grocery_dir):
+    data = grocery.load_dataframes(small_grocery_dir)
+    food_products = grocery.prepare_products(data['products'], data['categories'])
+    customer_cities, geo = grocery.prepare_geo(data['customers'], data['cities'], data['countries'])
+
+    results = {}
+    for engine in ("pandas", "duckdb"):
+        sales_cube, progress = grocery.aggregate_full_history(
+            food_products, customer_cities, small_grocery_dir, chunksize=450, engine=engine
+        )
+        totals = grocery.city_totals(sales_cube)
+        rankings = grocery.build_regional_rankings(totals, sales_cube, food_products, geo)
+        rankings = rankings.sort_values(['scope', 'region', 'time_window', 'IngredientRank']).reset_index(drop=True)
+        results[engine] = (sales_cube.sort_index(), progress, rankings)
+
+    pandas_cube, pandas_progress, pandas_rankings = results["pandas"]
+    duckdb_cube, duckdb_progress, duckdb_rankings = results["duckdb"]
+    assert len(pandas_rankings) > 0
+    pd.testing.assert_frame_equal(pandas_cube, duckdb_cube, check_index_type=False)
+    assert pandas_progress == duckdb_progress
+    pd.testing.assert_frame_equal(pandas_rankings, duckdb_rankings)
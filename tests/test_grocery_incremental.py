@@ -0,0 +1,107 @@
+import os
+
+import pandas as pd
+import pytest
+
+from scripts import analyze_grocery_data as grocery
+from scripts.grocery_cache import PARQUET_AVAILABLE
+from scripts.grocery_duckdb import DUCKDB_AVAILABLE
+from scripts.grocery_incremental import load_state
+
+
+def _dimensions(data_dir):
+    data = grocery.load_dataframes(data_dir)
+    food_products = grocery.prepare_products(data['products'], data['categories'])
+    customer_cities, geo = grocery.prepare_geo(data['customers'], data['cities'], data['countries'])
+    return food_products, customer_cities, geo
+
+
+def test_incremental_state_matches_full_rebuild(small_grocery_dir, tmp_path):
+    food_products, customer_cities, _ = _dimensions(small_grocery_dir)
+    sales_path = os.path.join(small_grocery_dir, "sales.csv")
+    with open(sales_path, "rb") as f:
+        lines = f.readlines()
+    split = len(lines) * 2 // 3
+    with open(sales_path, "wb") as f:
+        f.writelines(lines[:split])
+
+    state_path = str(tmp_path / "state.db")
+    _, _, save_incremental_state = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, state_path, chunksize=450
+    )
+    save_incremental_state()
+    with open(sales_path, "ab") as f:
+        f.writelines(lines[split:])
+
+    incremental_totals, incremental_daily, save_incremental_state = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, state_path, chunksize=450
+    )
+    save_incremental_state()
+    full_totals, full_daily, _ = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, str(tmp_path / "full.db"), chunksize=450, full_rebuild=True
+    )
+
+    pd.testing.assert_frame_equal(incremental_totals.sort_index(), full_totals.sort_index())
+    # SalesDay 인덱스는 pandas 버전에 따라 object/str dtype이 섞일 수 있어 값만 비교
+    pd.testing.assert_frame_equal(incremental_daily.sort_index(), full_daily.sort_index(), check_index_type=False)
+
+    # 저장된 일별 상태는 가장 긴 순위 기간(RECENT_DAYS일)만 유지
+    _, saved_totals, saved_daily = load_state(state_path)
+    pd.testing.assert_frame_equal(saved_totals.sort_index(), full_totals.sort_index())
+    days = pd.to_datetime(saved_daily.index.get_level_values('SalesDay'))
+    assert (days.max() - days.min()).days < grocery.RECENT_DAYS
+
+
+@pytest.mark.parametrize("engine, workers, use_cache", [
+    ("pandas", 1, False),
+    ("pandas", 2, False),
+    pytest.param("pandas", 1, True, marks=pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow 없음")),
+    pytest.param("duckdb", 1, False, marks=pytest.mark.skipif(not DUCKDB_AVAILABLE, reason="duckdb 없음")),
+])
+def test_full_rebuild_stops_at_last_complete_line(small_grocery_dir, tmp_path, engine, workers, use_cache):
+    food_products, customer_cities, _ = _dimensions(small_grocery_dir)
+    sales_path = os.path.join(small_grocery_dir, "sales.csv")
+    with open(sales_path, "rb") as f:
+        lines = f.readlines()
+    split = len(lines) * 2 // 3
+    # 마지막 줄에 줄바꿈이 없는 상태(쓰는 중인 줄)에서 전체 재집계
+    with open(sales_path, "wb") as f:
+        f.writelines(lines[:split - 1])
+        f.write(lines[split - 1].rstrip(b"\n"))
+
+    state_path = str(tmp_path / "state.db")
+    cache_dir = str(tmp_path / "cache") if use_cache else None
+    _, _, save_incremental_state = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, state_path, chunksize=450, cache_dir=cache_dir,
+        full_rebuild=True, workers=workers, engine=engine
+    )
+    save_incremental_state()
+
+    # 그 줄을 마저 쓰고 새 행을 추가한 뒤 증분 집계 -> 새로 전체 재집계한 결과와 같아야 함 (중복 반영 없음)
+    with open(sales_path, "ab") as f:
+        f.write(b"\n")
+        f.writelines(lines[split:])
+    incremental_totals, incremental_daily, _ = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, state_path, chunksize=450, cache_dir=cache_dir,
+        workers=workers, engine=engine
+    )
+    full_totals, full_daily, _ = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, str(tmp_path / "full.db"), chunksize=450, full_rebuild=True
+    )
+
+    pd.testing.assert_frame_equal(incremental_totals.sort_index(), full_totals.sort_index())
+    pd.testing.assert_frame_equal(incremental_daily.sort_index(), full_daily.sort_index(), check_index_type=False)
+
+
+def test_city_rankings_keep_same_named_cities_apart(small_grocery_dir, tmp_path):
+    food_products, customer_cities, geo = _dimensions(small_grocery_dir)
+    totals, daily, _ = grocery.compute_sales_cube(
+        food_products, customer_cities, small_grocery_dir, str(tmp_path / "state.db"), chunksize=450
+    )
+    geo['CityName'] = 'Springfield'
+
+    rankings = grocery.build_regional_rankings(totals, daily, food_products, geo)
+    cities = rankings[(rankings['scope'] == 'city') & (rankings['time_window'] == 'all')]
+
+    assert set(cities['region_name']) == {'Springfield'}
+    assert cities['region'].nunique() == totals.index.get_level_values('CityID').nunique()
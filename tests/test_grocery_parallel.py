@@ -0,0 +1,57 @@
+import os
+
+import pandas as pd
+
+from scripts import analyze_grocery_data as grocery
+from scripts.csv_ranges import iter_csv_range, line_aligned_ranges, read_header
+from scripts.grocery_incremental import csv_end_offset
+
+
+def _dimensions(data_dir):
+    data = grocery.load_dataframes(data_dir)
+    food_products = grocery.prepare_products(data['products'], data['categories'])
+    customer_cities, _ = grocery.prepare_geo(data['customers'], data['cities'], data['countries'])
+    return food_products, customer_cities
+
+
+def test_line_aligned_ranges_split_mid_line_without_losing_rows(small_grocery_dir):
+    path = os.path.join(small_grocery_dir, "sales.csv")
+    names, data_start = read_header(path)
+    end = csv_end_offset(path)
+    with open(path, "rb") as f:
+        line_starts = set()
+        position = data_start
+        for line in f.readlines()[1:]:
+            line_starts.add(position)
+            position += len(line)
+
+    parts = 7
+    targets = [data_start + (end - data_start) * i // parts for i in range(1, parts)]
+    assert any(target not in line_starts for target in targets)  # 적어도 한 경계는 줄 중간
+
+    ranges = line_aligned_ranges(path, data_start, end, parts)
+    assert all(range_start in line_starts for range_start, _ in ranges)
+
+    spec = grocery.CSV_SPECS["sales"]
+    partitioned = pd.concat(
+        chunk for range_start, range_end in ranges
+        for chunk in iter_csv_range(path, range_start, range_end, spec["usecols"], spec["dtype"], 500, names)
+    ).reset_index(drop=True)
+    whole = grocery.read_csv_spec("sales", small_grocery_dir)
+    pd.testing.assert_frame_equal(partitioned, whole)
+
+
+def test_parallel_aggregation_matches_single_process(small_grocery_dir):
+    food_products, customer_cities = _dimensions(small_grocery_dir)
+    end = csv_end_offset(os.path.join(small_grocery_dir, "sales.csv"))
+
+    single, single_progress = grocery.aggregate_sales_cube(
+        grocery.iter_food_sales_chunks(food_products, small_grocery_dir, chunksize=450), customer_cities
+    )
+    parallel, parallel_progress = grocery.aggregate_sales_parallel(
+        food_products, customer_cities, small_grocery_dir, chunksize=450, start=0, end=end, workers=2
+    )
+
+    assert len(single) > 0
+    pd.testing.assert_frame_equal(single.sort_index(), parallel.sort_index())
+    assert single_progress == parallel_progress
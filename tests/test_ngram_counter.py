@@ -0,0 +1,41 @@
+import random
+
+from scripts.ngram_counter import count_ngrams_streaming
+
+
+def _zipf_corpus(seed, posts=3000, vocabulary=1000, words_per_post=12, chunksize=250):
+    """빈도가 Zipf 분포인 단어로 만든 글 청크 (글마다 두 글자 이상인 영문 단어)"""
+    rng = random.Random(seed)
+    words = [f"w{i:03d}x" for i in range(vocabulary)]
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    texts = [' '.join(rng.choices(words, weights, k=words_per_post)) for _ in range(posts)]
+    return [texts[start:start + chunksize] for start in range(0, posts, chunksize)]
+
+
+def test_heavy_hitters_top_k_matches_exact_within_epsilon():
+    chunks = _zipf_corpus(seed=11)
+    epsilon = 0.002
+    exact = count_ngrams_streaming(chunks, orders=(1, 2))
+    approx = count_ngrams_streaming(chunks, orders=(1, 2), epsilon=epsilon)
+
+    for n in (1, 2):
+        summary, counter = approx[n], exact[n]
+        total = sum(counter.values())
+        assert summary.total == total
+        assert len(summary) <= summary.capacity
+        assert summary.max_error <= epsilon * total
+
+        # 추정 빈도는 실제 빈도의 하한이고 오차는 max_error 이내, epsilon * total보다 잦은 구문은 모두 남음
+        for phrase, count in counter.items():
+            estimate = summary.counts.get(phrase, 0)
+            assert 0 <= count - estimate <= summary.max_error
+            if count > epsilon * total:
+                assert phrase in summary.counts
+
+        # 빈도 차이가 오차보다 큰 Top-K 구문은 근사 Top-K에도 들어감
+        top_k = 15
+        approx_top = {phrase for phrase, _ in summary.most_common(top_k)}
+        kth_count = counter.most_common(top_k + 1)[-1][1]
+        for phrase, count in counter.most_common(top_k):
+            if count - kth_count > summary.max_error:
+                assert phrase in approx_top
@@ -0,0 +1,72 @@
+import csv
+import json
+import sqlite3
+
+from scripts.reddit_store import POSTS_TABLE, connect_corpus
+from scripts.save_reddit_data import JsonLinesSubreddit, ingest
+
+
+def _post(post_id, created_utc, score=1, **extra):
+    return {
+        "id": post_id, "title": f"Kimchi jjigae {post_id}", "selftext": "spicy stew", "created_utc": created_utc,
+        "score": score, "num_comments": 0, "upvote_ratio": 1.0, "permalink": f"/r/koreanfood/comments/{post_id}/",
+        **extra,
+    }
+
+
+def _write_source(path, posts):
+    with open(path, "w", encoding="utf-8") as f:
+        for post in posts:
+            f.write(json.dumps(post) + "\n")
+
+
+def _csv_urls(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [row["URL"] for row in csv.DictReader(f)]
+
+
+def _ingest(tmp_path, posts):
+    source = tmp_path / "posts.jsonl"
+    _write_source(source, posts)
+    return ingest(
+        JsonLinesSubreddit(str(source)), str(tmp_path / "reddit.csv"), str(tmp_path / "checkpoint.json"),
+        corpus_db_path=str(tmp_path / "corpus.db")
+    )
+
+
+def test_ingest_from_json_lines_source(tmp_path):
+    csv_path, corpus_path = tmp_path / "reddit.csv", tmp_path / "corpus.db"
+    connect_corpus(str(corpus_path)).close()
+
+    assert _ingest(tmp_path, [_post("a", 100), _post("b", 200, subreddit_name="KoreanFood")]) == 2
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        subreddits = {row["URL"].split("/")[-2]: row["subreddit"] for row in csv.DictReader(f)}
+    assert subreddits == {"a": "koreanfood", "b": "KoreanFood"}
+
+    # 체크포인트 이후 글만 추가되고, 이미 저장된 URL은 다시 추가하지 않음
+    assert _ingest(tmp_path, [_post("a", 100), _post("b", 200), _post("c", 300), _post("c", 300)]) == 1
+    assert len(_csv_urls(csv_path)) == 3
+
+    conn = sqlite3.connect(corpus_path)
+    try:
+        assert conn.execute(f"SELECT COUNT(*) FROM {POSTS_TABLE}").fetchone()[0] == 3
+    finally:
+        conn.close()
+
+
+def test_ingest_updates_store_and_skips_urls_already_in_store(tmp_path):
+    corpus_path = tmp_path / "corpus.db"
+    connect_corpus(str(corpus_path)).close()
+    assert _ingest(tmp_path, [_post("a", 100)]) == 1
+
+    # 체크포인트를 잃은 뒤 같은 글을 다시 가져오면: 저장소의 추천수만 갱신하고 CSV에는 다시 쓰지 않음
+    (tmp_path / "checkpoint.json").unlink()
+    assert _ingest(tmp_path, [_post("a", 100, score=42)]) == 0
+    assert len(_csv_urls(tmp_path / "reddit.csv")) == 1
+
+    conn = sqlite3.connect(corpus_path)
+    try:
+        assert conn.execute(f"SELECT score FROM {POSTS_TABLE}").fetchall() == [(42,)]
+    finally:
+        conn.close()